@@ -0,0 +1,273 @@
+import concurrent.futures
+import os
+
+import numpy as np
+
+from trafficFlow.carFollowingModel.drivers.intelligentDriver import IntelligentDriver
+
+
+intelligent_driver_bounds = {'s_0': (0.5, 8.), 'v_0': (10., 45.), 'delta': (1., 8.), 'T': (0.3, 3.),
+                             'a': (0.2, 4.), 'b': (0.3, 5.)}
+
+
+class FollowingTrajectory:
+    """
+    Class that holds the observed trajectories of a follower and its leader on the same lane
+
+    Positions are measured along the lane without wrapping around, the gap is the distance between the
+    positions minus the length of the follower (the definition used by the car following model).
+
+    Attributes
+    ----------
+    times : np.ndarray
+        sample times (increasing)
+    leader_position, leader_velocity : np.ndarray
+        observed state of the leader at the sample times
+    follower_position, follower_velocity : np.ndarray
+        observed state of the follower at the sample times
+    length : double
+        length of the follower
+    gap : np.ndarray
+        observed gaps
+
+    Methods
+    -------
+    from_trajectory_file(reader, follower, leader, t_start, t_end)
+        class method, return the trajectories of the vehicles follower and leader recorded by a
+        TrajectoryWriter (positions on circular lanes are unwrapped)
+    """
+
+    def __init__(self, times, leader_position, leader_velocity, follower_position, follower_velocity, length=4.):
+        self.times = np.asarray(times, dtype=float)
+        self.leader_position = np.asarray(leader_position, dtype=float)
+        self.leader_velocity = np.asarray(leader_velocity, dtype=float)
+        self.follower_position = np.asarray(follower_position, dtype=float)
+        self.follower_velocity = np.asarray(follower_velocity, dtype=float)
+        self.length = length
+        self.gap = self.leader_position - self.follower_position - length
+
+    @classmethod
+    def from_trajectory_file(cls, reader, follower, leader, t_start=None, t_end=None):
+        times, position, velocity, lane = reader.read(t_start, t_end, [follower, leader])
+        lane_length = reader.lane_lengths[lane[0, 0]]
+        position = np.unwrap(position.astype(float), period=lane_length, axis=0)
+        # on a ring the leader may be recorded behind the follower, move it less than a lap ahead
+        position[:, 1] = position[:, 1] + (np.floor((position[0, 0] - position[0, 1]) / lane_length) + 1.) \
+            * lane_length
+        length = reader.read_lengths(reader.find_sample(times[0]))[follower]
+        return cls(times, position[:, 1], velocity[:, 1], position[:, 0], velocity[:, 0], length)
+
+
+class CalibrationResult:
+    """
+    Class that holds the result of a calibration
+
+    Attributes
+    ----------
+    parameters : dict(str, double)
+        best parameter set found (calibrated and fixed parameters)
+    error : double
+        calibration error of the best parameter set
+    number_of_generations : int
+        number of generations of the optimizer
+    number_of_evaluations : int
+        number of simulated parameter sets
+    history : list(double)
+        best error after every generation
+    """
+
+    def __init__(self, parameters, error, number_of_generations, number_of_evaluations, history):
+        self.parameters = parameters
+        self.error = error
+        self.number_of_generations = number_of_generations
+        self.number_of_evaluations = number_of_evaluations
+        self.history = history
+
+
+def simulate_followers(trajectories, parameters, DriverType=IntelligentDriver, substeps=1):
+    """
+    Simulate the followers of a list of FollowingTrajectory objects behind their recorded leaders for P
+    parameter sets at once and return a list with the simulated gaps and velocities of every trajectory at its
+    sample times (arrays of shape (P, number of samples))
+
+    parameters is a dict of parameter arrays of shape (P,). All trajectories and parameter sets are advanced
+    together (shorter trajectories are padded with steps of length zero). Every follower starts in its
+    observed state, every sample interval is integrated with substeps steps of the classical Runge-Kutta
+    scheme, the leader is interpolated linearly between the samples. Velocities are kept nonnegative and gaps
+    are bounded away from zero, so parameter sets causing collisions get large errors instead of invalid
+    values.
+    """
+    number_of_samples = max(len(trajectory.times) for trajectory in trajectories)
+
+    def pad(values):
+        return np.stack([np.concatenate((value, np.full(number_of_samples - len(value), value[-1])))
+                         for value in values], axis=-1)
+
+    leader_position = pad([trajectory.leader_position for trajectory in trajectories])
+    leader_velocity = pad([trajectory.leader_velocity for trajectory in trajectories])
+    step_sizes = np.diff(pad([trajectory.times for trajectory in trajectories]), axis=0) / substeps
+    length = np.array([trajectory.length for trajectory in trajectories])
+    # parameters of shape (P, 1) broadcast against states of shape (P, number of trajectories)
+    parameters = {name: np.asarray(values, dtype=float)[:, np.newaxis] for name, values in parameters.items()}
+    number_of_sets = len(next(iter(parameters.values())))
+
+    def get_accelerations(position, velocity, predecessor_position, predecessor_velocity):
+        distance = np.maximum(predecessor_position - position - length, 1e-2)
+        return DriverType.get_desired_accelerations(parameters, slice(None), velocity,
+                                                    predecessor_velocity - velocity, distance)
+
+    position = np.tile(np.array([trajectory.follower_position[0] for trajectory in trajectories]),
+                       (number_of_sets, 1))
+    velocity = np.tile(np.array([trajectory.follower_velocity[0] for trajectory in trajectories]),
+                       (number_of_sets, 1))
+    gap = np.empty((number_of_samples,) + position.shape)
+    simulated_velocity = np.empty((number_of_samples,) + position.shape)
+    gap[0] = leader_position[0] - position - length
+    simulated_velocity[0] = velocity
+    for i in range(1, number_of_samples):
+        h = step_sizes[i - 1]
+
+        def leader(theta):
+            return ((1. - theta) * leader_position[i - 1] + theta * leader_position[i],
+                    (1. - theta) * leader_velocity[i - 1] + theta * leader_velocity[i])
+
+        for j in range(substeps):
+            start, middle, end = leader(j / substeps), leader((j + 0.5) / substeps), leader((j + 1.) / substeps)
+            k1_position, k1_velocity = velocity, get_accelerations(position, velocity, *start)
+            k2_position = velocity + h/2. * k1_velocity
+            k2_velocity = get_accelerations(position + h/2. * k1_position, k2_position, *middle)
+            k3_position = velocity + h/2. * k2_velocity
+            k3_velocity = get_accelerations(position + h/2. * k2_position, k3_position, *middle)
+            k4_position = velocity + h * k3_velocity
+            k4_velocity = get_accelerations(position + h * k3_position, k4_position, *end)
+            position = position + h/6. * (k1_position + 2.*k2_position + 2.*k3_position + k4_position)
+            velocity = np.maximum(velocity + h/6. * (k1_velocity + 2.*k2_velocity + 2.*k3_velocity + k4_velocity),
+                                  0.)
+        gap[i] = leader_position[i] - position - length
+        simulated_velocity[i] = velocity
+    return [(gap[:len(trajectory.times), :, k].T, simulated_velocity[:len(trajectory.times), :, k].T)
+            for k, trajectory in enumerate(trajectories)]
+
+
+def get_calibration_errors(trajectories, parameters, DriverType=IntelligentDriver, speed_weight=1., substeps=1):
+    """
+    Return the calibration error of P parameter sets (dict of arrays of shape (P,)) for a list of observed
+    FollowingTrajectory objects
+
+    The error of a trajectory is the root mean square error of the gap relative to the mean observed gap plus
+    speed_weight times the same relative error of the velocity, the errors of all trajectories are averaged.
+    """
+    errors = 0.
+    for trajectory, (gap, velocity) in zip(trajectories, simulate_followers(trajectories, parameters, DriverType,
+                                                                            substeps)):
+        gap_error = np.sqrt(np.mean((gap - trajectory.gap)**2, axis=-1)) / np.mean(np.abs(trajectory.gap))
+        velocity_error = np.sqrt(np.mean((velocity - trajectory.follower_velocity)**2, axis=-1)) \
+            / max(np.mean(np.abs(trajectory.follower_velocity)), 1e-12)
+        errors = errors + gap_error + speed_weight * velocity_error
+    errors = errors / len(trajectories)
+    return np.where(np.isfinite(errors), errors, np.inf)
+
+
+_calibration_settings = None
+
+
+def _initialize_worker(settings):
+    # the trajectories are sent once per process, not once per generation
+    global _calibration_settings
+    _calibration_settings = settings
+
+
+def _get_errors_in_worker(parameters):
+    return get_calibration_errors(parameters=parameters, **_calibration_settings)
+
+
+def calibrate(trajectories, bounds=None, fixed=None, DriverType=IntelligentDriver, speed_weight=1., substeps=1,
+              population_size=48, generations=200, mutation=0.7, crossover=0.9, tolerance=1e-8, seed=None,
+              number_of_processes=1, callback=None):
+    """
+    Fit the parameters of DriverType to the observed FollowingTrajectory objects with differential evolution
+    and return the CalibrationResult
+
+    bounds is a dict from the names of the calibrated parameters to (lower, upper) bounds (default:
+    intelligent_driver_bounds for all parameters of DriverType that are not fixed; parameters without such a
+    bound, e.g. tau of Krauss drivers, raise a ValueError and need explicit bounds), fixed a dict of the values
+    of the other parameters. Every generation simulates the whole population as one batch; with
+    number_of_processes > 1 (None for one process per core) the population is split into one batch per
+    process. The optimization stops after generations generations or as soon as the errors of the population
+    differ by less than tolerance.
+    callback(generation, parameters, error) is called with the best parameter set after every generation.
+    """
+    if bounds is None:
+        calibrated = [name for name in DriverType.parameter_names if name not in (fixed or {})]
+        unbounded = [name for name in calibrated if name not in intelligent_driver_bounds]
+        if unbounded:
+            raise ValueError('no default bounds for the parameters {} of {}, pass bounds (or fix them)'.format(
+                unbounded, DriverType.__name__))
+        bounds = {name: intelligent_driver_bounds[name] for name in calibrated}
+    fixed = dict(fixed or {})
+    names = list(bounds)
+    missing = [name for name in DriverType.parameter_names if name not in bounds and name not in fixed]
+    if missing:
+        raise ValueError('parameters {} are neither calibrated nor fixed'.format(missing))
+    lower = np.array([bounds[name][0] for name in names], dtype=float)
+    upper = np.array([bounds[name][1] for name in names], dtype=float)
+    generator = np.random.default_rng(seed)
+    settings = dict(trajectories=trajectories, DriverType=DriverType, speed_weight=speed_weight, substeps=substeps)
+
+    def to_parameters(population):
+        parameters = {name: population[:, i] for i, name in enumerate(names)}
+        for name, value in fixed.items():
+            parameters[name] = np.full(len(population), float(value))
+        return parameters
+
+    def get_parameter_set(member):
+        return {name: float(values[0]) for name, values in to_parameters(member[np.newaxis]).items()}
+
+    executor = None
+    if number_of_processes != 1:
+        number_of_batches = number_of_processes or os.cpu_count() or 1
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=number_of_batches,
+                                                          initializer=_initialize_worker, initargs=(settings,))
+
+    def evaluate(population):
+        if executor is None:
+            return get_calibration_errors(parameters=to_parameters(population), **settings)
+        batches = np.array_split(population, min(number_of_batches, len(population)))
+        return np.concatenate(list(executor.map(_get_errors_in_worker, [to_parameters(batch) for batch in batches])))
+
+    try:
+        population = lower + generator.random((population_size, len(names))) * (upper - lower)
+        errors = evaluate(population)
+        number_of_evaluations = population_size
+        history = []
+        for generation in range(1, generations + 1):
+            # rand/1/bin: mutate three distinct other members and cross over with the current member
+            others = np.array([generator.choice(np.delete(np.arange(population_size), i), 3, replace=False)
+                               for i in range(population_size)])
+            mutant = population[others[:, 0]] + mutation * (population[others[:, 1]] - population[others[:, 2]])
+            # reflect mutants that leave the bounds back into the box
+            mutant = np.where(mutant < lower, lower + (lower - mutant) % (upper - lower), mutant)
+            mutant = np.where(mutant > upper, upper - (mutant - upper) % (upper - lower), mutant)
+            crossed = generator.random(population.shape) < crossover
+            crossed[np.arange(population_size), generator.integers(len(names), size=population_size)] = True
+            trial = np.where(crossed, mutant, population)
+
+            trial_errors = evaluate(trial)
+            number_of_evaluations = number_of_evaluations + population_size
+            improved = trial_errors <= errors
+            population[improved] = trial[improved]
+            errors[improved] = trial_errors[improved]
+
+            best = int(np.argmin(errors))
+            history.append(float(errors[best]))
+            if callback is not None:
+                callback(generation, get_parameter_set(population[best]), errors[best])
+            if np.isfinite(errors).all() and np.max(errors) - np.min(errors) < tolerance:
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    best = int(np.argmin(errors))
+    return CalibrationResult(get_parameter_set(population[best]), float(errors[best]), len(history),
+                             number_of_evaluations, history)
@@ -0,0 +1,137 @@
+import concurrent.futures
+
+import numpy as np
+
+from trafficFlow.carFollowingModel.carFollowingModel import CarFollowingModel
+from trafficFlow.observables.steadyStateDetector import SteadyStateDetector
+from trafficFlow.runners.simulationRunner import SimulationRunner
+from trafficFlow.scenarios.ringScenario import create_ring_road
+from trafficFlow.utilities.timeDiscretizationSchemes.eulerSchemes import ExplicitEulerScheme
+
+
+class DensityResult:
+    """
+    Class that holds the steady state observables of a single ring scenario of a density sweep
+
+    Attributes
+    ----------
+    number_of_vehicles : int
+        number of vehicles on the lane
+    density : double
+        vehicles per meter
+    flow : double
+        vehicles per second passing a fixed point (averaged over the averaging window)
+    mean_velocity : double
+        mean velocity of the vehicles (averaged over the averaging window)
+    """
+
+    def __init__(self, number_of_vehicles, density, flow, mean_velocity):
+        self.number_of_vehicles = number_of_vehicles
+        self.density = density
+        self.flow = flow
+        self.mean_velocity = mean_velocity
+
+
+class FundamentalDiagram:
+    """
+    Class that holds the flow-density-speed relation assembled from a density sweep (sorted by density)
+
+    Attributes
+    ----------
+    number_of_vehicles : np.ndarray
+        number of vehicles on the lane of every scenario
+    density : np.ndarray
+        vehicles per meter
+    flow : np.ndarray
+        vehicles per second
+    mean_velocity : np.ndarray
+        mean velocity in meters per second
+    """
+
+    def __init__(self, results):
+        results = sorted(results, key=lambda result: result.density)
+        self.number_of_vehicles = np.array([result.number_of_vehicles for result in results])
+        self.density = np.array([result.density for result in results])
+        self.flow = np.array([result.flow for result in results])
+        self.mean_velocity = np.array([result.mean_velocity for result in results])
+
+
+_sweep_settings = None
+
+
+def _initialize_worker(settings):
+    # the settings (including the driver parameters) are sent once per process, not once per scenario
+    global _sweep_settings
+    _sweep_settings = settings
+
+
+def simulate_density(number_of_vehicles, full_length=1000., parameters=None, dt=1e-1, t_end=600.,
+                     averaging_time=100., equilibrium=False, steady_state_window=None):
+    """
+    Simulate number_of_vehicles identical intelligent drivers on a ring of length full_length until t_end and
+    return the DensityResult averaged over the last averaging_time seconds
+
+    If equilibrium is true, the vehicles start in uniform flow instead of standing. If steady_state_window is
+    given, the transient ends as soon as a SteadyStateDetector with this window length (in steps) detects a
+    steady state, and the averaging starts right away.
+    """
+    road = create_ring_road(number_of_vehicles, full_length=full_length, equilibrium=equilibrium,
+                            **(parameters or {}))
+    model = CarFollowingModel(road)
+    runner = SimulationRunner(model, ExplicitEulerScheme(model.create_right_hand_side), dt=dt)
+    if steady_state_window is not None:
+        detector = SteadyStateDetector(model, window_length=steady_state_window)
+        runner.add_observer(detector)
+        runner.run(t_end - averaging_time)
+        runner.observers.remove((1, detector))
+        t_end = runner.time + averaging_time
+    else:
+        runner.run(t_end - averaging_time)
+
+    velocity_sums = []
+    runner.add_observer(lambda runner: velocity_sums.append(np.sum(road.state.velocity)))
+    runner.run(t_end)
+
+    mean_velocity = np.mean(velocity_sums) / number_of_vehicles
+    density = number_of_vehicles / full_length
+    return DensityResult(number_of_vehicles, density, density * mean_velocity, mean_velocity)
+
+
+def _simulate_density_in_worker(number_of_vehicles):
+    return simulate_density(number_of_vehicles, **_sweep_settings)
+
+
+def sweep_densities(vehicle_counts, full_length=1000., parameters=None, dt=1e-1, t_end=600., averaging_time=100.,
+                    number_of_processes=None, equilibrium=False, steady_state_window=None):
+    """
+    Simulate a ring scenario for every number of vehicles in vehicle_counts on a pool of processes and yield
+    the DensityResult of every scenario as soon as it is finished
+
+    parameters is a dict of (scalar) arguments of create_ring_road such as s_0, v_0, T; it is passed to every
+    worker process once. The most expensive scenarios (most vehicles) are submitted first to balance the load.
+    equilibrium and steady_state_window are passed to simulate_density.
+    """
+    settings = dict(full_length=full_length, parameters=parameters, dt=dt, t_end=t_end,
+                    averaging_time=averaging_time, equilibrium=equilibrium, steady_state_window=steady_state_window)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=number_of_processes, initializer=_initialize_worker,
+                                                initargs=(settings,)) as executor:
+        futures = [executor.submit(_simulate_density_in_worker, number_of_vehicles)
+                   for number_of_vehicles in sorted(vehicle_counts, reverse=True)]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+
+def compute_fundamental_diagram(vehicle_counts, full_length=1000., parameters=None, dt=1e-1, t_end=600.,
+                                averaging_time=100., number_of_processes=None, callback=None, equilibrium=False,
+                                steady_state_window=None):
+    """
+    Run sweep_densities and assemble the FundamentalDiagram (callback(result) is called for every finished
+    scenario, e.g. to report progress)
+    """
+    results = []
+    for result in sweep_densities(vehicle_counts, full_length, parameters, dt, t_end, averaging_time,
+                                  number_of_processes, equilibrium, steady_state_window):
+        if callback is not None:
+            callback(result)
+        results.append(result)
+    return FundamentalDiagram(results)
@@ -0,0 +1,198 @@
+import itertools
+
+import numpy as np
+
+from trafficFlow.carFollowingModel.drivers.intelligentDriver import IntelligentDriver
+
+
+class RingStability:
+    """
+    Class that holds the linear stability of homogeneous rings for P parameter sets
+
+    Every vehicle follows its predecessor (the next vehicle on the lane) with the same parameters, so the
+    Jacobian of the right hand side in uniform flow is block circulant and its eigenvalues are those of the
+    2x2 symbols of the modes with wavenumbers 2 pi m / full_length, m = 0,..., number_of_vehicles // 2 (the
+    modes with larger m are the complex conjugates of these). A perturbation of mode m grows like
+    exp(growth_rate t).
+
+    Attributes
+    ----------
+    parameters : dict(str, np.ndarray)
+        driver parameters of every parameter set, shape (P,)
+    number_of_vehicles : int
+        number of vehicles on the ring
+    full_length : double
+        length of the ring
+    velocity : np.ndarray
+        equilibrium velocity of every parameter set
+    gap : np.ndarray
+        equilibrium gap of every parameter set
+    d_distance, d_velocity, d_speed_difference : np.ndarray
+        partial derivatives of the acceleration in the equilibrium
+    wavenumbers : np.ndarray
+        wavenumbers of the modes in 1/m, shape (number_of_vehicles // 2 + 1,)
+    eigenvalues : np.ndarray
+        both eigenvalues of every mode, shape (P, number_of_vehicles // 2 + 1, 2)
+    growth_rates : np.ndarray
+        largest real part of the eigenvalues of every mode, shape (P, number_of_vehicles // 2 + 1)
+    maximum_growth_rate : np.ndarray
+        largest growth rate of all modes except the translation mode m = 0
+    most_unstable_wavenumber : np.ndarray
+        wavenumber with the largest growth rate
+    linearly_stable : np.ndarray
+        true if no mode grows (up to the tolerance)
+    tolerance : double
+        growth rate up to which a mode counts as stable (rounding errors of the eigenvalues)
+    string_stable : np.ndarray
+        true if the criterion of string stability for long platoons holds (f_v^2 / 2 - f_dv f_v - f_s >= 0
+        with the derivatives f_v, f_dv, f_s with respect to the velocity, the speed difference and the distance),
+        a ring is linearly stable for every number of vehicles if it is string stable
+
+    Methods
+    -------
+    get_unstable_wavenumbers(index)
+        return the wavenumbers of the growing modes of the parameter set index
+    """
+
+    def __init__(self, parameters, number_of_vehicles, full_length, velocity, gap, d_distance, d_velocity,
+                 d_speed_difference, tolerance=1e-9):
+        self.parameters = parameters
+        self.number_of_vehicles = number_of_vehicles
+        self.full_length = full_length
+        self.velocity = velocity
+        self.gap = gap
+        self.d_distance = d_distance
+        self.d_velocity = d_velocity
+        self.d_speed_difference = d_speed_difference
+        self.tolerance = tolerance
+
+        self.eigenvalues = get_ring_spectrum(d_distance, d_velocity, d_speed_difference, number_of_vehicles)
+        self.wavenumbers = 2. * np.pi * np.arange(self.eigenvalues.shape[-2]) / full_length
+        self.growth_rates = np.max(self.eigenvalues.real, axis=-1)
+        if self.growth_rates.shape[-1] > 1:
+            self.maximum_growth_rate = np.max(self.growth_rates[..., 1:], axis=-1)
+            self.most_unstable_wavenumber = self.wavenumbers[1 + np.argmax(self.growth_rates[..., 1:], axis=-1)]
+        else:
+            self.maximum_growth_rate = np.zeros(len(velocity))
+            self.most_unstable_wavenumber = np.zeros(len(velocity))
+        self.linearly_stable = self.maximum_growth_rate <= tolerance
+        self.string_stable = d_velocity**2 / 2. - d_speed_difference * d_velocity - d_distance >= -tolerance
+
+    def get_unstable_wavenumbers(self, index):
+        unstable = self.growth_rates[index] > self.tolerance
+        unstable[0] = False
+        return self.wavenumbers[unstable]
+
+
+def get_ring_spectrum(d_distance, d_velocity, d_speed_difference, number_of_vehicles):
+    """
+    Return the eigenvalues of the Jacobian of homogeneous rings with the given partial derivatives of the
+    accelerations (arrays of shape (P,)) as array of shape (P, number_of_vehicles // 2 + 1, 2)
+
+    The symbols of the modes are the discrete Fourier transforms of the first block row of the block circulant
+    Jacobian (O(N log N) operations per parameter set), the two eigenvalues of every 2x2 symbol are computed
+    from its trace and determinant.
+    """
+    d_distance, d_velocity, d_speed_difference = np.broadcast_arrays(np.atleast_1d(d_distance),
+                                                                     np.atleast_1d(d_velocity),
+                                                                     np.atleast_1d(d_speed_difference))
+    number_of_sets = len(d_distance)
+    # blocks of the first block row: the acceleration depends on the own state (block 0) and on the state of
+    # the predecessor (block 1); the derivative of the position is the velocity
+    blocks = np.zeros((number_of_sets, number_of_vehicles, 2, 2))
+    blocks[:, 0, 0, 1] = 1.
+    blocks[:, 0, 1, 0] = -d_distance
+    blocks[:, 0, 1, 1] = d_velocity - d_speed_difference
+    blocks[:, 1 % number_of_vehicles, 1, 0] += d_distance
+    blocks[:, 1 % number_of_vehicles, 1, 1] += d_speed_difference
+    symbols = number_of_vehicles * np.fft.ifft(blocks, axis=1)[:, :number_of_vehicles // 2 + 1]
+
+    trace = symbols[..., 0, 0] + symbols[..., 1, 1]
+    determinant = symbols[..., 0, 0] * symbols[..., 1, 1] - symbols[..., 0, 1] * symbols[..., 1, 0]
+    root = np.sqrt(trace**2 / 4. - determinant + 0j)
+    return np.stack((trace / 2. + root, trace / 2. - root), axis=-1)
+
+
+def get_ring_equilibrium(DriverType, parameters, gap, iterations=60):
+    """
+    Return the velocities at which drivers of class DriverType with the given parameter arrays (shape (P,))
+    keep the gaps gap behind a predecessor driving at the same speed (0 if they brake even when standing)
+    """
+    number_of_sets = len(gap)
+    indices = np.arange(number_of_sets)
+
+    def get_accelerations(velocity):
+        return DriverType.get_desired_accelerations(parameters, indices, velocity, np.zeros(number_of_sets), gap)
+
+    lower = np.zeros(number_of_sets)
+    upper = np.ones(number_of_sets)
+    for i in range(iterations):
+        accelerating = get_accelerations(upper) > 0.
+        if not np.any(accelerating):
+            break
+        lower = np.where(accelerating, upper, lower)
+        upper = np.where(accelerating, 2. * upper, upper)
+    for i in range(iterations):
+        middle = (lower + upper) / 2.
+        accelerating = get_accelerations(middle) > 0.
+        lower = np.where(accelerating, middle, lower)
+        upper = np.where(accelerating, upper, middle)
+    return np.where(get_accelerations(np.zeros(number_of_sets)) > 0., lower, 0.)
+
+
+def create_parameter_grid(**values):
+    """
+    Return the parameter arrays of all combinations of the given values (e.g. T=[1., 1.5], a=[0.5, 1.])
+    """
+    names = list(values)
+    combinations = list(itertools.product(*[np.atleast_1d(values[name]) for name in names]))
+    return {name: np.array([combination[i] for combination in combinations], dtype=float)
+            for i, name in enumerate(names)}
+
+
+def analyse_ring_stability(number_of_vehicles, full_length=1000., DriverType=IntelligentDriver, length=4.,
+                           tolerance=1e-9, **parameters):
+    """
+    Compute the equilibrium and the linear stability of number_of_vehicles identical drivers of class
+    DriverType on a ring of length full_length for every parameter set and return the RingStability
+
+    The parameters are scalars or arrays of the same length P (e.g. from create_parameter_grid), all
+    parameters in DriverType.parameter_names are required. The vehicle length can be an array as well.
+    """
+    missing = [name for name in DriverType.parameter_names if name not in parameters]
+    if missing:
+        raise ValueError('missing parameters {} of {}'.format(missing, DriverType.__name__))
+    arrays = np.broadcast_arrays(*[np.asarray(parameters[name], dtype=float) for name in DriverType.parameter_names],
+                                 np.asarray(length, dtype=float))
+    arrays = [np.atleast_1d(array).ravel() for array in arrays]
+    parameters = dict(zip(DriverType.parameter_names, arrays[:-1]))
+    gap = full_length / number_of_vehicles - arrays[-1]
+    indices = np.arange(len(gap))
+
+    velocity = get_ring_equilibrium(DriverType, parameters, gap)
+    d_velocity, d_speed_difference, d_distance = DriverType.get_desired_acceleration_derivatives(
+        parameters, indices, velocity, np.zeros(len(gap)), gap)
+    return RingStability(parameters, number_of_vehicles, full_length, velocity, gap, d_distance, d_velocity,
+                         d_speed_difference, tolerance)
+
+
+def analyse_road_stability(road, tolerance=1e-9):
+    """
+    Analyse the linear stability of every lane of a circular road and return a list with the RingStability
+    (with a single parameter set) of every lane (a ValueError is raised if the drivers on a lane differ)
+    """
+    state = road.state
+    results = []
+    for lane in road.lanes:
+        indices = lane.get_vehicle_indices()
+        models = state.model[indices]
+        if len(indices) == 0 or np.any(models != models[0]):
+            raise ValueError('lane {} is empty or carries several driver types'.format(lane.index))
+        DriverType = state.driver_types[models[0]]
+        parameters = {name: state.arrays[name][indices] for name in DriverType.parameter_names}
+        for name, values in list(parameters.items()) + [('length', state.length[indices])]:
+            if np.any(values != values[0]):
+                raise ValueError('the drivers on lane {} differ in {}'.format(lane.index, name))
+        results.append(analyse_ring_stability(len(indices), lane.full_length, DriverType, state.length[indices[0]],
+                                              tolerance, **{name: values[0] for name, values in parameters.items()}))
+    return results
@@ -0,0 +1,175 @@
+"""
+Benchmark of the hot path of the car following model
+
+Measures create_right_hand_side and simulate_one_step on ring roads for all combinations of the given vehicle
+counts, lane counts and time discretization schemes, reports steps per second, nanoseconds per vehicle and step
+and the peak memory of building the road and performing a step, and optionally compares the results with a
+stored baseline (the exit code is 1 if a case got slower than the tolerance allows).
+
+Example: python -m trafficFlow.benchmark --vehicles 1000 100000 --output current.json --baseline baseline.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from trafficFlow.carFollowingModel.carFollowingModel import CarFollowingModel
+from trafficFlow.carFollowingModel.drivers.intelligentDriver import IntelligentDriver
+from trafficFlow.carFollowingModel.lanes.simpleLane import SimpleLane
+from trafficFlow.carFollowingModel.roads.circularRoad import CircularRoad
+from trafficFlow.utilities.timeDiscretizationSchemes.schemeRegistry import time_discretization_schemes
+
+
+def create_benchmark_road(number_of_vehicles, number_of_lanes=1, spacing=25.):
+    """
+    Create a circular road with number_of_lanes lanes carrying number_of_vehicles intelligent drivers each (in
+    bulk, without driver objects) at the given mean spacing
+    """
+    road = CircularRoad()
+    for i in range(number_of_lanes):
+        lane = SimpleLane(full_length=number_of_vehicles * spacing)
+        road.add_lane(lane)
+        lane.add_vehicles(number_of_vehicles, IntelligentDriver, s_0=2., v_0=30., delta=4., T=1., a=1., b=1.5)
+    road.initialize_default()
+    return road
+
+
+def _time_calls(function, min_time, repeat):
+    # best mean time per call over repeat runs of at least min_time seconds (and at least three calls)
+    best = np.inf
+    for i in range(repeat):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            function()
+            calls = calls + 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time and calls >= 3:
+                break
+        best = min(best, elapsed / calls)
+    return best
+
+
+def _measure_peak_memory(number_of_vehicles, number_of_lanes, scheme):
+    tracemalloc.start()
+    road = create_benchmark_road(number_of_vehicles, number_of_lanes)
+    model = CarFollowingModel(road)
+    model.simulate_one_step(time_discretization_schemes[scheme](model), 0., 1e-1)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def benchmark_case(number_of_vehicles, number_of_lanes, scheme, dt=1e-1, min_time=0.2, repeat=3):
+    """
+    Benchmark a single ring road and return the results as a dict
+    """
+    road = create_benchmark_road(number_of_vehicles, number_of_lanes)
+    model = CarFollowingModel(road)
+    time_discretization_scheme = time_discretization_schemes[scheme](model)
+    total_vehicles = number_of_vehicles * number_of_lanes
+    y = road.state.get_y()
+
+    right_hand_side_time = _time_calls(lambda: model.create_right_hand_side(0., y), min_time, repeat)
+    steps = [0]
+
+    def step():
+        model.simulate_one_step(time_discretization_scheme, steps[0] * dt, dt)
+        steps[0] = steps[0] + 1
+
+    step_time = _time_calls(step, min_time, repeat)
+    return {'vehicles_per_lane': number_of_vehicles,
+            'lanes': number_of_lanes,
+            'scheme': scheme,
+            'vehicles': total_vehicles,
+            'right_hand_side_seconds': right_hand_side_time,
+            'right_hand_side_ns_per_vehicle': right_hand_side_time / total_vehicles * 1e9,
+            'step_seconds': step_time,
+            'steps_per_second': 1. / step_time,
+            'step_ns_per_vehicle': step_time / total_vehicles * 1e9,
+            'peak_memory_bytes': _measure_peak_memory(number_of_vehicles, number_of_lanes, scheme),
+            'finite': bool(np.all(np.isfinite(road.state.get_y())))}
+
+
+def get_case_key(result):
+    """
+    Return the key identifying the case of a benchmark result (used to match results with a baseline)
+    """
+    return '{}x{}/{}'.format(result['vehicles_per_lane'], result['lanes'], result['scheme'])
+
+
+def compare_with_baseline(results, baseline, tolerance=0.2):
+    """
+    Return the keys of the cases whose time per vehicle and step (or evaluation of the right hand side) grew by
+    more than the relative tolerance compared to the baseline, together with the ratios of the step times
+    """
+    baseline_cases = {get_case_key(result): result for result in baseline['results']}
+    regressions, ratios = [], {}
+    for result in results:
+        key = get_case_key(result)
+        if key not in baseline_cases:
+            continue
+        reference = baseline_cases[key]
+        ratios[key] = result['step_ns_per_vehicle'] / reference['step_ns_per_vehicle']
+        right_hand_side_ratio = result['right_hand_side_ns_per_vehicle'] / reference['right_hand_side_ns_per_vehicle']
+        if ratios[key] > 1. + tolerance or right_hand_side_ratio > 1. + tolerance:
+            regressions.append(key)
+    return regressions, ratios
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(prog='python -m trafficFlow.benchmark',
+                                     description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--vehicles', type=int, nargs='+', default=[10, 100, 1000, 10000, 100000, 1000000],
+                        help='numbers of vehicles per lane')
+    parser.add_argument('--lanes', type=int, nargs='+', default=[1, 2], help='numbers of lanes')
+    parser.add_argument('--schemes', nargs='+', choices=sorted(time_discretization_schemes),
+                        default=['euler', 'rk4', 'linearly-implicit-euler'], help='time discretization schemes')
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimum duration of a timing run in seconds')
+    parser.add_argument('--repeat', type=int, default=3, help='number of timing runs per case (the best counts)')
+    parser.add_argument('--output', default=None, help='JSON file to write the results to')
+    parser.add_argument('--baseline', default=None, help='JSON file with results to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='relative slowdown compared to the baseline that counts as regression')
+    return parser
+
+
+def main(argv=None):
+    arguments = create_parser().parse_args(argv)
+    results = []
+    print('{:>20} {:>14} {:>14} {:>14} {:>12}'.format('case', 'steps/s', 'step ns/veh', 'rhs ns/veh', 'peak MiB'))
+    for scheme in arguments.schemes:
+        for number_of_lanes in arguments.lanes:
+            for number_of_vehicles in arguments.vehicles:
+                result = benchmark_case(number_of_vehicles, number_of_lanes, scheme, min_time=arguments.min_time,
+                                        repeat=arguments.repeat)
+                results.append(result)
+                print('{:>20} {:>14.1f} {:>14.1f} {:>14.1f} {:>12.1f}'.format(
+                    get_case_key(result), result['steps_per_second'], result['step_ns_per_vehicle'],
+                    result['right_hand_side_ns_per_vehicle'], result['peak_memory_bytes'] / 2.**20))
+
+    report = {'environment': {'python': platform.python_version(), 'numpy': np.__version__,
+                              'machine': platform.machine(), 'system': platform.system()},
+              'results': results}
+    if arguments.output is not None:
+        with open(arguments.output, 'w') as output_file:
+            json.dump(report, output_file, indent=1)
+
+    if arguments.baseline is not None:
+        with open(arguments.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions, ratios = compare_with_baseline(results, baseline, arguments.tolerance)
+        for key, ratio in ratios.items():
+            print('{:>20} {:>8.2f}x baseline{}'.format(key, ratio, '  REGRESSION' if key in regressions else ''))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import numpy as np
+
+from trafficFlow.utilities.linearSolvers.cyclicBidiagonalSolver import solve_cyclic_bidiagonal
+
+
+class CarFollowingJacobian:
+    """
+    Class that represents the Jacobian of the right hand side of the car following model
+
+    With y = (positions, velocities) the derivative of the positions is the identity in the velocity block and
+    the acceleration of every vehicle only depends on its own position and velocity and on those of its
+    predecessor, so every row of the acceleration block has (at most) two nonzeros in each half.
+
+    Attributes
+    ----------
+    predecessor : np.ndarray
+        index of the predecessor of every vehicle (-1 if there is none)
+    cycle_length : np.ndarray
+        number of vehicles on the lane of every vehicle (length of the predecessor cycle)
+    d_distance : np.ndarray
+        derivative of the accelerations with respect to the distance to the predecessor
+    d_velocity : np.ndarray
+        derivative of the accelerations with respect to the own velocity
+    d_predecessor_velocity : np.ndarray
+        derivative of the accelerations with respect to the velocity of the predecessor
+
+    Methods
+    -------
+    dot(z)
+        return the product of the Jacobian and the vector z
+    solve(gamma, right_hand_side)
+        solve (I - gamma * J) z = right_hand_side in O(N log N) operations
+    """
+
+    def __init__(self, predecessor, cycle_length, d_distance, d_velocity, d_predecessor_velocity):
+        self.predecessor = predecessor
+        self.cycle_length = cycle_length
+        self.d_distance = d_distance
+        self.d_velocity = d_velocity
+        self.d_predecessor_velocity = d_predecessor_velocity
+
+    def _split(self, z):
+        number_of_vehicles = len(self.predecessor)
+        return z[..., :number_of_vehicles], z[..., number_of_vehicles:]
+
+    def _at_predecessor(self, z):
+        return np.where(self.predecessor >= 0, z[..., self.predecessor], 0.)
+
+    def dot(self, z):
+        z_position, z_velocity = self._split(z)
+        return np.concatenate((z_velocity,
+                               self.d_distance * (self._at_predecessor(z_position) - z_position)
+                               + self.d_velocity * z_velocity
+                               + self.d_predecessor_velocity * self._at_predecessor(z_velocity)), axis=-1)
+
+    def solve(self, gamma, right_hand_side):
+        # eliminate the positions with z_position = r_position + gamma * z_velocity
+        r_position, r_velocity = self._split(right_hand_side)
+        diagonal = 1. + gamma**2 * self.d_distance - gamma * self.d_velocity
+        off_diagonal = -gamma**2 * self.d_distance - gamma * self.d_predecessor_velocity
+        reduced_right_hand_side = r_velocity + gamma * self.d_distance * (self._at_predecessor(r_position)
+                                                                          - r_position)
+        z_velocity = solve_cyclic_bidiagonal(diagonal, off_diagonal, self.predecessor, reduced_right_hand_side,
+                                             self.cycle_length)
+        return np.concatenate((r_position + gamma * z_velocity, z_velocity), axis=-1)
@@ -1,5 +1,7 @@
 import numpy as np
 
+from .carFollowingJacobian import CarFollowingJacobian
+
 
 class CarFollowingModel:
     """
@@ -9,34 +11,196 @@ class CarFollowingModel:
     ----------
     road : Road
         the road to simulate on (needed to get the vehicles, the number of vehicles and correct positions)
+    lane_change_model : LaneChangeModel
+        model deciding on lane changes after every step (None if the vehicles keep their lanes)
+    profiler : Profiler
+        profiler measuring the phases of every step (gathering the state, time discretization scheme, right
+        hand side, scattering the state, boundary conditions, lane changes) and counting evaluations of the
+        right hand side and rejected steps (None to disable profiling)
 
     Methods
     -------
     create_right_hand_side(t, y)
         computes right hand side of the ordinary differential equation using the desired acceleration of the vehicles
-        and the current value of the solution
+        and the current value of the solution (only depends on t and y, not on the vehicle state of the road)
+    get_number_of_vehicles()
+        return the number of vehicles (length of the position and velocity blocks of y)
+    get_parameters()
+        return the dict of driver parameter arrays passed to the kernels of the driver classes
+    get_accelerations(position, velocity)
+        computes the desired accelerations of all vehicles for the given positions and velocities, calling the
+        vectorized kernel of every driver class once
+    get_desired_accelerations(indices, velocity, speed_difference, distance)
+        computes the desired accelerations of the vehicles in the slots indices for arbitrary velocities,
+        speed differences and distances (e.g. to evaluate hypothetical lane changes)
+    get_interaction(position, velocity)
+        return the distances to and the speed differences with the predecessors of all vehicles
+    get_partial_accelerations(indices, position, velocity, predecessor_position, predecessor_velocity)
+        computes the desired accelerations of the vehicles in the slots indices from their positions and
+        velocities and those of their predecessors (e.g. for multirate schemes advancing only some vehicles)
+    create_jacobian(t, y)
+        computes the (cyclic banded) Jacobian of the right hand side at y, used by implicit time
+        discretization schemes
     simulate_one_step(time_discretization_scheme, t, dt)
         simulate a single step of the car following model using a time step of length dt
-        and update position and velocity of the vehicles
+        and update position and velocity of the vehicles in the vehicle state of the road, afterwards
+        the lane change model (if any) is applied
     """
 
-    def __init__(self, road):
+    def __init__(self, road, lane_change_model=None, profiler=None):
         self.road = road
+        self.lane_change_model = lane_change_model
+        self.profiler = profiler
+
+    def get_number_of_vehicles(self):
+        return self.road.state.number_of_vehicles
+
+    def get_parameters(self):
+        return self.road.state.arrays
 
     def create_right_hand_side(self, t, y):
-        acceleration = []
-        for lane in self.road.lanes:
-            for vehicle in lane.vehicles:
-                acceleration.append(vehicle.get_desired_acceleration())
-        return np.concatenate((y[self.road.get_number_of_vehicles():], acceleration))
+        if self.profiler is not None:
+            start = self.profiler.start()
+        number_of_vehicles = self.get_number_of_vehicles()
+        position = y[..., :number_of_vehicles]
+        velocity = y[..., number_of_vehicles:]
+        right_hand_side = np.concatenate((velocity, self.get_accelerations(position, velocity)), axis=-1)
+        if self.profiler is not None:
+            self.profiler.stop('right_hand_side', start)
+            self.profiler.count('right_hand_side_evaluations')
+        return right_hand_side
+
+    def _get_interaction(self, position, velocity):
+        state = self.road.state
+        predecessor = state.predecessor
+        distance = self.road.get_distances(position[..., predecessor], position, state.lane, state.lane) \
+            - state.length
+        speed_difference = velocity[..., predecessor] - velocity
+        return self._correct_interaction(np.arange(len(predecessor)), predecessor, state.lane, state.length,
+                                         distance, speed_difference)
+
+    def _correct_interaction(self, indices, predecessor, lane, length, distance, speed_difference):
+        if self.road.periodic:
+            # a vehicle alone on its lane follows itself at the distance of a full lap
+            alone = predecessor == indices
+            if np.any(alone):
+                distance = np.where(alone, self.road.get_lane_lengths()[lane] - length, distance)
+        else:
+            # the first vehicle of a lane (and free slots) drive on a free road
+            leading = predecessor < 0
+            distance = np.where(leading, np.inf, distance)
+            speed_difference = np.where(leading, 0., speed_difference)
+        return distance, speed_difference
+
+    def get_interaction(self, position, velocity):
+        return self._get_interaction(position, velocity)
+
+    def get_partial_accelerations(self, indices, position, velocity, predecessor_position, predecessor_velocity):
+        state = self.road.state
+        lane = state.lane[indices]
+        length = state.length[indices]
+        predecessor = state.predecessor[indices]
+        distance = self.road.get_distances(predecessor_position, position, lane, lane) - length
+        distance, speed_difference = self._correct_interaction(indices, predecessor, lane, length, distance,
+                                                               predecessor_velocity - velocity)
+        if self.profiler is not None:
+            self.profiler.count('partial_right_hand_side_vehicles', len(indices))
+        return self.get_desired_accelerations(indices, velocity, speed_difference, distance)
+
+    def get_accelerations(self, position, velocity):
+        state = self.road.state
+        parameters = self.get_parameters()
+        if self.profiler is not None:
+            start = self.profiler.start()
+        distance, speed_difference = self._get_interaction(position, velocity)
+        if self.profiler is not None:
+            self.profiler.stop('interaction', start)
+        acceleration = np.empty_like(velocity)
+        for model, DriverType in enumerate(state.driver_types):
+            indices = state.get_model_indices(model)
+            acceleration[..., indices] = DriverType.get_desired_accelerations(parameters, indices,
+                                                                              velocity[..., indices],
+                                                                              speed_difference[..., indices],
+                                                                              distance[..., indices])
+        if state.number_of_free_slots:
+            acceleration = np.where(state.lane >= 0, acceleration, 0.)
+        return acceleration
+
+    def get_desired_accelerations(self, indices, velocity, speed_difference, distance):
+        state = self.road.state
+        parameters = self.get_parameters()
+        acceleration = np.empty(len(indices))
+        models = state.model[indices]
+        for model, DriverType in enumerate(state.driver_types):
+            selected = models == model
+            acceleration[selected] = DriverType.get_desired_accelerations(parameters, indices[selected],
+                                                                          velocity[selected],
+                                                                          speed_difference[selected],
+                                                                          distance[selected])
+        return acceleration
+
+    def create_jacobian(self, t, y):
+        if self.profiler is not None:
+            self.profiler.count('jacobian_evaluations')
+        state = self.road.state
+        parameters = self.get_parameters()
+        number_of_vehicles = self.get_number_of_vehicles()
+        velocity = y[..., number_of_vehicles:]
+        distance, speed_difference = self._get_interaction(y[..., :number_of_vehicles], velocity)
+        d_distance = np.empty_like(velocity)
+        d_velocity = np.empty_like(velocity)
+        d_speed_difference = np.empty_like(velocity)
+        for model, DriverType in enumerate(state.driver_types):
+            indices = state.get_model_indices(model)
+            d_velocity[..., indices], d_speed_difference[..., indices], d_distance[..., indices] = \
+                DriverType.get_desired_acceleration_derivatives(parameters, indices, velocity[..., indices],
+                                                                speed_difference[..., indices],
+                                                                distance[..., indices])
+        if state.number_of_free_slots:
+            occupied = state.lane >= 0
+            d_distance = np.where(occupied, d_distance, 0.)
+            d_velocity = np.where(occupied, d_velocity, 0.)
+            d_speed_difference = np.where(occupied, d_speed_difference, 0.)
+        lane = np.maximum(state.lane, 0)
+        cycle_length = np.bincount(lane, minlength=self.road.number_of_lanes)[lane]
+        return CarFollowingJacobian(state.predecessor, cycle_length, d_distance,
+                                    d_velocity - d_speed_difference, d_speed_difference)
 
     def simulate_one_step(self, time_discretization_scheme, t, dt):
-        y = []
-        for vehicle in self.road.get_vehicles():
-            y.append(vehicle.position)
-        for vehicle in self.road.get_vehicles():
-            y.append(vehicle.velocity)
+        if self.profiler is not None:
+            return self._simulate_one_step_profiled(time_discretization_scheme, t, dt)
+        state = self.road.state
+        state.set_y(time_discretization_scheme.apply(t, dt, state.get_y()))
+        state.position[:] = self.road.get_positions(state.position, state.lane)
+        self.road.apply_boundary_conditions(t + dt, dt)
+        if self.lane_change_model is not None:
+            self.lane_change_model.apply(self)
+
+    def _simulate_one_step_profiled(self, time_discretization_scheme, t, dt):
+        profiler = self.profiler
+        state = self.road.state
+        step_start = start = profiler.start()
+        y = state.get_y()
+        profiler.stop('gather', start)
+
+        rejected_steps = getattr(time_discretization_scheme, 'number_of_rejected_steps', 0)
+        start = profiler.start()
         y = time_discretization_scheme.apply(t, dt, y)
-        for i, vehicle in enumerate(self.road.get_vehicles()):
-            vehicle.position = self.road.get_position(y[i], vehicle.lane)
-            vehicle.velocity = y[self.road.get_number_of_vehicles() + i]
+        profiler.stop('scheme', start)
+        profiler.count('rejected_steps',
+                       getattr(time_discretization_scheme, 'number_of_rejected_steps', 0) - rejected_steps)
+
+        start = profiler.start()
+        state.set_y(y)
+        state.position[:] = self.road.get_positions(state.position, state.lane)
+        profiler.stop('scatter', start)
+
+        start = profiler.start()
+        self.road.apply_boundary_conditions(t + dt, dt)
+        profiler.stop('boundary_conditions', start)
+        if self.lane_change_model is not None:
+            start = profiler.start()
+            self.lane_change_model.apply(self)
+            profiler.stop('lane_changes', start)
+        profiler.stop('step', step_start)
+        profiler.count('steps')
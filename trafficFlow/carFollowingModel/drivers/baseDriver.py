@@ -1,9 +1,79 @@
+import numpy as np
+
+
+class VehicleStateAttribute:
+    """
+    Descriptor that stores an attribute of a driver in the vehicle state of the road
+
+    As long as the driver is not added to a road, the value is kept in the driver object itself.
+
+    Attributes
+    ----------
+    default : double
+        value of the attribute before it is set for the first time
+    name : str
+        name of the attribute (and of the array in the vehicle state)
+    """
+
+    def __init__(self, default=None):
+        self.default = default
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, vehicle, owner=None):
+        if vehicle is None:
+            return self
+        if vehicle.state is None:
+            return vehicle.__dict__.get(self.name, self.default)
+        return vehicle.state.get_array(self.name)[vehicle.index]
+
+    def __set__(self, vehicle, value):
+        if vehicle.state is None:
+            vehicle.__dict__[self.name] = value
+        else:
+            vehicle.state.get_array(self.name)[vehicle.index] = value
+
+
+class VehicleStateReference(VehicleStateAttribute):
+    """
+    Descriptor that stores a reference to another driver (e.g. the predecessor) as index in the vehicle state
+
+    Inherits from the VehicleStateAttribute class.
+    """
+
+    def __get__(self, vehicle, owner=None):
+        if vehicle is None:
+            return self
+        if vehicle.state is None:
+            return vehicle.__dict__.get(self.name, self.default)
+        index = vehicle.state.get_array(self.name)[vehicle.index]
+        if index < 0:
+            return None
+        return vehicle.state.get_driver(index)
+
+    def __set__(self, vehicle, value):
+        if vehicle.state is None:
+            vehicle.__dict__[self.name] = value
+        else:
+            vehicle.state.get_array(self.name)[vehicle.index] = -1 if value is None else value.index
+
+
 class BaseDriver:
     """
     Base class for drivers/vehicles used in the car following model
 
+    Once the vehicle is added to a lane on a road, position, velocity, length, the driver parameters and the
+    predecessor/successor on the same lane are stored in the vehicle state of the road and the driver object
+    is only a view on its slot in this state.
+
     Attributes
     ----------
+    state : VehicleState
+        vehicle state this vehicle is stored in (None if the vehicle is not on a road yet)
+    index : int
+        slot of the vehicle in the vehicle state
     lane : Lane
         the lane this vehicle is added to (to get information on how to measure distances correctly,
         e.g. in the case of a circular road)
@@ -18,7 +88,7 @@ class BaseDriver:
     successor : Driver
         successor on the same lane
     predecessor_right : Driver
-        predecessor on the lane to the right
+        predecessor on the lane to the right (set by lane change models)
     successor_right : Driver
         successor on the lane to the right
     predecessor_left : Driver
@@ -27,15 +97,44 @@ class BaseDriver:
         successor on the lane to the left
     object_in_visualization : Vehicle
         object used by the visualization to manage the vehicle (e.g. arc in the circular road case)
+    parameter_names : tuple(str)
+        names of the driver parameters that are stored in the vehicle state
 
     Methods
     -------
+    get_distance_to_predecessor()
+        compute distance to the predecessor (using the get_distance method of the road)
+    get_speed_difference_to_predecessor()
+        compute difference in the speed of the predecessor and oneself
     get_desired_acceleration()
-        compute the current acceleration of the vehicle
+        compute the current acceleration of the vehicle (evaluates get_desired_accelerations for this vehicle
+        only, driver classes can override it with a scalar version)
+    get_desired_accelerations(parameters, indices, velocity, speed_difference, distance)
+        compute the accelerations of all vehicles of this type in the slots indices at once from the given
+        velocities, speed differences and distances to the predecessors and the dict of parameter arrays
+        (indexed along the last axis, so leading axes such as ensemble members broadcast)
+    get_desired_acceleration_derivatives(parameters, indices, velocity, speed_difference, distance)
+        compute the partial derivatives of these accelerations with respect to the velocity, the speed
+        difference and the distance to the predecessor (needed by implicit time discretization schemes)
     """
 
+    parameter_names = ()
+
+    length = VehicleStateAttribute(4.)
+    velocity = VehicleStateAttribute(0.)
+    position = VehicleStateAttribute(0.)
+
+    predecessor = VehicleStateReference()
+    successor = VehicleStateReference()
+    predecessor_right = VehicleStateReference()
+    successor_right = VehicleStateReference()
+    predecessor_left = VehicleStateReference()
+    successor_left = VehicleStateReference()
+
     def __init__(self):
-        self.lane = None
+        self.state = None
+        self.index = None
+        self._lane = None
 
         self.length = 4.
         self.velocity = 0.
@@ -51,5 +150,33 @@ class BaseDriver:
 
         self.object_in_visualization = None
 
+    @property
+    def lane(self):
+        if self.state is None:
+            return self._lane
+        return self.state.road.lanes[self.state.lane[self.index]]
+
+    @lane.setter
+    def lane(self, lane):
+        self._lane = lane
+
+    def get_distance_to_predecessor(self):
+        return self.lane.road.get_distance(self.predecessor.position, self.position, self.predecessor.lane, self.lane)\
+               - self.length
+
+    def get_speed_difference_to_predecessor(self):
+        return self.predecessor.velocity - self.velocity
+
     def get_desired_acceleration(self):
+        parameters = {name: np.array([getattr(self, name)], dtype=float) for name in self.parameter_names}
+        return type(self).get_desired_accelerations(parameters, np.array([0]), np.array([self.velocity]),
+                                                    np.array([self.get_speed_difference_to_predecessor()]),
+                                                    np.array([self.get_distance_to_predecessor()]))[0]
+
+    @classmethod
+    def get_desired_accelerations(cls, state, indices, velocity, speed_difference, distance):
+        raise NotImplementedError
+
+    @classmethod
+    def get_desired_acceleration_derivatives(cls, state, indices, velocity, speed_difference, distance):
         raise NotImplementedError
@@ -0,0 +1,67 @@
+"""
+Registry of the driver models by name
+
+Every entry combines a driver class (which supplies the vectorized kernel and the names of its parameter
+arrays in the vehicle state) with default values of its parameters and the vehicle length, so one class can
+be registered several times (e.g. intelligent drivers in cars and in trucks). Vehicles of all registered
+types can be mixed on a road; the vehicle state groups them by class and the car following model calls every
+kernel once per evaluation for its whole group.
+"""
+
+from .gippsDriver import GippsDriver
+from .intelligentDriver import IntelligentDriver
+from .kraussDriver import KraussDriver
+from .optimalVelocityDriver import OptimalVelocityDriver
+
+
+driver_types = {}
+
+
+def register_driver_type(name, DriverType, length=4., **parameters):
+    """
+    Register DriverType under name with the given default parameters (all parameters in
+    DriverType.parameter_names are required) and vehicle length
+    """
+    missing = [parameter for parameter in DriverType.parameter_names if parameter not in parameters]
+    unknown = [parameter for parameter in parameters if parameter not in DriverType.parameter_names]
+    if missing or unknown:
+        raise ValueError('driver type {}: missing parameters {}, unknown parameters {}'.format(name, missing,
+                                                                                              unknown))
+    driver_types[name] = (DriverType, dict(parameters, length=length))
+
+
+def get_driver_type(name):
+    """
+    Return the driver class and a copy of the default parameters (including length) registered under name
+    """
+    if name not in driver_types:
+        raise ValueError('unknown driver type {} (registered: {})'.format(name, ', '.join(sorted(driver_types))))
+    DriverType, defaults = driver_types[name]
+    return DriverType, dict(defaults)
+
+
+def create_driver(name, **parameters):
+    """
+    Create a driver of the type registered under name, parameters override the registered defaults
+    """
+    DriverType, defaults = get_driver_type(name)
+    defaults.update(parameters)
+    return DriverType(**defaults)
+
+
+def add_vehicles(state, name, number, lane_index, position=0., velocity=0., **parameters):
+    """
+    Add number vehicles of the type registered under name to the vehicle state at once (see
+    VehicleState.add_vehicles, parameters override the registered defaults) and return the first slot
+    """
+    DriverType, defaults = get_driver_type(name)
+    defaults.update(parameters)
+    length = defaults.pop('length')
+    return state.add_vehicles(number, DriverType, lane_index, position, velocity, length, **defaults)
+
+
+register_driver_type('idm-car', IntelligentDriver, s_0=2., v_0=33.3, delta=4., T=1., a=1., b=1.5, length=4.)
+register_driver_type('idm-truck', IntelligentDriver, s_0=4., v_0=22.2, delta=4., T=1.5, a=0.5, b=1., length=12.)
+register_driver_type('optimal-velocity', OptimalVelocityDriver, v_0=33.3, tau=0.65, delta_s=15., beta=1.5)
+register_driver_type('gipps', GippsDriver, s_0=2., v_0=33.3, T=1., a=1.5, b=2.)
+register_driver_type('krauss', KraussDriver, s_0=2., v_0=33.3, tau=1., a=1.5, b=3.)
@@ -0,0 +1,100 @@
+import numpy as np
+
+from .baseDriver import BaseDriver, VehicleStateAttribute
+
+
+def _get_gipps_safe_velocities(s_0, T, b, velocity, speed_difference, distance):
+    leader_velocity = velocity + speed_difference
+    root = np.sqrt(np.maximum((b*T)**2 + leader_velocity**2 + 2.*b*(distance - s_0), 0.))
+    return -b*T + root, leader_velocity, root
+
+
+def get_gipps_accelerations(s_0, v_0, T, a, b, velocity, speed_difference, distance):
+    """
+    Compute the accelerations of Gipps drivers for whole arrays of parameters and states at once
+
+    The velocity relaxes within the reaction time T towards the smallest of the desired speed, the velocity
+    reachable by accelerating with a during T and the safe velocity that allows to stop behind the predecessor
+    (braking with b as well) without getting closer than s_0.
+    """
+    safe_velocity, leader_velocity, root = _get_gipps_safe_velocities(s_0, T, b, velocity, speed_difference,
+                                                                      distance)
+    return (np.minimum(np.minimum(v_0, velocity + a*T), safe_velocity) - velocity) / T
+
+
+def get_gipps_derivatives(s_0, v_0, T, a, b, velocity, speed_difference, distance):
+    """
+    Compute the partial derivatives of the accelerations of Gipps drivers with respect to the velocity, the
+    speed difference to the predecessor and the distance to the predecessor (same arguments as
+    get_gipps_accelerations)
+    """
+    safe_velocity, leader_velocity, root = _get_gipps_safe_velocities(s_0, T, b, velocity, speed_difference,
+                                                                      distance)
+    root = np.maximum(root, 1e-12)
+    safe = safe_velocity < np.minimum(v_0, velocity + a*T)
+    free = ~safe & (v_0 < velocity + a*T)
+    d_velocity = np.where(safe, (leader_velocity/root - 1.) / T, np.where(free, -1. / T, 0.))
+    d_speed_difference = np.where(safe, leader_velocity / (root*T), 0.)
+    d_distance = np.where(safe, b / (root*T), 0.)
+    return d_velocity, d_speed_difference, d_distance
+
+
+class GippsDriver(BaseDriver):
+    """
+    Class to model a driver following the (continuous) model of Gipps
+
+    Inherits from the BaseDriver class. The driver parameters are stored in the vehicle state of the road.
+
+    Attributes
+    ----------
+    s_0 : double
+        minimum distance to the predecessor
+    v_0 : double
+        desired speed of the driver
+    T : double
+        reaction time (also the relaxation time of the velocity)
+    a : double
+        acceleration of the vehicle
+    b : double
+        deceleration of the driver (assumed for the predecessor as well)
+
+    Methods
+    -------
+    get_desired_accelerations(parameters, indices, velocity, speed_difference, distance)
+        override method in class BaseDriver to calculate the desired accelerations of many Gipps drivers at
+        once using their parameter arrays
+    get_desired_acceleration_derivatives(parameters, indices, velocity, speed_difference, distance)
+        override method in class BaseDriver to calculate the partial derivatives of the desired accelerations
+    """
+
+    parameter_names = ('s_0', 'v_0', 'T', 'a', 'b')
+
+    s_0 = VehicleStateAttribute()
+    v_0 = VehicleStateAttribute()
+    T = VehicleStateAttribute()
+    a = VehicleStateAttribute()
+    b = VehicleStateAttribute()
+
+    def __init__(self, s_0, v_0, T, a, b, length=4.):
+        super().__init__()
+        self.s_0 = s_0
+        self.v_0 = v_0
+        self.T = T
+        self.a = a
+        self.b = b
+
+        self.length = length
+
+    @classmethod
+    def get_desired_accelerations(cls, parameters, indices, velocity, speed_difference, distance):
+        return get_gipps_accelerations(*cls._get_parameters(parameters, indices),
+                                       velocity, speed_difference, distance)
+
+    @classmethod
+    def get_desired_acceleration_derivatives(cls, parameters, indices, velocity, speed_difference, distance):
+        return get_gipps_derivatives(*cls._get_parameters(parameters, indices),
+                                     velocity, speed_difference, distance)
+
+    @classmethod
+    def _get_parameters(cls, parameters, indices):
+        return [parameters[name][..., indices] for name in cls.parameter_names]
@@ -1,13 +1,42 @@
 import numpy as np
 
-from .baseDriver import BaseDriver
+from .baseDriver import BaseDriver, VehicleStateAttribute
+
+
+def get_intelligent_driver_accelerations(s_0, v_0, delta, T, a, b, velocity, speed_difference, distance):
+    """
+    Compute the accelerations of intelligent drivers for whole arrays of parameters and states at once
+
+    All arguments are arrays of the same shape (or scalars that broadcast), distance is the gap to the
+    predecessor (i.e. the length of the vehicle is already subtracted).
+    """
+    desired_distance = s_0 + np.maximum(0., velocity*T - (velocity*speed_difference) / (2.*np.sqrt(a*b)))
+    return a * (1. - (velocity/v_0)**delta - (desired_distance/distance)**2)
+
+
+def get_intelligent_driver_derivatives(s_0, v_0, delta, T, a, b, velocity, speed_difference, distance):
+    """
+    Compute the partial derivatives of the accelerations of intelligent drivers with respect to the velocity,
+    the speed difference to the predecessor and the distance to the predecessor (same arguments as
+    get_intelligent_driver_accelerations)
+    """
+    interaction = 1. / (2.*np.sqrt(a*b))
+    free_term = velocity*T - velocity*speed_difference*interaction
+    active = free_term > 0.
+    desired_distance = s_0 + np.where(active, free_term, 0.)
+    d_desired_distance = -2.*a*desired_distance / distance**2
+    d_velocity = -a*delta*(velocity/v_0)**(delta - 1.) / v_0 \
+        + np.where(active, d_desired_distance * (T - speed_difference*interaction), 0.)
+    d_speed_difference = np.where(active, -d_desired_distance * velocity*interaction, 0.)
+    d_distance = 2.*a*desired_distance**2 / distance**3
+    return d_velocity, d_speed_difference, d_distance
 
 
 class IntelligentDriver(BaseDriver):
     """
     Class to model the intelligent driver with the intelligent way of changing the acceleration
 
-    Inherits from the BaseDriver class.
+    Inherits from the BaseDriver class. The driver parameters are stored in the vehicle state of the road.
 
     Attributes
     ----------
@@ -26,18 +55,28 @@ class IntelligentDriver(BaseDriver):
 
     Methods
     -------
-    get_distance_to_predecessor()
-        compute distance to the predecessor (using the get_distance method of the road)
-    get_speed_difference_to_predecessor()
-        compute difference in the speed of the predecessor and oneself
     get_desired_distance()
         compute the desired distance using the speed difference to the predecessor
         according to the intelligent driver model
     get_desired_acceleration()
         override method in class BaseDriver to calculate the desired acceleration
         according to the intelligent driver model
+    get_desired_accelerations(parameters, indices, velocity, speed_difference, distance)
+        override method in class BaseDriver to calculate the desired accelerations of many intelligent
+        drivers at once using their parameter arrays (e.g. the ones in the vehicle state)
+    get_desired_acceleration_derivatives(parameters, indices, velocity, speed_difference, distance)
+        override method in class BaseDriver to calculate the partial derivatives of the desired accelerations
     """
 
+    parameter_names = ('s_0', 'v_0', 'delta', 'T', 'a', 'b')
+
+    s_0 = VehicleStateAttribute()
+    v_0 = VehicleStateAttribute()
+    delta = VehicleStateAttribute()
+    T = VehicleStateAttribute()
+    a = VehicleStateAttribute()
+    b = VehicleStateAttribute()
+
     def __init__(self, s_0, v_0, delta, T, a, b, length=4.):
         super().__init__()
         self.s_0 = s_0
@@ -49,17 +88,24 @@ class IntelligentDriver(BaseDriver):
 
         self.length = length
 
-    def get_distance_to_predecessor(self):
-        return self.lane.road.get_distance(self.predecessor.position, self.position, self.predecessor.lane, self.lane)\
-               - self.length
-
-    def get_speed_difference_to_predecessor(self):
-        return self.predecessor.velocity - self.velocity
-
     def get_desired_distance(self):
         return self.s_0 + max(0., self.velocity*self.T
-                            + (self.velocity*self.get_speed_difference_to_predecessor()) / (2.*np.sqrt(self.a*self.b)))
+                            - (self.velocity*self.get_speed_difference_to_predecessor()) / (2.*np.sqrt(self.a*self.b)))
 
     def get_desired_acceleration(self):
         return self.a * (1. - np.power(self.velocity/self.v_0, self.delta)
                             - np.power(self.get_desired_distance()/self.get_distance_to_predecessor(), 2))
+
+    @classmethod
+    def get_desired_accelerations(cls, parameters, indices, velocity, speed_difference, distance):
+        return get_intelligent_driver_accelerations(*cls._get_parameters(parameters, indices),
+                                                    velocity, speed_difference, distance)
+
+    @classmethod
+    def get_desired_acceleration_derivatives(cls, parameters, indices, velocity, speed_difference, distance):
+        return get_intelligent_driver_derivatives(*cls._get_parameters(parameters, indices),
+                                                  velocity, speed_difference, distance)
+
+    @classmethod
+    def _get_parameters(cls, parameters, indices):
+        return [parameters[name][..., indices] for name in cls.parameter_names]
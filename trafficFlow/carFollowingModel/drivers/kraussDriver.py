@@ -0,0 +1,104 @@
+import numpy as np
+
+from .baseDriver import BaseDriver, VehicleStateAttribute
+
+
+def _get_krauss_safe_velocities(s_0, tau, b, velocity, speed_difference, distance):
+    leader_velocity = velocity + speed_difference
+    denominator = (velocity + leader_velocity) / (2.*b) + tau
+    numerator = distance - s_0 - leader_velocity*tau
+    return leader_velocity + numerator / denominator, numerator, denominator
+
+
+def get_krauss_accelerations(s_0, v_0, tau, a, b, velocity, speed_difference, distance):
+    """
+    Compute the accelerations of Krauss drivers for whole arrays of parameters and states at once
+
+    The velocity relaxes within the reaction time tau towards the smallest of the desired speed, the velocity
+    reachable by accelerating with a during tau and the safe velocity of Krauss. The random dawdling of the
+    original model is left out, so the right hand side stays deterministic.
+    """
+    safe_velocity, numerator, denominator = _get_krauss_safe_velocities(s_0, tau, b, velocity, speed_difference,
+                                                                        distance)
+    return (np.minimum(np.minimum(v_0, velocity + a*tau), safe_velocity) - velocity) / tau
+
+
+def get_krauss_derivatives(s_0, v_0, tau, a, b, velocity, speed_difference, distance):
+    """
+    Compute the partial derivatives of the accelerations of Krauss drivers with respect to the velocity, the
+    speed difference to the predecessor and the distance to the predecessor (same arguments as
+    get_krauss_accelerations)
+    """
+    safe_velocity, numerator, denominator = _get_krauss_safe_velocities(s_0, tau, b, velocity, speed_difference,
+                                                                        distance)
+    safe = safe_velocity < np.minimum(v_0, velocity + a*tau)
+    free = ~safe & (v_0 < velocity + a*tau)
+    with np.errstate(invalid='ignore'):
+        # the velocity enters the safe velocity directly and through the velocity of the predecessor
+        d_safe_speed_difference = 1. - tau/denominator - numerator / (2.*b*denominator**2)
+        d_safe_velocity = 1. - tau/denominator - numerator / (b*denominator**2)
+    d_velocity = np.where(safe, (d_safe_velocity - 1.) / tau, np.where(free, -1. / tau, 0.))
+    d_speed_difference = np.where(safe, d_safe_speed_difference / tau, 0.)
+    d_distance = np.where(safe, 1. / (denominator*tau), 0.)
+    return d_velocity, d_speed_difference, d_distance
+
+
+class KraussDriver(BaseDriver):
+    """
+    Class to model a driver following the model of Krauss (without dawdling)
+
+    Inherits from the BaseDriver class. The driver parameters are stored in the vehicle state of the road.
+
+    Attributes
+    ----------
+    s_0 : double
+        minimum distance to the predecessor
+    v_0 : double
+        desired speed of the driver
+    tau : double
+        reaction time (also the relaxation time of the velocity)
+    a : double
+        acceleration of the vehicle
+    b : double
+        deceleration of the driver
+
+    Methods
+    -------
+    get_desired_accelerations(parameters, indices, velocity, speed_difference, distance)
+        override method in class BaseDriver to calculate the desired accelerations of many Krauss drivers at
+        once using their parameter arrays
+    get_desired_acceleration_derivatives(parameters, indices, velocity, speed_difference, distance)
+        override method in class BaseDriver to calculate the partial derivatives of the desired accelerations
+    """
+
+    parameter_names = ('s_0', 'v_0', 'tau', 'a', 'b')
+
+    s_0 = VehicleStateAttribute()
+    v_0 = VehicleStateAttribute()
+    tau = VehicleStateAttribute()
+    a = VehicleStateAttribute()
+    b = VehicleStateAttribute()
+
+    def __init__(self, s_0, v_0, tau, a, b, length=4.):
+        super().__init__()
+        self.s_0 = s_0
+        self.v_0 = v_0
+        self.tau = tau
+        self.a = a
+        self.b = b
+
+        self.length = length
+
+    @classmethod
+    def get_desired_accelerations(cls, parameters, indices, velocity, speed_difference, distance):
+        return get_krauss_accelerations(*cls._get_parameters(parameters, indices),
+                                        velocity, speed_difference, distance)
+
+    @classmethod
+    def get_desired_acceleration_derivatives(cls, parameters, indices, velocity, speed_difference, distance):
+        return get_krauss_derivatives(*cls._get_parameters(parameters, indices),
+                                      velocity, speed_difference, distance)
+
+    @classmethod
+    def _get_parameters(cls, parameters, indices):
+        return [parameters[name][..., indices] for name in cls.parameter_names]
@@ -0,0 +1,91 @@
+import numpy as np
+
+from .baseDriver import BaseDriver, VehicleStateAttribute
+
+
+def get_optimal_velocities(v_0, delta_s, beta, distance):
+    """
+    Compute the optimal velocity function V(s) = v_0 (tanh(s/delta_s - beta) + tanh(beta)) / (1 + tanh(beta))
+    for arrays of parameters and distances (V(0) = 0 and V(s) approaches v_0 for large s)
+    """
+    return v_0 * (np.tanh(distance/delta_s - beta) + np.tanh(beta)) / (1. + np.tanh(beta))
+
+
+def get_optimal_velocity_accelerations(v_0, tau, delta_s, beta, velocity, speed_difference, distance):
+    """
+    Compute the accelerations of optimal velocity drivers (relaxation of the velocity towards V(s) within tau)
+    for whole arrays of parameters and states at once
+
+    The speed difference is not used by the model, the arguments match the other driver kernels.
+    """
+    return (get_optimal_velocities(v_0, delta_s, beta, distance) - velocity) / tau
+
+
+def get_optimal_velocity_derivatives(v_0, tau, delta_s, beta, velocity, speed_difference, distance):
+    """
+    Compute the partial derivatives of the accelerations of optimal velocity drivers with respect to the
+    velocity, the speed difference to the predecessor and the distance to the predecessor
+    """
+    d_velocity = -np.ones_like(velocity) / tau
+    d_speed_difference = np.zeros_like(velocity)
+    d_distance = v_0 * (1. - np.tanh(distance/delta_s - beta)**2) / ((1. + np.tanh(beta)) * delta_s * tau)
+    return d_velocity, d_speed_difference, d_distance
+
+
+class OptimalVelocityDriver(BaseDriver):
+    """
+    Class to model a driver following the optimal velocity model of Bando et al.
+
+    Inherits from the BaseDriver class. The driver relaxes its velocity towards an optimal velocity that only
+    depends on the distance to the predecessor. The model produces stop-and-go waves for short relaxation times
+    already and does not prevent collisions, so it is mainly useful for comparisons with the other models.
+
+    Attributes
+    ----------
+    v_0 : double
+        desired speed of the driver (optimal velocity on a free road)
+    tau : double
+        relaxation time
+    delta_s : double
+        width of the transition of the optimal velocity from 0 to v_0
+    beta : double
+        form factor of the optimal velocity function
+
+    Methods
+    -------
+    get_desired_accelerations(parameters, indices, velocity, speed_difference, distance)
+        override method in class BaseDriver to calculate the desired accelerations of many optimal velocity
+        drivers at once using their parameter arrays
+    get_desired_acceleration_derivatives(parameters, indices, velocity, speed_difference, distance)
+        override method in class BaseDriver to calculate the partial derivatives of the desired accelerations
+    """
+
+    parameter_names = ('v_0', 'tau', 'delta_s', 'beta')
+
+    v_0 = VehicleStateAttribute()
+    tau = VehicleStateAttribute()
+    delta_s = VehicleStateAttribute()
+    beta = VehicleStateAttribute()
+
+    def __init__(self, v_0, tau, delta_s, beta, length=4.):
+        super().__init__()
+        self.v_0 = v_0
+        self.tau = tau
+        self.delta_s = delta_s
+        self.beta = beta
+
+        self.length = length
+
+    @classmethod
+    def get_desired_accelerations(cls, parameters, indices, velocity, speed_difference, distance):
+        return get_optimal_velocity_accelerations(*cls._get_parameters(parameters, indices),
+                                                  velocity, speed_difference, distance)
+
+    @classmethod
+    def get_desired_acceleration_derivatives(cls, parameters, indices, velocity, speed_difference, distance):
+        return get_optimal_velocity_derivatives(*cls._get_parameters(parameters, indices),
+                                                velocity, speed_difference, distance)
+
+    @classmethod
+    def _get_parameters(cls, parameters, indices):
+        return [parameters[name][..., indices] for name in cls.parameter_names]
@@ -0,0 +1,96 @@
+import numpy as np
+
+from .carFollowingModel import CarFollowingModel
+
+
+class EnsembleCarFollowingModel(CarFollowingModel):
+    """
+    Class that simulates K independent copies (members) of a road in lockstep
+
+    Inherits from the CarFollowingModel class. All members share the topology of the road (lanes, vehicle
+    lengths, predecessors), while the driver parameters and the state can differ between the members. The
+    solution has shape (K, 2N) (positions followed by velocities for every member), so the kernels of the
+    drivers and the time discretization scheme are called once per step for the whole ensemble.
+
+    Attributes
+    ----------
+    number_of_members : int
+        number of members K
+    parameters : dict(str, np.ndarray)
+        driver parameters of shape (K, N)
+    y : np.ndarray
+        current solution of shape (K, 2N)
+    position : np.ndarray
+        view on the positions in y, shape (K, N)
+    velocity : np.ndarray
+        view on the velocities in y, shape (K, N)
+
+    Methods
+    -------
+    set_parameter(name, value)
+        set the driver parameter name for all members and vehicles (value broadcasts against (K, N), so a
+        value of shape (K, 1) sets one value per member)
+    perturb(position_scale, velocity_scale, seed)
+        add independent normally distributed perturbations to the positions and velocities of every member
+    simulate_one_step(time_discretization_scheme, t, dt)
+        override method in class CarFollowingModel and advance all members by a step of length dt
+    get_mean_velocities()
+        return the mean velocity of every member
+    get_velocity_standard_deviations()
+        return the standard deviation of the velocities of every member
+    get_minimum_distances()
+        return the smallest distance between two vehicles of every member
+    get_flows()
+        return the flow (vehicles per second, averaged over the lanes) of every member
+    """
+
+    def __init__(self, road, number_of_members):
+        super().__init__(road)
+        self.number_of_members = number_of_members
+        state = road.state
+        self.parameters = {name: np.tile(state.arrays[name], (number_of_members, 1))
+                           for DriverType in state.driver_types for name in DriverType.parameter_names}
+        self.y = np.tile(state.get_y(), (number_of_members, 1))
+
+    @property
+    def position(self):
+        return self.y[:, :self.get_number_of_vehicles()]
+
+    @property
+    def velocity(self):
+        return self.y[:, self.get_number_of_vehicles():]
+
+    def get_parameters(self):
+        return self.parameters
+
+    def set_parameter(self, name, value):
+        self.parameters[name][...] = value
+
+    def perturb(self, position_scale=0., velocity_scale=0., seed=None):
+        generator = np.random.default_rng(seed)
+        self.position[...] += position_scale * generator.standard_normal(self.position.shape)
+        self.velocity[...] += velocity_scale * generator.standard_normal(self.velocity.shape)
+        self.position[...] = self.road.get_positions(self.position, self.road.state.lane)
+
+    def simulate_one_step(self, time_discretization_scheme, t, dt):
+        if self.profiler is not None:
+            start = self.profiler.start()
+        self.y = time_discretization_scheme.apply(t, dt, self.y)
+        self.position[...] = self.road.get_positions(self.position, self.road.state.lane)
+        if self.profiler is not None:
+            self.profiler.stop('step', start)
+            self.profiler.count('steps')
+
+    def get_mean_velocities(self):
+        return np.mean(self.velocity, axis=-1)
+
+    def get_velocity_standard_deviations(self):
+        return np.std(self.velocity, axis=-1)
+
+    def get_minimum_distances(self):
+        distance, speed_difference = self._get_interaction(self.position, self.velocity)
+        return np.min(distance, axis=-1)
+
+    def get_flows(self):
+        lane_lengths = self.road.get_lane_lengths()[self.road.state.lane]
+        return np.sum(self.velocity / lane_lengths, axis=-1) / self.road.number_of_lanes
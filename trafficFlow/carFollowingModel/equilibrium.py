@@ -0,0 +1,107 @@
+import numpy as np
+
+
+def _get_kernels(state, indices):
+    # driver classes with the parameters of their vehicles among indices (gathered once, so the bisections
+    # evaluate the kernels on contiguous arrays)
+    models = state.model[indices]
+    kernels = []
+    for model, DriverType in enumerate(state.driver_types):
+        selected = np.flatnonzero(models == model)
+        if len(selected) > 0:
+            parameters = {name: state.arrays[name][indices[selected]] for name in DriverType.parameter_names}
+            kernels.append((DriverType, parameters, None if len(selected) == len(indices) else selected))
+    return kernels
+
+
+def _get_accelerations(kernels, velocity, distance):
+    acceleration = np.empty(len(velocity))
+    for DriverType, parameters, selected in kernels:
+        if selected is None:
+            return DriverType.get_desired_accelerations(parameters, slice(None), velocity, np.zeros(len(velocity)),
+                                                        distance)
+        acceleration[selected] = DriverType.get_desired_accelerations(parameters, slice(None), velocity[selected],
+                                                                      np.zeros(len(selected)), distance[selected])
+    return acceleration
+
+
+def _bisect_gaps(kernels, velocity, lower, upper, tolerance, iterations, decided=None):
+    # shrink the brackets [lower, upper] of the equilibrium gaps at velocity until they are narrower than
+    # tolerance (or until decided(lower, upper) is true)
+    for i in range(iterations):
+        if np.all(upper - lower <= tolerance) or (decided is not None and decided(lower, upper)):
+            break
+        middle = (lower + upper) / 2.
+        accelerating = _get_accelerations(kernels, velocity, middle) >= 0.
+        upper = np.where(accelerating, middle, upper)
+        lower = np.where(accelerating, lower, middle)
+    return lower, upper
+
+
+def get_equilibrium_gaps(state, indices, velocity, max_gap, iterations=50):
+    """
+    Return the gaps at which the vehicles in the slots indices keep the given (common) velocity behind a
+    predecessor driving at the same speed (bisection, inf if the vehicle would still brake at max_gap)
+    """
+    indices = np.asarray(indices)
+    kernels = _get_kernels(state, indices)
+    velocity = np.full(len(indices), velocity, dtype=float)
+    lower, upper = _bisect_gaps(kernels, velocity, np.zeros(len(indices)), np.full(len(indices), float(max_gap)),
+                                0., iterations)
+    return np.where(_get_accelerations(kernels, velocity, np.full(len(indices), float(max_gap))) >= 0., upper,
+                    np.inf)
+
+
+def get_equilibrium(state, indices, full_length, iterations=50):
+    """
+    Return the common velocity and the gaps of the vehicles in the slots indices in uniform flow on a lane of
+    length full_length: all vehicles drive at the same speed without accelerating, and the gaps plus the
+    vehicle lengths fill the lane
+
+    If the vehicles do not even fit with their standstill gaps, they stand with equal gaps. The equilibrium
+    gaps grow with the velocity, so the brackets of the gaps found for the current velocity bounds are reused
+    by the bisection of the velocity, and the gaps are only refined until their sum decides the next step.
+    """
+    indices = np.asarray(indices)
+    kernels = _get_kernels(state, indices)
+    number_of_vehicles = len(indices)
+    length = np.sum(state.length[indices])
+    free_gap = np.full(number_of_vehicles, np.inf)
+
+    # no driver can drive faster than at its free road velocity
+    lower, upper = np.zeros(number_of_vehicles), np.full(number_of_vehicles, 1.)
+    while np.any(_get_accelerations(kernels, upper, free_gap) > 0.):
+        upper = 2. * upper
+    for i in range(iterations):
+        middle = (lower + upper) / 2.
+        accelerating = _get_accelerations(kernels, middle, free_gap) > 0.
+        lower = np.where(accelerating, middle, lower)
+        upper = np.where(accelerating, upper, middle)
+    velocity_lower, velocity_upper = 0., float(np.min(lower))
+
+    # the gaps at the velocity bounds bracket the gaps at every velocity in between
+    tolerance = full_length * 2.**-iterations
+    target = full_length - length
+    gaps_lower, gaps_upper = np.zeros(number_of_vehicles), np.full(number_of_vehicles, float(full_length))
+    standstill_lower, standstill_upper = _bisect_gaps(kernels, np.zeros(number_of_vehicles), gaps_lower, gaps_upper,
+                                                      tolerance, iterations)
+    if np.sum(standstill_upper) > target:
+        return 0., np.full(number_of_vehicles, target / number_of_vehicles)
+    gaps_lower = standstill_lower
+
+    def decided(lower, upper):
+        return np.sum(lower) > target or np.sum(upper) <= target
+
+    for i in range(iterations):
+        velocity = (velocity_lower + velocity_upper) / 2.
+        lower, upper = _bisect_gaps(kernels, np.full(number_of_vehicles, velocity), gaps_lower, gaps_upper,
+                                    tolerance, iterations, decided)
+        if np.sum(upper) > target:
+            velocity_upper, gaps_upper = velocity, upper
+        else:
+            velocity_lower, gaps_lower = velocity, lower
+    if velocity_lower == 0.:
+        gaps_lower, gaps_upper = standstill_lower, standstill_upper
+    lower, upper = _bisect_gaps(kernels, np.full(number_of_vehicles, velocity_lower), gaps_lower, gaps_upper,
+                                tolerance, iterations)
+    return velocity_lower, upper
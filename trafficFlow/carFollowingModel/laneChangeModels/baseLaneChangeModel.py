@@ -0,0 +1,12 @@
+class BaseLaneChangeModel:
+    """
+    Base class for lane change models used in the car following model
+
+    Methods
+    -------
+    apply(model)
+        decide on lane changes for all vehicles on the road of the car following model and perform them
+    """
+
+    def apply(self, model):
+        raise NotImplementedError
@@ -0,0 +1,138 @@
+import numpy as np
+
+from ..lanes.positionIndex import PositionIndex
+from .baseLaneChangeModel import BaseLaneChangeModel
+
+
+class MobilLaneChangeModel(BaseLaneChangeModel):
+    """
+    Class that implements the lane change model MOBIL (minimizing overall braking induced by lane changes)
+
+    Inherits from the BaseLaneChangeModel class. A vehicle changes to the lane to the left (lane index + 1) or
+    to the right (lane index - 1) if the new follower does not have to brake harder than safe_deceleration and
+    the advantage of the vehicle plus politeness times the advantage of the old and the new follower exceeds
+    threshold. The decisions of all vehicles are evaluated at once with the vectorized kernels of the drivers,
+    the neighbours on the adjacent lanes are found by binary search in a PositionIndex. If several vehicles
+    want to move into the same gap, only the one with the largest incentive changes. Free slots of vehicle pools
+    are ignored, and after every lane change the road is told which lanes changed (open roads keep the first and
+    last vehicle of every lane).
+
+    Attributes
+    ----------
+    politeness : double
+        weight of the advantage of the followers
+    threshold : double
+        minimum incentive (acceleration gain) for a lane change
+    safe_deceleration : double
+        maximum deceleration imposed on the new follower (and the vehicle itself)
+    position_index : PositionIndex
+        vehicles of every lane sorted by position (created at the first call of apply)
+    number_of_lane_changes : int
+        number of lane changes performed until now
+
+    Methods
+    -------
+    apply(model)
+        override method in class BaseLaneChangeModel, evaluate MOBIL for all vehicles and perform the lane changes
+    """
+
+    directions = ((1, 'predecessor_left', 'successor_left'), (-1, 'predecessor_right', 'successor_right'))
+
+    def __init__(self, politeness=0.2, threshold=0.1, safe_deceleration=4.):
+        self.politeness = politeness
+        self.threshold = threshold
+        self.safe_deceleration = safe_deceleration
+        self.position_index = None
+        self.number_of_lane_changes = 0
+
+    def _follow(self, model, followers, leaders, follower_positions, leader_positions, lanes):
+        # accelerations of followers behind leaders on lanes (free road if there is no leader)
+        state = model.road.state
+        velocity = state.velocity
+        has_leader = (leaders >= 0) & (leaders != followers)
+        distance = np.where(has_leader, model.road.get_distances(leader_positions, follower_positions, lanes, lanes)
+                            - state.length[followers], np.inf)
+        speed_difference = np.where(has_leader, velocity[leaders] - velocity[followers], 0.)
+        return model.get_desired_accelerations(followers, velocity[followers], speed_difference, distance), distance
+
+    def apply(self, model):
+        road = model.road
+        state = road.state
+        if self.position_index is None:
+            self.position_index = PositionIndex(road)
+        else:
+            self.position_index.update()
+        if road.number_of_lanes < 2:
+            return
+
+        vehicles = np.arange(state.number_of_vehicles)
+        position, lane = state.position, state.lane
+        predecessor, successor = state.predecessor, state.successor
+        acceleration = model.get_accelerations(position, state.velocity)
+
+        # advantage of the old follower when the vehicle leaves (it follows the old predecessor afterwards)
+        has_follower = (successor >= 0) & (successor != vehicles)
+        old_follower = np.where(has_follower, successor, vehicles)
+        old_follower_acceleration, _ = self._follow(model, old_follower, np.where(predecessor == old_follower, -1,
+                                                                                  predecessor),
+                                                    position[old_follower], position[predecessor], lane)
+        old_follower_advantage = np.where(has_follower, old_follower_acceleration - acceleration[old_follower], 0.)
+
+        best_incentive = np.full(state.number_of_vehicles, -np.inf)
+        best_lane = lane.copy()
+        best_leader = np.full(state.number_of_vehicles, -1)
+        for direction, predecessor_field, successor_field in self.directions:
+            target_lane = lane + direction
+            # free slots (lane -1, e.g. of vehicle pools) never change lanes
+            candidates = np.flatnonzero((lane >= 0) & (target_lane >= 0) & (target_lane < road.number_of_lanes))
+            state.arrays[predecessor_field][:] = -1
+            state.arrays[successor_field][:] = -1
+            if len(candidates) == 0:
+                continue
+            target_lane = target_lane[candidates]
+            target_position = road.get_positions_on_lanes(position[candidates], lane[candidates], target_lane)
+            new_leader, new_follower = self.position_index.get_neighbours(target_lane, target_position)
+            state.arrays[predecessor_field][candidates] = new_leader
+            state.arrays[successor_field][candidates] = new_follower
+
+            new_acceleration, gap = self._follow(model, candidates, new_leader, target_position,
+                                                 position[new_leader], target_lane)
+            has_new_follower = new_follower >= 0
+            new_follower = np.where(has_new_follower, new_follower, candidates)
+            new_follower_acceleration, follower_gap = self._follow(model, new_follower,
+                                                                   np.where(has_new_follower, candidates, -1),
+                                                                   position[new_follower], target_position,
+                                                                   target_lane)
+            new_follower_advantage = np.where(has_new_follower,
+                                              new_follower_acceleration - acceleration[new_follower], 0.)
+
+            incentive = new_acceleration - acceleration[candidates] \
+                + self.politeness * (new_follower_advantage + old_follower_advantage[candidates])
+            safe = (gap > 0.) & (new_acceleration >= -self.safe_deceleration) \
+                & np.where(has_new_follower, (follower_gap > 0.)
+                           & (new_follower_acceleration >= -self.safe_deceleration), True)
+            better = safe & (incentive > self.threshold) & (incentive > best_incentive[candidates])
+            chosen = candidates[better]
+            best_incentive[chosen] = incentive[better]
+            best_lane[chosen] = target_lane[better]
+            best_leader[chosen] = new_leader[better]
+
+        changing = np.flatnonzero(best_lane != lane)
+        if len(changing) == 0:
+            return
+        # only the vehicle with the largest incentive moves into a gap
+        changing = changing[np.argsort(-best_incentive[changing], kind='stable')]
+        gaps = best_lane[changing] * (state.number_of_vehicles + 1) + best_leader[changing]
+        _, first = np.unique(gaps, return_index=True)
+        changing = changing[first]
+        new_lanes = best_lane[changing]
+
+        state.position[changing] = road.get_positions_on_lanes(position[changing], lane[changing], new_lanes)
+        touched_lanes = np.unique(np.concatenate((lane[changing], new_lanes)))
+        state.lane[changing] = new_lanes
+        self.position_index.move(changing, new_lanes)
+        self.position_index.update_links(touched_lanes)
+        road.update_lanes(touched_lanes)
+        for touched_lane in touched_lanes:
+            road.lanes[touched_lane].number_of_vehicles = len(self.position_index.orders[touched_lane])
+        self.number_of_lane_changes = self.number_of_lane_changes + len(changing)
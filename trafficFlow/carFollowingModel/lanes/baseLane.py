@@ -1,13 +1,21 @@
+import numpy as np
+
+
 class BaseLane:
     """
     Base class for lanes used in the car following model
 
+    Vehicles added before the lane is added to a road are kept in a list and moved to the vehicle state
+    of the road as soon as the lane is added to it.
+
     Attributes
     ----------
     number_of_vehicles : int
         number of vehicles on the lane
     road : Road
         road on which the lane is located
+    index : int
+        position of the lane in the lanes of the road (used as lane index in the vehicle state)
     vehicles : list(Vehicles)
         vehicles on the lane
     initialized : bool
@@ -17,20 +25,52 @@ class BaseLane:
     -------
     add_vehicle(vehicle)
         add the vehicle to the lane
-    initialize_default()
-        place the vehicles in a default manner on the lane
+    add_vehicles(number, DriverType, position, velocity, length, **parameters)
+        add number vehicles of class DriverType to the lane at once without creating driver objects (see
+        VehicleState.add_vehicles, the lane has to be added to a road before) and return the first slot
+    get_vehicle_indices()
+        return the slots of the vehicles on this lane in the vehicle state of the road
+    initialize_default(order)
+        place the vehicles in a default manner on the lane (order optionally gives the slots of the vehicles
+        in driving order)
+    initialize_equilibrium(order)
+        place the vehicles on the lane in uniform flow (all drivers at their equilibrium gap and velocity)
     """
 
     def __init__(self):
         self.number_of_vehicles = 0
         self.road = None
-        self.vehicles = []
+        self.index = None
+        self._vehicles = []
         self.initialized = False
 
+    @property
+    def vehicles(self):
+        if self.road is None:
+            return self._vehicles
+        return self.road.state.get_drivers(self.get_vehicle_indices())
+
     def add_vehicle(self, vehicle):
-        self.vehicles.append(vehicle)
-        vehicle.lane = self
+        if self.road is None:
+            self._vehicles.append(vehicle)
+            vehicle.lane = self
+        else:
+            self.road.state.add_vehicle(vehicle, self.index)
         self.number_of_vehicles = self.number_of_vehicles + 1
 
-    def initialize_default(self):
+    def add_vehicles(self, number, DriverType, position=0., velocity=0., length=4., **parameters):
+        if self.road is None:
+            raise ValueError('vehicles can only be added in bulk to lanes of a road')
+        first = self.road.state.add_vehicles(number, DriverType, self.index, position, velocity, length,
+                                             **parameters)
+        self.number_of_vehicles = self.number_of_vehicles + number
+        return first
+
+    def get_vehicle_indices(self):
+        return np.flatnonzero(self.road.state.lane == self.index)
+
+    def initialize_default(self, order=None):
+        raise NotImplementedError
+
+    def initialize_equilibrium(self, order=None):
         raise NotImplementedError
@@ -0,0 +1,134 @@
+import numpy as np
+
+
+class PositionIndex:
+    """
+    Class that keeps the vehicles of every lane of a road sorted by their position
+
+    The order of every lane is kept up to date incrementally: on periodic roads vehicles passing the end of the
+    lane only rotate the order, lane changes are merged into the order with a binary search, and only lanes
+    whose order is broken otherwise (e.g. by overtaking) are sorted again. Lanes whose vehicles changed without
+    the index (vehicles entering or leaving an open road) are detected by update and indexed again.
+
+    Attributes
+    ----------
+    road : Road
+        road whose vehicles are indexed
+    orders : list(np.ndarray)
+        slots of the vehicles of every lane sorted by position
+
+    Methods
+    -------
+    update()
+        restore the order after the positions of the vehicles changed (lanes that vehicles entered or left are
+        indexed again)
+    move(indices, new_lanes)
+        move the vehicles in the slots indices to new_lanes (the lane and position in the vehicle state
+        have to be changed already)
+    get_neighbours(lanes, positions)
+        return the slots of the first vehicle ahead of and the first vehicle behind every position on the given
+        lanes (-1 if there is none)
+    update_links(lanes)
+        set predecessor and successor of all vehicles on the given lanes according to the order
+    """
+
+    def __init__(self, road):
+        self.road = road
+        state = road.state
+        self.orders = []
+        for lane in road.lanes:
+            indices = lane.get_vehicle_indices()
+            self.orders.append(indices[np.argsort(state.position[indices], kind='stable')])
+        self._keys = None
+
+    def _index_lanes(self, lanes):
+        # sort the vehicles of the given lanes by position from scratch (one pass over the vehicle state)
+        state = self.road.state
+        occupied = np.flatnonzero(np.isin(state.lane, lanes))
+        occupied = occupied[np.lexsort((state.position[occupied], state.lane[occupied]))]
+        starts = np.searchsorted(state.lane[occupied], lanes)
+        ends = np.searchsorted(state.lane[occupied], lanes, side='right')
+        for lane, start, end in zip(lanes, starts, ends):
+            self.orders[lane] = occupied[start:end]
+
+    def update(self):
+        state = self.road.state
+        position = state.position
+        changed = [lane for lane, order in enumerate(self.orders)
+                   if len(order) != self.road.lanes[lane].number_of_vehicles or np.any(state.lane[order] != lane)]
+        if changed:
+            self._index_lanes(np.array(changed))
+        for lane, order in enumerate(self.orders):
+            if len(order) < 2:
+                continue
+            sorted_positions = position[order]
+            descents = np.flatnonzero(sorted_positions[1:] < sorted_positions[:-1])
+            if len(descents) == 0:
+                continue
+            if self.road.periodic and len(descents) == 1 and sorted_positions[-1] <= sorted_positions[0]:
+                # the vehicles at the end of the order passed the end of the lane
+                self.orders[lane] = np.roll(order, -(descents[0] + 1))
+            else:
+                self.orders[lane] = order[np.argsort(sorted_positions, kind='stable')]
+        self._keys = None
+
+    def move(self, indices, new_lanes):
+        state = self.road.state
+        position = state.position
+        leaving = np.zeros(state.number_of_vehicles, dtype=bool)
+        leaving[indices] = True
+        for lane, order in enumerate(self.orders):
+            incoming = indices[new_lanes == lane]
+            staying = order[~leaving[order]]
+            if len(incoming) == 0 and len(staying) == len(order):
+                continue
+            incoming = incoming[np.argsort(position[incoming], kind='stable')]
+            locations = np.searchsorted(position[staying], position[incoming], side='right')
+            self.orders[lane] = np.insert(staying, locations, incoming)
+        self._keys = None
+
+    def _get_keys(self):
+        # all orders concatenated with the composite key lane * scale + position, so neighbours on arbitrary
+        # lanes can be found by a single binary search
+        if self._keys is None:
+            scale = 4. * np.max(self.road.get_lane_lengths()) + 1.
+            self._concatenated = np.concatenate(self.orders)
+            self._lane_starts = np.cumsum([0] + [len(order) for order in self.orders])
+            self._keys = self.road.state.lane[self._concatenated] * scale \
+                + self.road.state.position[self._concatenated]
+            self._scale = scale
+        return self._keys
+
+    def get_neighbours(self, lanes, positions):
+        keys = self._get_keys()
+        lane_start = self._lane_starts[lanes]
+        lane_end = self._lane_starts[lanes + 1]
+        ahead = np.searchsorted(keys, lanes * self._scale + positions, side='right')
+        behind = ahead - 1
+        if self.road.periodic:
+            ahead = np.where(ahead == lane_end, lane_start, ahead)
+            behind = np.where(behind < lane_start, lane_end - 1, behind)
+            empty = lane_end == lane_start
+            ahead_exists, behind_exists = ~empty, ~empty
+        else:
+            ahead_exists = ahead < lane_end
+            behind_exists = behind >= lane_start
+        concatenated = np.append(self._concatenated, -1)
+        predecessor = concatenated[np.where(ahead_exists, ahead, -1)]
+        successor = concatenated[np.where(behind_exists, behind, -1)]
+        return predecessor, successor
+
+    def update_links(self, lanes=None):
+        state = self.road.state
+        for lane in range(len(self.orders)) if lanes is None else lanes:
+            order = self.orders[lane]
+            if len(order) == 0:
+                continue
+            state.predecessor[order[:-1]] = order[1:]
+            state.successor[order[1:]] = order[:-1]
+            if self.road.periodic:
+                state.predecessor[order[-1]] = order[0]
+                state.successor[order[0]] = order[-1]
+            else:
+                state.predecessor[order[-1]] = -1
+                state.successor[order[0]] = -1
@@ -1,3 +1,6 @@
+import numpy as np
+
+from ..equilibrium import get_equilibrium
 from .baseLane import BaseLane
 
 
@@ -14,20 +17,40 @@ class SimpleLane(BaseLane):
 
     Methods
     -------
-    initialize_default()
-        override method in class BaseLane and place the vehicles equidistant on the lane
+    initialize_default(order)
+        override method in class BaseLane and place the vehicles equidistant on the lane in the order of their
+        slots or in the given order of slots (on roads that are not periodic, the last vehicle has no
+        predecessor and the first one no successor)
+    initialize_equilibrium(order)
+        override method in class BaseLane and place the vehicles in the same order as initialize_default, but
+        at the gaps and the common velocity of uniform flow (no transient from a standing start; in the
+        string unstable density range this equilibrium is unstable, so small perturbations still grow into
+        stop-and-go waves)
     """
     def __init__(self, full_length=1000.):
         super().__init__()
         self.full_length = full_length
 
-    def initialize_default(self):
-        for i, vehicle in enumerate(self.vehicles):
-            vehicle.predecessor = self.vehicles[(i + 1) % self.number_of_vehicles]
-            if i == 0:
-                vehicle.successor = self.vehicles[self.number_of_vehicles - 1]
-            else:
-                vehicle.successor = self.vehicles[i - 1]
-            vehicle.position = i * self.full_length / self.number_of_vehicles
-            vehicle.velocity = 0.
+    def initialize_default(self, order=None):
+        state = self.road.state
+        indices = self.get_vehicle_indices() if order is None else np.asarray(order)
+        state.predecessor[indices] = np.roll(indices, -1)
+        state.successor[indices] = np.roll(indices, 1)
+        if not self.road.periodic and len(indices) > 0:
+            state.predecessor[indices[-1]] = -1
+            state.successor[indices[0]] = -1
+        state.position[indices] = np.arange(len(indices)) * self.full_length / len(indices)
+        state.velocity[indices] = 0.
         self.initialized = True
+
+    def initialize_equilibrium(self, order=None):
+        self.initialize_default(order)
+        state = self.road.state
+        indices = self.get_vehicle_indices() if order is None else np.asarray(order)
+        if len(indices) == 0:
+            return
+        velocity, gaps = get_equilibrium(state, indices, self.full_length)
+        # the gap of the last vehicle closes the loop, so only the others are needed
+        spacing = gaps[:-1] + state.length[indices[:-1]]
+        state.position[indices] = np.concatenate(([0.], np.cumsum(spacing)))
+        state.velocity[indices] = velocity
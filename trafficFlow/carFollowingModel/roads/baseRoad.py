@@ -1,3 +1,8 @@
+import numpy as np
+
+from ..vehicleState import VehicleState
+
+
 class BaseRoad:
     """
     Base class for roads used in the car following model
@@ -8,42 +13,71 @@ class BaseRoad:
         total number of lanes of the road
     lanes : list(Lanes)
         lanes of the road
+    state : VehicleState
+        positions, velocities, lengths, lanes, predecessors and driver parameters of all vehicles on the road
     initialized : bool
         true if the vehicles are already placed, false if not
+    periodic : bool
+        true if the lanes are closed loops (the last vehicle of a lane follows the first one)
 
     Methods
     -------
     add_lane(lane)
         add a lane to the road
     get_number_of_vehicles()
-        return the overall number of vehicles on all lanes
+        return the overall number of vehicles on all lanes (the occupied slots of the vehicle state, so no lane
+        has to be visited)
     get_vehicles()
         return a list of all vehicles on all lanes
+    get_lane_lengths()
+        return an array with the full length of every lane
     initialize_default()
         initialize the vehicles with default values for position and velocity
+    initialize_equilibrium()
+        initialize the vehicles of every lane in uniform flow at their equilibrium gaps and velocity
     get_distance(position1, position2)
         get the distance between position1 and position2 on the road (e.g. in the circular case the distance
         has to be calculated more carefully)
+    get_distances(positions1, positions2, lanes1, lanes2)
+        vectorized version of get_distance for arrays of positions and lane indices
     get_position(position)
         transforms a given position to the position on the road (e.g. in the circular case the position
         has to be calculated more carefully)
+    get_positions(positions, lanes)
+        vectorized version of get_position for arrays of positions and lane indices
+    get_positions_on_lanes(positions, lanes, new_lanes)
+        transforms positions on lanes to the corresponding positions on new_lanes (e.g. for lane changes)
+    apply_boundary_conditions(t, dt)
+        handle vehicles entering or leaving the road after a step of length dt ending at time t
+    update_lanes(lanes)
+        update the state of the road that depends on the predecessor/successor links of the given lanes after
+        they were changed (e.g. by lane changes)
+    get_checkpoint_data()
+        return the state of the road that is not stored in the vehicle state as a dict of JSON serializable
+        values (needed to continue a run from a checkpoint)
+    set_checkpoint_data(data)
+        restore the state returned by get_checkpoint_data
     """
 
+    periodic = False
+
     def __init__(self):
         self.number_of_lanes = 0
         self.lanes = []
+        self.state = VehicleState(self)
         self.initialized = False
 
     def add_lane(self, lane):
         self.lanes.append(lane)
         lane.road = self
+        lane.index = self.number_of_lanes
         self.number_of_lanes = self.number_of_lanes + 1
+        for vehicle in lane._vehicles:
+            self.state.add_vehicle(vehicle, lane.index)
+        lane._vehicles = []
 
     def get_number_of_vehicles(self):
-        number_of_vehicles = 0
-        for lane in self.lanes:
-            number_of_vehicles = number_of_vehicles + lane.number_of_vehicles
-        return number_of_vehicles
+        return self.state.number_of_vehicles - self.state.number_of_free_slots
 
     def get_vehicles(self):
         vehicles = []
@@ -52,13 +86,42 @@ class BaseRoad:
                 vehicles.append(vehicle)
         return vehicles
 
+    def get_lane_lengths(self):
+        return np.array([lane.full_length for lane in self.lanes])
+
     def initialize_default(self):
         for lane in self.lanes:
             lane.initialize_default()
         self.initialized = True
 
+    def initialize_equilibrium(self):
+        for lane in self.lanes:
+            lane.initialize_equilibrium()
+        self.initialized = True
+
     def get_distance(self, position1, position2, lane1, lane2):
         raise NotImplementedError
 
+    def get_distances(self, positions1, positions2, lanes1, lanes2):
+        raise NotImplementedError
+
     def get_position(self, position, lane):
         raise NotImplementedError
+
+    def get_positions(self, positions, lanes):
+        raise NotImplementedError
+
+    def get_positions_on_lanes(self, positions, lanes, new_lanes):
+        raise NotImplementedError
+
+    def apply_boundary_conditions(self, t, dt):
+        pass
+
+    def update_lanes(self, lanes):
+        pass
+
+    def get_checkpoint_data(self):
+        return {}
+
+    def set_checkpoint_data(self, data):
+        pass
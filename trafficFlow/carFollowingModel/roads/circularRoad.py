@@ -1,3 +1,5 @@
+import numpy as np
+
 from .baseRoad import BaseRoad
 
 
@@ -5,29 +7,50 @@ class CircularRoad(BaseRoad):
     """
     Class implementing the circular road (handling of vehicles etc., not the visualization)
 
-    Inherits from the BaseRoad class.
+    Inherits from the BaseRoad class. Lanes can have different lengths, positions on different lanes are
+    compared by the fraction of the lane they correspond to.
 
     Methods
     -------
     get_distance(position1, position2)
         override method in class BaseRoad and compute distance with special treatment of circular geometry
+        (position2 is transformed to the lane of position1 if the lanes differ)
+    get_distances(positions1, positions2, lanes1, lanes2)
+        override method in class BaseRoad and compute the distances with modular arithmetic
     get_position(position)
         override method in class BaseRoad and return the correct position on the circle
+    get_positions(positions, lanes)
+        override method in class BaseRoad and return the correct positions on the circle
+    get_positions_on_lanes(positions, lanes, new_lanes)
+        override method in class BaseRoad and scale the positions with the ratio of the lane lengths
     """
 
+    periodic = True
+
     def __init__(self):
         super().__init__()
 
     def get_distance(self, position1, position2, lane1, lane2):
-        if lane1 == lane2:
-            if position1 < position2:
-                return position1 - position2 + lane1.full_length
-            return position1 - position2
-        else:
-            ###########################################################
-            raise NotImplementedError
+        if lane1 != lane2:
+            position2 = position2 * lane1.full_length / lane2.full_length
+        if position1 < position2:
+            return position1 - position2 + lane1.full_length
+        return position1 - position2
+
+    def get_distances(self, positions1, positions2, lanes1, lanes2):
+        lane_lengths = self.get_lane_lengths()
+        if lanes1 is not lanes2:
+            positions2 = self.get_positions_on_lanes(positions2, lanes2, lanes1)
+        return np.mod(positions1 - positions2, lane_lengths[lanes1])
 
     def get_position(self, position, lane):
         if position < lane.full_length:
             return position
         return position - lane.full_length
+
+    def get_positions(self, positions, lanes):
+        return np.mod(positions, self.get_lane_lengths()[lanes])
+
+    def get_positions_on_lanes(self, positions, lanes, new_lanes):
+        lane_lengths = self.get_lane_lengths()
+        return positions * lane_lengths[new_lanes] / lane_lengths[lanes]
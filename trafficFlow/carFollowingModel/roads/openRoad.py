@@ -0,0 +1,200 @@
+import numpy as np
+
+from ..vehiclePool import VehiclePool
+from .baseRoad import BaseRoad
+
+
+class OpenRoad(BaseRoad):
+    """
+    Class implementing a straight road with an inflow at the beginning and a free outflow at the end of its lanes
+
+    Inherits from the BaseRoad class. All lanes share the same coordinate (distance from the inflow) and
+    vehicles leave the road as soon as they pass the end of their lane. Vehicles entering the road are taken
+    from a VehiclePool, so their slots in the vehicle state are reused and the memory stays constant during
+    long runs. Every lane keeps its first (head) and last (tail) vehicle, so inserting and removing a vehicle
+    only changes a constant number of predecessor/successor links.
+
+    Attributes
+    ----------
+    demand : double
+        vehicles per second and lane that want to enter the road
+    pool : VehiclePool
+        pool of the entering vehicles (None if there is no inflow)
+    insertion_velocity : double
+        velocity of entering vehicles (limited by the velocity of the last vehicle on the lane)
+    minimum_insertion_gap : double
+        minimum gap between an entering vehicle and the last vehicle on the lane (measured like the gaps of the
+        car following model, i.e. with the length of the entering vehicle) to insert a vehicle
+    lane_heads : np.ndarray
+        slot of the first vehicle of every lane (-1 if the lane is empty)
+    lane_tails : np.ndarray
+        slot of the last vehicle of every lane (-1 if the lane is empty)
+    number_of_entered_vehicles : int
+        number of vehicles that entered the road until now
+    number_of_left_vehicles : int
+        number of vehicles that left the road until now
+
+    Methods
+    -------
+    set_inflow(demand, DriverType, insertion_velocity, minimum_insertion_gap, capacity, length, **parameters)
+        let vehicles of class DriverType with the given parameters enter every lane at a rate of demand
+    get_distance(position1, position2)
+        override method in class BaseRoad and compute the distance along the road
+    get_distances(positions1, positions2, lanes1, lanes2)
+        override method in class BaseRoad and compute the distances along the road
+    get_position(position)
+        override method in class BaseRoad and return the position (the road is not periodic)
+    get_positions(positions, lanes)
+        override method in class BaseRoad and return the positions (the road is not periodic)
+    get_positions_on_lanes(positions, lanes, new_lanes)
+        override method in class BaseRoad and return the positions (all lanes share the same coordinate)
+    apply_boundary_conditions(t, dt)
+        override method in class BaseRoad, remove the vehicles that passed the end of their lane and insert
+        the vehicles demanded since the last step
+    update_lanes(lanes)
+        override method in class BaseRoad and find the first and the last vehicle of the given lanes again
+    get_checkpoint_data()
+        override method in class BaseRoad and return the inflow settings, counters and pool
+    set_checkpoint_data(data)
+        override method in class BaseRoad and restore the inflow settings, counters and pool
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.demand = 0.
+        self.pool = None
+        self.insertion_velocity = 0.
+        self.minimum_insertion_gap = 0.
+        self.lane_heads = None
+        self.lane_tails = None
+        self.number_of_entered_vehicles = 0
+        self.number_of_left_vehicles = 0
+        self._inflow_credit = None
+
+    def set_inflow(self, demand, DriverType, insertion_velocity, minimum_insertion_gap=10., capacity=1024,
+                   length=4., **parameters):
+        self.demand = demand
+        self.pool = VehiclePool(self.state, DriverType, capacity=capacity, length=length, **parameters)
+        self.insertion_velocity = insertion_velocity
+        self.minimum_insertion_gap = minimum_insertion_gap
+
+    def initialize_default(self):
+        super().initialize_default()
+        self._find_heads_and_tails()
+
+    def _find_heads_and_tails(self):
+        self.lane_heads = np.full(self.number_of_lanes, -1)
+        self.lane_tails = np.full(self.number_of_lanes, -1)
+        self._inflow_credit = np.zeros(self.number_of_lanes)
+        self.update_lanes(np.arange(self.number_of_lanes))
+
+    def update_lanes(self, lanes):
+        if self.lane_heads is None:
+            return
+        state = self.state
+        self.lane_heads[lanes] = -1
+        self.lane_tails[lanes] = -1
+        occupied = np.flatnonzero(np.isin(state.lane, lanes))
+        lanes = state.lane[occupied]
+        self.lane_heads[lanes[state.predecessor[occupied] < 0]] = occupied[state.predecessor[occupied] < 0]
+        self.lane_tails[lanes[state.successor[occupied] < 0]] = occupied[state.successor[occupied] < 0]
+
+    def get_distance(self, position1, position2, lane1, lane2):
+        return position1 - position2
+
+    def get_distances(self, positions1, positions2, lanes1, lanes2):
+        return positions1 - positions2
+
+    def get_position(self, position, lane):
+        return position
+
+    def get_positions(self, positions, lanes):
+        return positions
+
+    def get_positions_on_lanes(self, positions, lanes, new_lanes):
+        return positions
+
+    def _remove_head(self, lane):
+        state = self.state
+        head = self.lane_heads[lane]
+        follower = state.successor[head]
+        self.lane_heads[lane] = follower
+        if follower >= 0:
+            state.predecessor[follower] = -1
+        else:
+            self.lane_tails[lane] = -1
+        if self.pool is not None and self.pool.owns(head):
+            self.pool.release(head)
+        else:
+            # vehicles placed on the road initially may have other parameters than the entering ones, so
+            # their slots are not reused
+            self.state.free_slot(head)
+        self.lanes[lane].number_of_vehicles = self.lanes[lane].number_of_vehicles - 1
+        self.number_of_left_vehicles = self.number_of_left_vehicles + 1
+
+    def _insert_tail(self, lane):
+        state = self.state
+        tail = self.lane_tails[lane]
+        velocity = self.insertion_velocity
+        if tail >= 0:
+            velocity = min(velocity, state.velocity[tail])
+        index = self.pool.acquire(lane, 0., velocity)
+        state.predecessor[index] = tail
+        if tail >= 0:
+            state.successor[tail] = index
+        else:
+            self.lane_heads[lane] = index
+        self.lane_tails[lane] = index
+        self.lanes[lane].number_of_vehicles = self.lanes[lane].number_of_vehicles + 1
+        self.number_of_entered_vehicles = self.number_of_entered_vehicles + 1
+
+    def apply_boundary_conditions(self, t, dt):
+        if self.lane_heads is None:
+            self._find_heads_and_tails()
+        state = self.state
+        for lane in range(self.number_of_lanes):
+            full_length = self.lanes[lane].full_length
+            while self.lane_heads[lane] >= 0 and state.position[self.lane_heads[lane]] > full_length:
+                self._remove_head(lane)
+
+            if self.pool is None:
+                continue
+            self._inflow_credit[lane] = self._inflow_credit[lane] + self.demand * dt
+            while self._inflow_credit[lane] >= 1.:
+                tail = self.lane_tails[lane]
+                if tail >= 0 and state.position[tail] - self.pool.length < self.minimum_insertion_gap:
+                    break
+                self._insert_tail(lane)
+                self._inflow_credit[lane] = self._inflow_credit[lane] - 1.
+
+    def get_checkpoint_data(self):
+        data = {'demand': self.demand,
+                'insertion_velocity': self.insertion_velocity,
+                'minimum_insertion_gap': self.minimum_insertion_gap,
+                'number_of_entered_vehicles': self.number_of_entered_vehicles,
+                'number_of_left_vehicles': self.number_of_left_vehicles,
+                'inflow_credit': None if self._inflow_credit is None else self._inflow_credit.tolist(),
+                'pool': None}
+        if self.pool is not None:
+            data['pool'] = {'model': self.state.driver_types.index(self.pool.DriverType),
+                            'capacity': self.pool.capacity,
+                            'length': float(self.pool.length),
+                            'parameters': {name: float(value) for name, value in self.pool.parameters.items()},
+                            'blocks': [int(first) for first in self.pool.blocks],
+                            'free_slots': [int(index) for index in self.pool.free_slots]}
+        return data
+
+    def set_checkpoint_data(self, data):
+        self.demand = data['demand']
+        self.insertion_velocity = data['insertion_velocity']
+        self.minimum_insertion_gap = data['minimum_insertion_gap']
+        self.number_of_entered_vehicles = data['number_of_entered_vehicles']
+        self.number_of_left_vehicles = data['number_of_left_vehicles']
+        pool = data['pool']
+        if pool is not None:
+            self.pool = VehiclePool.restore(self.state, self.state.driver_types[pool['model']], pool['blocks'],
+                                            pool['free_slots'], pool['capacity'], pool['length'],
+                                            **pool['parameters'])
+        self._find_heads_and_tails()
+        if data['inflow_credit'] is not None:
+            self._inflow_credit = np.array(data['inflow_credit'])
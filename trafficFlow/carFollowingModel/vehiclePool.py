@@ -0,0 +1,82 @@
+class VehiclePool:
+    """
+    Class that manages preallocated slots in a vehicle state for vehicles entering and leaving a road
+
+    Free slots have lane index -1 and no predecessor or successor, so they do not interact with other
+    vehicles. Acquiring and releasing a slot is O(1) and no driver objects are created; if all slots are in
+    use, the pool grows by its initial capacity.
+
+    Attributes
+    ----------
+    state : VehicleState
+        vehicle state the slots belong to
+    DriverType : class
+        driver class of the vehicles
+    capacity : int
+        number of slots allocated in one go
+    length : double
+        length of the vehicles
+    parameters : dict
+        driver parameters of the vehicles
+    free_slots : list(int)
+        slots currently not in use
+    blocks : list(int)
+        first slot of every block of slots allocated by the pool
+
+    Methods
+    -------
+    acquire(lane_index, position, velocity)
+        take a free slot, place a vehicle on lane lane_index and return the slot
+    release(index)
+        remove the vehicle in the slot index from its lane and return the slot to the pool
+    owns(index)
+        return whether the slot index was allocated by the pool
+    restore(state, DriverType, blocks, free_slots, capacity, length, **parameters)
+        create a pool for slots that are already allocated in the state (e.g. restored from a checkpoint)
+    """
+
+    def __init__(self, state, DriverType, capacity=1024, length=4., **parameters):
+        self.state = state
+        self.DriverType = DriverType
+        self.capacity = capacity
+        self.length = length
+        self.parameters = parameters
+        self.free_slots = []
+        self.blocks = []
+        self._allocate()
+
+    @classmethod
+    def restore(cls, state, DriverType, blocks, free_slots, capacity=1024, length=4., **parameters):
+        pool = cls.__new__(cls)
+        pool.state = state
+        pool.DriverType = DriverType
+        pool.capacity = capacity
+        pool.length = length
+        pool.parameters = parameters
+        pool.blocks = list(blocks)
+        pool.free_slots = list(free_slots)
+        return pool
+
+    def _allocate(self):
+        first = self.state.add_vehicles(self.capacity, self.DriverType, -1, length=self.length, **self.parameters)
+        self.blocks.append(first)
+        self.free_slots.extend(range(first + self.capacity - 1, first - 1, -1))
+        self.state.number_of_free_slots = self.state.number_of_free_slots + self.capacity
+
+    def acquire(self, lane_index, position=0., velocity=0.):
+        if not self.free_slots:
+            self._allocate()
+        index = self.free_slots.pop()
+        state = self.state
+        state.lane[index] = lane_index
+        state.position[index] = position
+        state.velocity[index] = velocity
+        state.number_of_free_slots = state.number_of_free_slots - 1
+        return index
+
+    def release(self, index):
+        self.state.free_slot(index)
+        self.free_slots.append(index)
+
+    def owns(self, index):
+        return any(first <= index < first + self.capacity for first in self.blocks)
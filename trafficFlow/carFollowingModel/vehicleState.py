@@ -0,0 +1,257 @@
+import numpy as np
+
+
+class VehicleState:
+    """
+    Class that stores the state of all vehicles of a road in contiguous arrays (structure of arrays)
+
+    Every vehicle occupies one slot (its index) in all arrays. Driver objects only keep their index and
+    read and write their attributes from and to these arrays, so the model can advance all vehicles at once.
+
+    Attributes
+    ----------
+    road : Road
+        road owning the state (needed to map lane indices to lanes)
+    number_of_vehicles : int
+        number of allocated slots (including free slots of vehicle pools)
+    number_of_free_slots : int
+        number of slots currently not used by a vehicle (their lane index is -1)
+    capacity : int
+        number of allocated slots (grows geometrically when vehicles are added)
+    arrays : dict(str, np.ndarray)
+        views of length number_of_vehicles on the allocated buffers, one per field or driver parameter
+    drivers : list(Driver)
+        driver object of every slot (None if no object has been requested for this slot yet)
+    driver_types : list(class)
+        driver classes present in the state, the field 'model' holds the position in this list
+    position : np.ndarray
+        positions of the vehicles
+    velocity : np.ndarray
+        velocities of the vehicles
+    length : np.ndarray
+        lengths of the vehicles
+    lane : np.ndarray
+        index of the lane of the vehicles (position of the lane in road.lanes, -1 for free slots)
+    predecessor : np.ndarray
+        index of the predecessor on the same lane (-1 if there is none)
+    successor : np.ndarray
+        index of the successor on the same lane (-1 if there is none)
+    predecessor_left, successor_left, predecessor_right, successor_right : np.ndarray
+        index of the predecessor/successor on the lane to the left/right (-1 if there is none, only set by
+        lane change models)
+    model : np.ndarray
+        index of the driver class in driver_types
+
+    Methods
+    -------
+    add_vehicle(vehicle, lane_index)
+        store the vehicle in a new slot and attach the driver object to it
+    add_vehicles(number, DriverType, lane_index, position, velocity, length, **parameters)
+        allocate number slots for vehicles of class DriverType at once without creating driver objects and
+        return the index of the first slot (all values can be scalars or arrays)
+    free_slot(index)
+        remove the vehicle in the slot index from its lane (the slot keeps its driver type and parameters, so
+        it can be reused by a vehicle pool)
+    restore(arrays, driver_types)
+        replace the content of the state by the given arrays (one per field and driver parameter, e.g. from a
+        checkpoint) without creating driver objects
+    get_array(name)
+        return the array of the field or parameter name
+    get_driver(index)
+        return the driver object of slot index (a view is created if there is none yet)
+    get_drivers(indices)
+        return the driver objects of the given slots
+    get_model_indices(model)
+        return the slots of all vehicles using the driver class driver_types[model] (a slice if they are
+        contiguous, e.g. after adding every type with add_vehicles, so the kernels use views instead of copies)
+    get_y()
+        return the solution vector (positions followed by velocities) of the ordinary differential equation
+    set_y(y)
+        write the solution vector y back to the position and velocity arrays
+    """
+
+    fields = {'position': np.float64, 'velocity': np.float64, 'length': np.float64,
+              'lane': np.intp, 'predecessor': np.intp, 'successor': np.intp, 'model': np.intp,
+              'predecessor_left': np.intp, 'successor_left': np.intp,
+              'predecessor_right': np.intp, 'successor_right': np.intp}
+    references = ('predecessor', 'successor', 'predecessor_left', 'successor_left',
+                  'predecessor_right', 'successor_right')
+
+    def __init__(self, road=None, capacity=16):
+        self.road = road
+        self.number_of_vehicles = 0
+        self.number_of_free_slots = 0
+        self.capacity = 0
+        self._buffers = {}
+        self.arrays = {}
+        self.drivers = []
+        self.driver_types = []
+        self._model_indices = None
+
+        for name, dtype in self.fields.items():
+            self._buffers[name] = np.empty(0, dtype=dtype)
+        self._reserve(capacity)
+
+    @property
+    def position(self):
+        return self.arrays['position']
+
+    @property
+    def velocity(self):
+        return self.arrays['velocity']
+
+    @property
+    def length(self):
+        return self.arrays['length']
+
+    @property
+    def lane(self):
+        return self.arrays['lane']
+
+    @property
+    def predecessor(self):
+        return self.arrays['predecessor']
+
+    @property
+    def successor(self):
+        return self.arrays['successor']
+
+    @property
+    def model(self):
+        return self.arrays['model']
+
+    def _reserve(self, capacity):
+        if capacity > self.capacity:
+            capacity = max(capacity, 2 * self.capacity)
+            for name, buffer in self._buffers.items():
+                new_buffer = np.empty(capacity, dtype=buffer.dtype)
+                new_buffer[:self.number_of_vehicles] = buffer[:self.number_of_vehicles]
+                self._buffers[name] = new_buffer
+            self.capacity = capacity
+        self._update_views()
+
+    def _update_views(self):
+        for name, buffer in self._buffers.items():
+            self.arrays[name] = buffer[:self.number_of_vehicles]
+
+    def _add_parameter(self, name):
+        self._buffers[name] = np.full(self.capacity, np.nan)
+        self.arrays[name] = self._buffers[name][:self.number_of_vehicles]
+
+    def _get_model(self, DriverType):
+        if DriverType not in self.driver_types:
+            self.driver_types.append(DriverType)
+            for name in DriverType.parameter_names:
+                if name not in self._buffers:
+                    self._add_parameter(name)
+        return self.driver_types.index(DriverType)
+
+    def add_vehicle(self, vehicle, lane_index):
+        model = self._get_model(type(vehicle))
+        index = self.number_of_vehicles
+        self._reserve(index + 1)
+        self.number_of_vehicles = index + 1
+        self._update_views()
+
+        for name in self._buffers:
+            if name not in self.fields and name not in type(vehicle).parameter_names:
+                self.arrays[name][index] = np.nan
+        for name in ('position', 'velocity', 'length') + type(vehicle).parameter_names:
+            self.arrays[name][index] = getattr(vehicle, name)
+        self.lane[index] = lane_index
+        for name in self.references:
+            self.arrays[name][index] = -1
+        self.model[index] = model
+
+        self._model_indices = None
+        self.drivers.append(vehicle)
+        vehicle.state = self
+        vehicle.index = index
+        return index
+
+    def add_vehicles(self, number, DriverType, lane_index, position=0., velocity=0., length=4., **parameters):
+        model = self._get_model(DriverType)
+        first = self.number_of_vehicles
+        self._reserve(first + number)
+        self.number_of_vehicles = first + number
+        self._update_views()
+
+        new = slice(first, first + number)
+        for name in self._buffers:
+            if name not in self.fields:
+                self.arrays[name][new] = parameters.get(name, np.nan)
+        self.position[new] = position
+        self.velocity[new] = velocity
+        self.length[new] = length
+        self.lane[new] = lane_index
+        for name in self.references:
+            self.arrays[name][new] = -1
+        self.model[new] = model
+
+        self._model_indices = None
+        self.drivers.extend([None] * number)
+        return first
+
+    def free_slot(self, index):
+        self.lane[index] = -1
+        self.velocity[index] = 0.
+        for name in self.references:
+            self.arrays[name][index] = -1
+        self.number_of_free_slots = self.number_of_free_slots + 1
+
+    def restore(self, arrays, driver_types):
+        self.number_of_vehicles = 0
+        self.capacity = 0
+        self._buffers = {name: np.empty(0, dtype=dtype) for name, dtype in self.fields.items()}
+        self.arrays = {}
+        self.driver_types = []
+        self._model_indices = None
+        for DriverType in driver_types:
+            self._get_model(DriverType)
+
+        number_of_vehicles = len(arrays['position'])
+        self._reserve(number_of_vehicles)
+        self.number_of_vehicles = number_of_vehicles
+        self._update_views()
+        for name, array in arrays.items():
+            if name not in self._buffers:
+                self._add_parameter(name)
+            self.arrays[name][:] = array
+        self.drivers = [None] * number_of_vehicles
+        self.number_of_free_slots = int(np.count_nonzero(self.lane < 0))
+
+    def get_array(self, name):
+        return self.arrays[name]
+
+    def get_driver(self, index):
+        if self.drivers[index] is None:
+            DriverType = self.driver_types[self.model[index]]
+            vehicle = DriverType.__new__(DriverType)
+            vehicle.object_in_visualization = None
+            vehicle.state = self
+            vehicle.index = index
+            self.drivers[index] = vehicle
+        return self.drivers[index]
+
+    def get_drivers(self, indices):
+        return [self.get_driver(index) for index in indices]
+
+    def get_model_indices(self, model):
+        if self._model_indices is None:
+            if len(self.driver_types) == 1:
+                self._model_indices = [slice(None)]
+            else:
+                self._model_indices = []
+                for i in range(len(self.driver_types)):
+                    indices = np.flatnonzero(self.model == i)
+                    if len(indices) > 0 and indices[-1] - indices[0] + 1 == len(indices):
+                        indices = slice(int(indices[0]), int(indices[-1]) + 1)
+                    self._model_indices.append(indices)
+        return self._model_indices[model]
+
+    def get_y(self):
+        return np.concatenate((self.position, self.velocity))
+
+    def set_y(self, y):
+        self.position[:] = y[:self.number_of_vehicles]
+        self.velocity[:] = y[self.number_of_vehicles:]
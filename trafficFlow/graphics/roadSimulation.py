@@ -38,6 +38,14 @@ class RoadSimulation(tk.Frame):
         button to pause the simulation
     quit_button : tk.Button
         button to quit the simulation and close the window
+    source : ReplayPlayer
+        player of a recorded trajectory to show instead of running the model (None for a live simulation)
+    seek_scale : tk.Scale
+        slider to jump to a time of the recorded trajectory (only for replays)
+    speed_box : tk.Spinbox
+        selection of the replay speed (only for replays)
+    profiler : Profiler
+        profiler passed on to the road simulation to measure the rendering (None to disable profiling)
 
     Methods
     -------
@@ -49,14 +57,25 @@ class RoadSimulation(tk.Frame):
         execute on button click and start running the simulation
     pause()
         execute on button click and interrupt the simulation
+    quit_simulation()
+        execute on button click, stop the simulation and close the window
+    seek(value)
+        execute when the seek slider is moved and continue the replay at the selected time
+    set_speed()
+        execute when the replay speed is changed
     """
 
-    def __init__(self, RoadType, model, time_discretization_scheme, dt=1e-1, master=None):
+    replay_speeds = ('0.25', '0.5', '1', '2', '5', '10', '20', '50', '100')
+
+    def __init__(self, RoadType, model, time_discretization_scheme, dt=1e-1, master=None, source=None,
+                 profiler=None):
         tk.Frame.__init__(self, master)
         self.RoadType = RoadType
         self.model = model
         self.time_discretization_scheme = time_discretization_scheme
         self.dt = dt
+        self.source = source
+        self.profiler = profiler
         self.width = 500
         self.height = 500
 
@@ -65,6 +84,8 @@ class RoadSimulation(tk.Frame):
         self.start_button = None
         self.pause_button = None
         self.quit_button = None
+        self.seek_scale = None
+        self.speed_box = None
 
         self.grid()
         self.create_widgets()
@@ -75,22 +96,46 @@ class RoadSimulation(tk.Frame):
 
         self.road_simulation = self.RoadType(self.canvas, 0, 0, self.width, self.height, model=self.model,
                                              time_discretization_scheme=self.time_discretization_scheme,
-                                             lane_width=20, dt=self.dt)
+                                             lane_width=20, dt=self.dt, source=self.source,
+                                             profiler=self.profiler)
 
         self.start_button = tk.Button(self, text='Start', command=self.start_simulation)
         self.start_button.grid(row=1, column=0)
         self.pause_button = tk.Button(self, text='Pause', command=self.pause)
         self.pause_button.grid(row=1, column=1)
-        self.quit_button = tk.Button(self, text='Quit', command=self.quit)
+        self.quit_button = tk.Button(self, text='Quit', command=self.quit_simulation)
         self.quit_button.grid(row=1, column=2)
 
+        if self.source is not None:
+            times = self.source.reader.times
+            self.seek_scale = tk.Scale(self, from_=times[0], to=times[-1], orient=tk.HORIZONTAL, showvalue=False,
+                                       resolution=max((times[-1] - times[0]) / 1000., 1e-3), command=self.seek)
+            self.seek_scale.grid(row=2, column=0, columnspan=2, sticky='ew')
+            self.speed_box = tk.Spinbox(self, values=self.replay_speeds, width=6, command=self.set_speed)
+            self.speed_box.delete(0, tk.END)
+            self.speed_box.insert(0, '{:g}'.format(self.source.speed))
+            self.speed_box.bind('<Return>', lambda event: self.set_speed())
+            self.speed_box.grid(row=2, column=2)
+
     def start(self):
         self.road_simulation.start()
         self.mainloop()
 
     def start_simulation(self):
-        if not self.road_simulation.running:
-            self.road_simulation.running = True
+        self.road_simulation.resume()
 
     def pause(self):
         self.road_simulation.toggle_pause()
+
+    def quit_simulation(self):
+        self.road_simulation.stop()
+        self.quit()
+
+    def seek(self, value):
+        self.source.seek(float(value))
+
+    def set_speed(self):
+        try:
+            self.source.set_speed(float(self.speed_box.get()))
+        except ValueError:
+            pass
@@ -7,6 +7,8 @@ except ImportError:  # Python 3
     import tkinter.font as tkFont
     import tkinter.ttk as ttk
 
+from trafficFlow.runners.simulationWorker import SimulationWorker
+
 
 class BaseRoadSimulation:
     """
@@ -34,18 +36,38 @@ class BaseRoadSimulation:
         width of a single lane
     dt : double
         time step size
+    worker : SimulationWorker
+        thread that runs the simulation and publishes snapshots, so drawing never waits for the time steps
+        (or another source of snapshots such as a ReplayPlayer)
+    replay : bool
+        true if the snapshots are not computed by a SimulationWorker (model may be None in this case)
+    lane_lengths : np.ndarray
+        full length of every lane
+    number_of_lanes : int
+        number of lanes of the road
+    profiler : Profiler
+        profiler measuring the time needed to draw a frame and counting frames and changed canvas items (None
+        to disable profiling)
+    running : bool
+        determine whether the simulation is actually running or not (for replays taken from the source, which
+        pauses itself at the end of the trajectory)
 
     Methods
     -------
     start(interval)
         function that is executed when starting/initializing the simulation
     step(delta)
-        function that performs the update of the scenery depending on the simulation using model
+        function that performs the update of the scenery depending on the latest snapshot of the worker
     toggle_pause()
         stop simulation and continue it
+    resume()
+        continue the simulation if it is paused
+    stop()
+        stop the worker (the simulation can not be continued afterwards)
     """
 
-    def __init__(self, canvas, x0, y0, x1, y1, model, time_discretization_scheme, lane_width=20, dt=1e-1):
+    def __init__(self, canvas, x0, y0, x1, y1, model, time_discretization_scheme, lane_width=20, dt=1e-1,
+                 steps_per_snapshot=1, time_scale=None, source=None, profiler=None):
         self.custom_font = tkFont.Font(family="Helvetica", size=12, weight='bold')
         self.canvas = canvas
         self.x0 , self.y0, self.x1, self.y1 = x0, y0, x1, y1
@@ -54,6 +76,15 @@ class BaseRoadSimulation:
         self.model = model
         self.time_discretization_scheme = time_discretization_scheme
         self.dt = dt
+        self.replay = source is not None
+        if self.replay:
+            self.worker = source
+        else:
+            self.worker = SimulationWorker(model, time_discretization_scheme, dt, steps_per_snapshot, time_scale)
+        self.lane_lengths = self.worker.lane_lengths
+        self.number_of_lanes = len(self.lane_lengths)
+        self.profiler = profiler
+        self.running = False
 
     def start(self, interval=50):
         raise NotImplementedError
@@ -61,5 +92,20 @@ class BaseRoadSimulation:
     def step(selfself, delta):
         raise NotImplementedError
 
+    def _synchronize_running(self):
+        if self.replay:
+            self.running = self.worker.running
+
     def toggle_pause(self):
-        raise NotImplementedError
+        self._synchronize_running()
+        self.running = not self.running
+        self.worker.toggle_pause()
+
+    def resume(self):
+        self._synchronize_running()
+        if not self.running:
+            self.toggle_pause()
+
+    def stop(self):
+        self.running = False
+        self.worker.stop()
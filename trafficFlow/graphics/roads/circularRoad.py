@@ -7,6 +7,8 @@ except ImportError:  # Python 3
     import tkinter.font as tkFont
     import tkinter.ttk as ttk
 
+import numpy as np
+
 from .baseRoadSimulation import BaseRoadSimulation
 
 
@@ -14,7 +16,12 @@ class CircularRoadSimulation(BaseRoadSimulation):
     """
     Class to model a circular road and perform the simulation on the circle
 
-    Inherits from the BaseRoadSimulation class.
+    Inherits from the BaseRoadSimulation class. Up to max_drawn_vehicles vehicles are drawn as single arcs, and
+    an arc is only moved if its vehicle moved by more than pixel_threshold pixels since it was drawn. For more
+    vehicles, every lane is split into sectors that are drawn as heat bands: the color shows the mean velocity
+    (red for standing, green for free traffic) and the width the occupancy of the sector. Bands are only
+    reconfigured if their quantized color or width changed, so the work per frame does not grow with the
+    number of vehicles on the canvas.
 
     Attributes
     ----------
@@ -24,29 +31,45 @@ class CircularRoadSimulation(BaseRoadSimulation):
         y coordinate of the center of the circle
     full_extent : double
         full extent of the circle
-    running : bool
-        determine whether the simulation is actually running or not
     steps : int
-        number of steps performed until now
+        number of steps of the snapshot shown at the moment
     time : double
-        time expired until now
+        time of the snapshot shown at the moment
     timesteps_per_simulationstep : int
-        time steps to perform before updating the visualization (depends on the time step size dt)
+        time steps the worker performs between two snapshots (depends on the time step size dt)
+    arcs : list(int)
+        canvas item of every vehicle slot in the vehicle state (empty if the sectors are drawn)
+    pixel_threshold : double
+        minimum distance in pixels a vehicle has to move before its arc is moved
+    max_drawn_vehicles : int
+        largest number of vehicles that are drawn as single arcs
+    number_of_sectors : int
+        number of sectors per lane if the vehicles are not drawn as single arcs
+    aggregated : bool
+        true if sectors are drawn instead of single vehicles
+    number_of_updated_items : int
+        number of canvas items changed in the last frame
 
     Methods
     -------
     start(interval)
         override method in class BaseRoadSimulation and setup the vehicles and the time banner
     step(delta)
-        override method in class BaseRoadSimulation and perform a single step of the simulation,
-        update the positions of the cars according to the changes made when simulating a single
-        step in the model
-    toggle_pause()
-        stop simulation and continue it
+        override method in class BaseRoadSimulation and update the positions of the cars according to the
+        latest snapshot published by the worker (older snapshots are skipped)
+    get_lane_box(i)
+        return the bounding box of the arcs of the vehicles on lane i
+    get_lane_radius(i)
+        return the radius of the arcs of the vehicles on lane i in pixels
     """
 
-    def __init__(self, canvas, x0, y0, x1, y1, model, time_discretization_scheme, lane_width=20, dt=1e-1):
-        super().__init__(canvas, x0, y0, x1, y1, model, time_discretization_scheme, lane_width, dt)
+    velocity_colors = ['#%02x%02x00' % (int(255 * min(1., 2. - 2. * i / 15.)), int(255 * min(1., 2. * i / 15.)))
+                       for i in range(16)]
+
+    def __init__(self, canvas, x0, y0, x1, y1, model, time_discretization_scheme, lane_width=20, dt=1e-1,
+                 pixel_threshold=1., max_drawn_vehicles=500, number_of_sectors=90, source=None, profiler=None):
+        super().__init__(canvas, x0, y0, x1, y1, model, time_discretization_scheme, lane_width, dt,
+                         steps_per_snapshot=max(1, int(0.25/dt)), source=source, profiler=profiler)
 
         self.x0, self.y0, self.x1, self.y1 = x0+lane_width, y0+lane_width, x1-lane_width, y1-lane_width
         self.tx, self.ty = (x1+x0) / 2, (y1+y0) / 2
@@ -54,50 +77,144 @@ class CircularRoadSimulation(BaseRoadSimulation):
         lane_width2 = lane_width / 2
         self.canvas.create_oval(self.x0-lane_width2, self.y0-lane_width2,
                                 self.x1+lane_width2, self.y1+lane_width2)
-        for i in range(self.model.road.number_of_lanes):
+        for i in range(self.number_of_lanes):
             self.canvas.create_oval(self.x0+lane_width2+lane_width*i, self.y0+lane_width2+lane_width*i,
                                     self.x1-lane_width2-lane_width*i, self.y1-lane_width2-lane_width*i)
-        self.running = False
         self.steps = 0
         self.time = 0.0
-        self.timesteps_per_simulationstep = int(0.25/dt)
+        self.timesteps_per_simulationstep = max(1, int(0.25/dt))
+        self.arcs = []
+        self.pixel_threshold = pixel_threshold
+        self.max_drawn_vehicles = max_drawn_vehicles
+        self.number_of_sectors = number_of_sectors
+        self.aggregated = False
+        self.number_of_updated_items = 0
 
     def start(self, interval=50):
         self.interval = interval
         self.increment = self.full_extent / interval
         self.extent = 0
 
-        for i, lane in enumerate(self.model.road.lanes):
-            for vehicle in lane.vehicles:
-                vehicle.object_in_visualization = self.canvas.create_arc(self.x0+self.lane_width*(self.model.road.number_of_lanes-1-i),
-                                                                         self.y0+self.lane_width*(self.model.road.number_of_lanes-1-i),
-                                                                         self.x1-self.lane_width*(self.model.road.number_of_lanes-1-i),
-                                                                         self.y1-self.lane_width*(self.model.road.number_of_lanes-1-i),
-                                                                         start=vehicle.position * self.full_extent / lane.full_length,
-                                                                         extent=vehicle.length,
-                                                                         width=self.lane_width,
-                                                                         style='arc')
+        snapshot = self.worker.get_latest_snapshot()
+        self.aggregated = np.count_nonzero(snapshot.lane >= 0) > self.max_drawn_vehicles
+        if self.aggregated:
+            self._create_sectors()
+        else:
+            self._create_arcs(snapshot)
+        self._draw(snapshot)
 
         t = 't = ' + str(int(self.time))
         self.label_id = self.canvas.create_text(self.tx, self.ty, text=t, font=self.custom_font)
+        if not self.replay:
+            # simulate as much time per interval as the simulation in the event loop did before
+            self.worker.time_scale = self.timesteps_per_simulationstep * self.dt * 1000. / interval
+        self.worker.start()
         self.canvas.after(interval, self.step, self.increment)
 
-    def step(self, delta):
-        if self.running:
-            for i in range(self.timesteps_per_simulationstep):
-                self.steps = self.steps + 1
-                self.time = self.time + self.dt
-                self.model.simulate_one_step(self.time_discretization_scheme, self.time, self.dt)
-
-            for lane in self.model.road.lanes:
-                for vehicle in lane.vehicles:
-                    self.canvas.itemconfigure(vehicle.object_in_visualization,
-                                              start=vehicle.position * self.full_extent / lane.full_length)
+    def _create_arcs(self, snapshot):
+        starts = snapshot.position * self.full_extent / self.lane_lengths[snapshot.lane]
+        for index in range(len(snapshot.position)):
+            self.arcs.append(self.canvas.create_arc(*self.get_lane_box(snapshot.lane[index]),
+                                                    start=starts[index],
+                                                    extent=snapshot.length[index],
+                                                    width=self.lane_width,
+                                                    style='arc'))
+        if not self.replay:
+            state = self.model.road.state
+            for index in range(len(self.arcs)):
+                if state.drivers[index] is not None:
+                    state.drivers[index].object_in_visualization = self.arcs[index]
+        self.vehicle_lanes = snapshot.lane.copy()
+        self.drawn_starts = starts
+
+    def _create_sectors(self):
+        sector_extent = self.full_extent / self.number_of_sectors
+        self.sectors = [[self.canvas.create_arc(*self.get_lane_box(lane), start=sector * sector_extent,
+                                                extent=sector_extent, width=0, style='arc')
+                         for sector in range(self.number_of_sectors)]
+                        for lane in range(self.number_of_lanes)]
+        shape = (self.number_of_lanes, self.number_of_sectors)
+        self.drawn_colors = np.full(shape, -1)
+        self.drawn_widths = np.zeros(shape, dtype=int)
 
+    def step(self, delta):
+        if self.profiler is not None:
+            start = self.profiler.start()
+        snapshot = self.worker.get_latest_snapshot()
+        if snapshot is not None:
+            self._draw(snapshot)
             t = 't = ' + str(int(self.time))
             self.canvas.itemconfigure(self.label_id, text=t)
+        if self.profiler is not None:
+            if snapshot is None:
+                self.profiler.count('frames_without_snapshot')
+            else:
+                self.profiler.stop('render', start)
+                self.profiler.count('frames')
+                self.profiler.count('rendered_items', self.number_of_updated_items)
 
         self.after_id = self.canvas.after(self.interval, self.step, delta)
 
-    def toggle_pause(self):
-        self.running = not self.running
+    def _draw(self, snapshot):
+        self.steps = snapshot.steps
+        self.time = snapshot.time
+        if self.aggregated:
+            self.number_of_updated_items = self._draw_sectors(snapshot)
+        else:
+            self.number_of_updated_items = self._draw_arcs(snapshot)
+
+    def _draw_arcs(self, snapshot):
+        number_of_arcs = len(self.arcs)
+        lane = snapshot.lane[:number_of_arcs]
+        changed_lane = np.flatnonzero(lane != self.vehicle_lanes)
+        for index in changed_lane:
+            self.canvas.coords(self.arcs[index], *self.get_lane_box(lane[index]))
+        self.vehicle_lanes = lane.copy()
+
+        starts = snapshot.position[:number_of_arcs] * self.full_extent / self.lane_lengths[lane]
+        # distance in pixels along the circle between the drawn and the current position
+        moved_angle = np.abs(np.mod(starts - self.drawn_starts + self.full_extent / 2., self.full_extent)
+                             - self.full_extent / 2.)
+        radii = np.array([self.get_lane_radius(i) for i in range(self.number_of_lanes)])
+        moved = np.flatnonzero(moved_angle * np.pi / 180. * radii[lane] > self.pixel_threshold)
+        for index in moved:
+            self.canvas.itemconfigure(self.arcs[index], start=starts[index])
+        self.drawn_starts[moved] = starts[moved]
+        return len(changed_lane) + len(moved)
+
+    def _draw_sectors(self, snapshot):
+        occupied = np.flatnonzero(snapshot.lane >= 0)
+        lane = snapshot.lane[occupied]
+        lane_lengths = self.lane_lengths
+        sector = (snapshot.position[occupied] * self.number_of_sectors / lane_lengths[lane]).astype(int)
+        sector = np.minimum(sector, self.number_of_sectors - 1)
+        bins = lane * self.number_of_sectors + sector
+        shape = (self.number_of_lanes, self.number_of_sectors)
+        size = self.number_of_lanes * self.number_of_sectors
+        counts = np.bincount(bins, minlength=size).reshape(shape)
+        velocity_sums = np.bincount(bins, weights=snapshot.velocity[occupied], minlength=size).reshape(shape)
+        length_sums = np.bincount(bins, weights=snapshot.length[occupied], minlength=size).reshape(shape)
+
+        maximal_velocity = max(np.max(snapshot.velocity[occupied], initial=0.), 1e-12)
+        mean_velocity = velocity_sums / np.maximum(counts, 1)
+        colors = np.round(mean_velocity / maximal_velocity * (len(self.velocity_colors) - 1)).astype(int)
+        colors = np.where(counts > 0, colors, -1)
+        occupancy = length_sums * self.number_of_sectors / lane_lengths[:, np.newaxis]
+        widths = np.ceil(np.minimum(occupancy, 1.) * self.lane_width).astype(int)
+
+        changed = np.argwhere((colors != self.drawn_colors) | (widths != self.drawn_widths))
+        for lane_index, sector_index in changed:
+            color = colors[lane_index, sector_index]
+            self.canvas.itemconfigure(self.sectors[lane_index][sector_index],
+                                      outline=self.velocity_colors[color] if color >= 0 else '',
+                                      width=widths[lane_index, sector_index])
+        self.drawn_colors, self.drawn_widths = colors, widths
+        return len(changed)
+
+    def get_lane_box(self, i):
+        offset = self.lane_width*(self.number_of_lanes-1-i)
+        return self.x0+offset, self.y0+offset, self.x1-offset, self.y1-offset
+
+    def get_lane_radius(self, i):
+        x0, y0, x1, y1 = self.get_lane_box(i)
+        return (x1 - x0) / 2
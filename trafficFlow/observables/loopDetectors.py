@@ -0,0 +1,171 @@
+import collections
+
+import numpy as np
+
+
+class LoopDetectorWindow:
+    """
+    Class that holds the aggregated measurements of all loop detectors over one time window
+
+    Attributes
+    ----------
+    start : double
+        start time of the window
+    end : double
+        end time of the window
+    counts : np.ndarray
+        number of vehicles that passed every detector
+    flow : np.ndarray
+        vehicles per second that passed every detector
+    harmonic_mean_velocity : np.ndarray
+        harmonic mean of the velocities of the passing vehicles (estimate of the space mean speed, nan if no
+        vehicle passed)
+    occupancy : np.ndarray
+        fraction of the window during which a vehicle covered the detector
+    density : np.ndarray
+        vehicles per meter estimated as flow divided by harmonic mean velocity
+    travel_time : np.ndarray
+        estimated time to travel from every detector to the next detector downstream on the same lane
+    """
+
+    def __init__(self, start, end, counts, inverse_velocity_sums, occupied_times, distances_to_next):
+        duration = end - start
+        self.start = start
+        self.end = end
+        self.counts = counts
+        self.flow = counts / duration
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.harmonic_mean_velocity = np.where(counts > 0, counts / inverse_velocity_sums, np.nan)
+        self.occupancy = occupied_times / duration
+        self.density = self.flow / self.harmonic_mean_velocity
+        self.travel_time = distances_to_next / self.harmonic_mean_velocity
+
+
+class LoopDetectors:
+    """
+    Class that implements a bank of virtual loop detectors at fixed positions on the lanes of a road
+
+    Crossings are detected between two consecutive updates by a binary search of the positions of the
+    vehicles in the sorted detector positions of their lane, so an update costs O(N log D) operations for N
+    vehicles and D detectors. A vehicle is assumed to pass at most one detector per update. Only the
+    aggregates of the current window and the last history_length completed windows are kept (none for
+    history_length 0, e.g. if the windows are only passed on to callback), so the memory does not grow with
+    the number of steps. An object can be used as observer of a SimulationRunner (with stride 1).
+
+    Attributes
+    ----------
+    road : Road
+        road the detectors are placed on
+    lanes : np.ndarray
+        lane index of every detector
+    positions : np.ndarray
+        position of every detector on its lane
+    window : double
+        length of the aggregation windows
+    history_length : int
+        maximum number of completed windows kept in history
+    history : collections.deque(LoopDetectorWindow)
+        last completed windows (at most history_length)
+    callback : Function
+        function called with every completed LoopDetectorWindow (or None)
+
+    Methods
+    -------
+    update(time)
+        detect the crossings since the last update and add them to the current window
+    get_current_window(time)
+        return the aggregates of the current (incomplete) window up to time
+    """
+
+    def __init__(self, road, lanes, positions, window=60., start_time=0., history_length=100, callback=None):
+        self.road = road
+        self.lanes = np.array([lane if isinstance(lane, (int, np.integer)) else lane.index for lane in lanes])
+        self.positions = np.asarray(positions, dtype=float)
+        self.window = window
+        self.history_length = history_length
+        self.history = collections.deque(maxlen=history_length)
+        self.callback = callback
+
+        number_of_detectors = len(self.positions)
+        lane_lengths = road.get_lane_lengths()
+        # detectors are sorted by lane and position, the composite key lane * key_scale + position allows a
+        # single binary search for the vehicles of all lanes
+        self._key_scale = 4. * np.max(lane_lengths) + 1.
+        self._sorted_detectors = np.lexsort((self.positions, self.lanes))
+        self._sorted_positions = self.positions[self._sorted_detectors]
+        self._sorted_keys = self.lanes[self._sorted_detectors] * self._key_scale + self._sorted_positions
+        self._lane_starts = np.searchsorted(self.lanes[self._sorted_detectors], np.arange(road.number_of_lanes + 1))
+
+        sorted_lanes = self.lanes[self._sorted_detectors]
+        own = np.arange(number_of_detectors)
+        next_detectors = np.where(own + 1 == self._lane_starts[sorted_lanes + 1], self._lane_starts[sorted_lanes],
+                                  own + 1)
+        distances_to_next = road.get_distances(self._sorted_positions[next_detectors], self._sorted_positions,
+                                               sorted_lanes, sorted_lanes)
+        distances_to_next = np.where(next_detectors == own, lane_lengths[sorted_lanes], distances_to_next)
+        distances_to_next = np.where(distances_to_next > 0., distances_to_next, np.nan)
+        self._distances_to_next = np.empty(number_of_detectors)
+        self._distances_to_next[self._sorted_detectors] = distances_to_next
+
+        state = road.state
+        self._previous_position = state.position.copy()
+        self._previous_lane = state.lane.copy()
+        self._window_start = start_time
+        self._reset_window()
+
+    def __call__(self, runner):
+        self.update(runner.time)
+
+    def _reset_window(self):
+        number_of_detectors = len(self.positions)
+        self._counts = np.zeros(number_of_detectors, dtype=np.int64)
+        self._inverse_velocity_sums = np.zeros(number_of_detectors)
+        self._occupied_times = np.zeros(number_of_detectors)
+
+    def _detect_crossings(self):
+        state = self.road.state
+        position, lane = state.position, state.lane
+        number_of_observed = min(len(self._previous_position), len(position))
+        candidates = np.flatnonzero((self._previous_lane[:number_of_observed] == lane[:number_of_observed])
+                                    & (lane[:number_of_observed] >= 0) & (state.velocity[:number_of_observed] > 0.))
+        lane = lane[candidates]
+        previous_position = self._previous_position[candidates]
+        displacement = self.road.get_distances(position[candidates], previous_position, lane, lane)
+
+        # first detector behind the old position on the same lane (wrapping around to the first detector
+        # of the lane, on open roads the distance to it is negative and no crossing is detected)
+        first = np.searchsorted(self._sorted_keys, lane * self._key_scale + previous_position, side='right')
+        has_detector = self._lane_starts[lane + 1] > self._lane_starts[lane]
+        first = np.where(first == self._lane_starts[lane + 1], self._lane_starts[lane], first)
+        candidates, lane, first = candidates[has_detector], lane[has_detector], first[has_detector]
+        previous_position, displacement = previous_position[has_detector], displacement[has_detector]
+        offset = self.road.get_distances(self._sorted_positions[first], previous_position, lane, lane)
+        crossed = (offset > 0.) & (offset <= displacement)
+        return candidates[crossed], self._sorted_detectors[first[crossed]]
+
+    def _complete_window(self, end):
+        window = LoopDetectorWindow(self._window_start, end, self._counts, self._inverse_velocity_sums,
+                                    self._occupied_times, self._distances_to_next)
+        self.history.append(window)
+        if self.callback is not None:
+            self.callback(window)
+        self._window_start = end
+        self._reset_window()
+
+    def update(self, time):
+        while time > self._window_start + self.window:
+            self._complete_window(self._window_start + self.window)
+
+        vehicles, detectors = self._detect_crossings()
+        state = self.road.state
+        velocity = np.maximum(state.velocity[vehicles], 1e-12)
+        np.add.at(self._counts, detectors, 1)
+        np.add.at(self._inverse_velocity_sums, detectors, 1. / velocity)
+        np.add.at(self._occupied_times, detectors, state.length[vehicles] / velocity)
+
+        self._previous_position = state.position.copy()
+        self._previous_lane = state.lane.copy()
+
+    def get_current_window(self, time):
+        return LoopDetectorWindow(self._window_start, time, self._counts, self._inverse_velocity_sums,
+                                  self._occupied_times, self._distances_to_next)
@@ -0,0 +1,105 @@
+import collections
+
+import numpy as np
+
+
+class SteadyStateDetector:
+    """
+    Class that monitors cheap statistics of the traffic on a road and detects when they stop changing
+
+    After every update the mean and the standard deviation of the velocities and the standard deviation of the
+    gaps of all vehicles on the road are stored (O(N) operations, no copies of the state are kept). The road
+    is in a steady state if the means of every statistic over the two halves of the last window_length
+    updates differ by less than its tolerance (velocity_tolerance for the velocity statistics,
+    gap_tolerance for the gaps, each plus relative_tolerance times the mean of the statistic, so the slow
+    growth of a small deviation is not mistaken for a steady state). Comparing means instead of single
+    values lets a stop-and-go wave that propagates around a ring with a stable shape count as steady,
+    although the statistics jitter whenever a vehicle passes through the wave; such a state is reported as
+    wave if the velocity standard deviation exceeds wave_threshold. An object can be used as observer of a
+    SimulationRunner and stops the run once a steady state is detected if stop_runner is true.
+
+    Attributes
+    ----------
+    model : CarFollowingModel
+        model providing the gaps of the vehicles
+    window_length : int
+        number of updates compared to decide on convergence
+    velocity_tolerance : double
+        allowed change of the mean velocity and the velocity standard deviation in meters per second
+    gap_tolerance : double
+        allowed change of the gap standard deviation in meters
+    relative_tolerance : double
+        allowed change of every statistic relative to its mean
+    wave_threshold : double
+        velocity standard deviation above which a steady state is a stop-and-go wave
+    stop_runner : bool
+        true if the runner is stopped as soon as a steady state is detected
+    history : collections.deque(tuple(double, double, double))
+        mean velocity, velocity standard deviation and gap standard deviation of the last updates
+    converged : bool
+        true if the last update detected a steady state
+    converged_time : double
+        time of the first update detecting a steady state (None if there was none)
+    wave : bool
+        true if the detected steady state is a stop-and-go wave
+
+    Methods
+    -------
+    get_statistics()
+        return mean velocity, velocity standard deviation and gap standard deviation of the current state
+    update(time)
+        add the statistics of the current state and check for convergence
+    reset()
+        forget all updates (e.g. after the road has been changed)
+    """
+
+    def __init__(self, model, window_length=200, velocity_tolerance=1e-3, gap_tolerance=1e-2,
+                 relative_tolerance=1e-2, wave_threshold=1., stop_runner=True):
+        self.model = model
+        self.window_length = window_length
+        self.velocity_tolerance = velocity_tolerance
+        self.gap_tolerance = gap_tolerance
+        self.relative_tolerance = relative_tolerance
+        self.wave_threshold = wave_threshold
+        self.stop_runner = stop_runner
+        self.history = collections.deque(maxlen=window_length)
+        self.reset()
+
+    def __call__(self, runner):
+        if self.update(runner.time) and self.stop_runner:
+            runner.stop()
+
+    def reset(self):
+        self.history.clear()
+        self.converged = False
+        self.converged_time = None
+        self.wave = False
+
+    def get_statistics(self):
+        state = self.model.road.state
+        occupied = state.lane >= 0
+        velocity = state.velocity[occupied]
+        if len(velocity) == 0:
+            return 0., 0., 0.
+        distance, speed_difference = self.model.get_interaction(state.position, state.velocity)
+        # leading vehicles on open roads have no gap
+        distance = distance[occupied & np.isfinite(distance)]
+        gap_deviation = np.std(distance) if len(distance) > 0 else 0.
+        return np.mean(velocity), np.std(velocity), gap_deviation
+
+    def update(self, time):
+        self.history.append(self.get_statistics())
+        if len(self.history) < self.window_length:
+            return False
+        statistics = np.array(self.history)
+        middle = self.window_length // 2
+        mean = np.mean(statistics[middle:], axis=0)
+        change = np.abs(mean - np.mean(statistics[:middle], axis=0))
+        tolerance = np.array([self.velocity_tolerance, self.velocity_tolerance, self.gap_tolerance]) \
+            + self.relative_tolerance * np.abs(mean)
+        self.converged = bool(np.all(change <= tolerance))
+        if self.converged:
+            if self.converged_time is None:
+                self.converged_time = time
+            self.wave = bool(np.mean(statistics[:, 1]) > self.wave_threshold)
+        return self.converged
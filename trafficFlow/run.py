@@ -0,0 +1,173 @@
+"""
+Headless simulation of intelligent drivers on a circular road
+
+Builds a ring scenario, advances the car following model as fast as possible until the given horizon
+and optionally writes the sampled positions and velocities to a .npz file. No graphics modules (and thus
+no tkinter) are imported.
+
+Example: python -m trafficFlow.run --vehicles 1000 --length 250000 --horizon 600 --stride 10 --output ring.npz
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from trafficFlow.carFollowingModel.carFollowingModel import CarFollowingModel
+from trafficFlow.observables.steadyStateDetector import SteadyStateDetector
+from trafficFlow.runners.simulationRunner import SimulationRunner
+from trafficFlow.scenarios.ringScenario import create_mixed_ring_road, create_ring_road
+from trafficFlow.scenarios.scenarioFile import load_scenario
+from trafficFlow.storage.checkpoint import CheckpointWriter, load_checkpoint
+from trafficFlow.storage.resultCache import ResultCache
+from trafficFlow.storage.trajectoryFile import TrajectoryWriter
+from trafficFlow.utilities.profiler import Profiler
+from trafficFlow.utilities.timeDiscretizationSchemes.schemeRegistry import time_discretization_schemes
+
+
+def parse_fleet(text):
+    """
+    Parse a fleet given as comma separated name=number pairs (e.g. idm-car=40,idm-truck=5)
+    """
+    fleet = {}
+    for item in text.split(','):
+        name, number_of_vehicles = item.split('=')
+        fleet[name.strip()] = int(number_of_vehicles)
+    return fleet
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(prog='python -m trafficFlow.run', description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--vehicles', type=int, default=4, help='number of vehicles per lane')
+    parser.add_argument('--lanes', type=int, default=1, help='number of lanes')
+    parser.add_argument('--length', type=float, default=1000., help='full length of every lane')
+    parser.add_argument('--s0', type=float, default=70., help='minimum distance to the predecessor')
+    parser.add_argument('--v0', type=float, default=30., help='desired speed')
+    parser.add_argument('--delta', type=float, default=4., help='acceleration exponent')
+    parser.add_argument('--T', type=float, default=1., help='follow time')
+    parser.add_argument('--a', type=float, default=1., help='acceleration')
+    parser.add_argument('--b', type=float, default=1.5, help='comfortable deceleration')
+    parser.add_argument('--fleet', type=parse_fleet, default=None,
+                        help='mixed fleet per lane as comma separated pairs of registered driver types and numbers '
+                             '(e.g. idm-car=40,idm-truck=5,gipps=5; replaces --vehicles and the driver options)')
+    parser.add_argument('--scenario', default=None,
+                        help='JSON or TOML scenario file (roads, lanes, fleets with parameter distributions; replaces '
+                             'the scenario options)')
+    parser.add_argument('--seed', type=int, default=None, help='seed for the order of the vehicles of a fleet')
+    parser.add_argument('--equilibrium', action='store_true',
+                        help='start in uniform flow at the equilibrium gaps and velocity instead of standing')
+    parser.add_argument('--scheme', choices=sorted(time_discretization_schemes), default='euler',
+                        help='time discretization scheme (dopri5 adapts its internal step size within every dt, '
+                             'the implicit schemes allow large dt in dense traffic, multirate-rk4 performs the rk4 '
+                             'step for all vehicles and then repeats it with smaller steps for vehicles with a short '
+                             'time headway or time to collision, which thus pay for both)')
+    parser.add_argument('--dt', type=float, default=1e-1, help='time step size')
+    parser.add_argument('--horizon', type=float, default=100., help='simulated time')
+    parser.add_argument('--stride', type=int, default=None, help='record the state every stride steps')
+    parser.add_argument('--output', default=None, help='.npz file to write the recorded states to')
+    parser.add_argument('--trajectory', default=None,
+                        help='directory to stream the recorded states to in chunks (bounded memory)')
+    parser.add_argument('--checkpoint', default=None, help='file to write checkpoints of the state to')
+    parser.add_argument('--checkpoint-interval', type=float, default=5.,
+                        help='wall clock time in seconds between two checkpoints')
+    parser.add_argument('--resume', default=None,
+                        help='checkpoint to continue from (replaces the scenario options)')
+    parser.add_argument('--steady-state-window', type=int, default=None,
+                        help='stop before the horizon once the velocity and gap statistics did not change over '
+                             'this number of steps')
+    parser.add_argument('--cache', default=None,
+                        help='directory of a result cache: a scenario run before is read from the cache, a longer run '
+                             'continues from the longest cached run (not with --resume, --trajectory, --checkpoint, '
+                             '--steady-state-window and --profile)')
+    parser.add_argument('--cache-size', type=float, default=1024.,
+                        help='maximum size of the result cache in MB (least recently used runs are removed)')
+    parser.add_argument('--profile', action='store_true',
+                        help='measure the phases of every step and print a summary at the end')
+    return parser
+
+
+def main(argv=None):
+    parser = create_parser()
+    arguments = parser.parse_args(argv)
+    if arguments.cache is not None and (arguments.resume or arguments.trajectory or arguments.checkpoint
+                                        or arguments.steady_state_window is not None or arguments.profile):
+        parser.error('--cache cannot be combined with --resume, --trajectory, --checkpoint, --steady-state-window '
+                     'and --profile')
+    start_time, start_steps = 0., 0
+    if arguments.resume is not None:
+        road, start_time, start_steps = load_checkpoint(arguments.resume)
+    elif arguments.scenario is not None:
+        road = load_scenario(arguments.scenario)
+    elif arguments.fleet is not None:
+        road = create_mixed_ring_road(arguments.fleet, full_length=arguments.length,
+                                      number_of_lanes=arguments.lanes, equilibrium=arguments.equilibrium,
+                                      seed=arguments.seed)
+    else:
+        road = create_ring_road(arguments.vehicles, full_length=arguments.length, number_of_lanes=arguments.lanes,
+                                s_0=arguments.s0, v_0=arguments.v0, delta=arguments.delta, T=arguments.T,
+                                a=arguments.a, b=arguments.b, equilibrium=arguments.equilibrium)
+    if arguments.cache is not None:
+        run_cached(arguments, road)
+        return
+    model = CarFollowingModel(road, profiler=Profiler() if arguments.profile else None)
+    scheme = time_discretization_schemes[arguments.scheme](model)
+    runner = SimulationRunner(model, scheme, dt=arguments.dt, start_time=start_time, start_steps=start_steps)
+
+    stride = arguments.stride or 1
+    writer = None
+    if arguments.trajectory is not None:
+        writer = TrajectoryWriter(arguments.trajectory, road)
+        writer.record(runner.time)
+        runner.add_observer(writer, stride=stride)
+    checkpoint_writer = None
+    if arguments.checkpoint is not None:
+        checkpoint_writer = CheckpointWriter(arguments.checkpoint, road, interval=arguments.checkpoint_interval)
+        runner.add_observer(checkpoint_writer)
+    detector = None
+    if arguments.steady_state_window is not None:
+        detector = SteadyStateDetector(model, window_length=arguments.steady_state_window)
+        runner.add_observer(detector)
+    start = time.perf_counter()
+    record = runner.run(arguments.horizon, sampling_stride=stride if arguments.output is not None else None)
+    elapsed = time.perf_counter() - start
+    if writer is not None:
+        writer.close()
+    if checkpoint_writer is not None:
+        checkpoint_writer.write(runner.time, runner.steps)
+
+    print('simulated {} steps of {} vehicles in {:.3f} s ({:.1f} steps/s)'.format(
+        runner.steps - start_steps, road.state.number_of_vehicles, elapsed,
+        (runner.steps - start_steps) / max(elapsed, 1e-12)))
+    print('mean velocity at t = {:g}: {:.3f}'.format(runner.time, np.mean(road.state.velocity)))
+    if detector is not None and detector.converged:
+        print('steady state{} detected at t = {:g}'.format(' (stop-and-go wave)' if detector.wave else '',
+                                                           detector.converged_time))
+    if model.profiler is not None:
+        print(model.profiler.report())
+    if arguments.output is not None:
+        np.savez(arguments.output, times=record.times, position=record.position,
+                 velocity=record.velocity, lane=record.lane)
+
+
+def run_cached(arguments, road):
+    """
+    Run the scenario through the result cache given by the arguments and report where the result came from
+    """
+    cache = ResultCache(arguments.cache, max_size=int(arguments.cache_size * 2**20))
+    start = time.perf_counter()
+    result = cache.run(road, time_discretization_schemes[arguments.scheme], arguments.dt, arguments.horizon,
+                       stride=(arguments.stride or 1) if arguments.output is not None else None)
+    elapsed = time.perf_counter() - start
+
+    print('simulated {} of {} steps of {} vehicles in {:.3f} s ({} cached, scenario {})'.format(
+        result.steps - result.cached_steps, result.steps, result.road.state.number_of_vehicles, elapsed,
+        result.cached_steps, result.key[:12]))
+    print('mean velocity at t = {:g}: {:.3f}'.format(result.time, np.mean(result.road.state.velocity)))
+    if arguments.output is not None:
+        record = result.record
+        np.savez(arguments.output, times=record.times, position=record.position,
+                 velocity=record.velocity, lane=record.lane)
+
+
+if __name__ == '__main__':
+    main()
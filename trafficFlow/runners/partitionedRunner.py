@@ -0,0 +1,274 @@
+import multiprocessing
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class _Partition:
+    """
+    Class that holds the vehicles owned by one worker process and evaluates the right hand side for them
+
+    The worker owns the vehicles whose position lies in its segment [partition, partition + 1) / number of
+    partitions of their lane (measured as fraction of the lane length). Predecessors owned by other workers
+    (ghosts) are read from a shared stage buffer; before every evaluation the worker writes the vehicles that
+    are ghosts of other workers (exported vehicles) to this buffer and waits at a barrier. Two stage buffers are
+    used alternately, so one barrier per evaluation suffices.
+    """
+
+    def __init__(self, partition, number_of_partitions, road, buffers, barrier):
+        self.partition = partition
+        self.number_of_partitions = number_of_partitions
+        self.road = road
+        self.buffers = buffers
+        self.barrier = barrier
+        self.number_of_evaluations = 0
+
+    def load(self):
+        # take over the vehicles in the own segment from the shared solution
+        state = self.road.state
+        number_of_vehicles = state.number_of_vehicles
+        position = self.buffers[0, :number_of_vehicles]
+        segments = np.minimum((position / self.road.get_lane_lengths()[state.lane]
+                               * self.number_of_partitions).astype(int), self.number_of_partitions - 1)
+        self.local = np.flatnonzero(segments == self.partition)
+        owned = np.zeros(number_of_vehicles, dtype=bool)
+        owned[self.local] = True
+        local_index = np.full(number_of_vehicles, -1)
+        local_index[self.local] = np.arange(len(self.local))
+
+        predecessor = state.predecessor[self.local]
+        self.ghosts = np.unique(predecessor[~owned[predecessor]])
+        local_index[self.ghosts] = len(self.local) + np.arange(len(self.ghosts))
+        self.local_predecessor = local_index[predecessor]
+        self.alone = predecessor == self.local
+        exported = np.unique(state.predecessor[~owned])
+        self.exported = exported[owned[exported]]
+        self.exported_local = local_index[self.exported]
+
+        self.lane = state.lane[self.local]
+        self.length = state.length[self.local]
+        self.lane_lengths = self.road.get_lane_lengths()[self.lane]
+        self.parameters = {name: state.arrays[name][self.local]
+                           for DriverType in state.driver_types for name in DriverType.parameter_names}
+        models = state.model[self.local]
+        if len(state.driver_types) == 1:
+            self.model_indices = [slice(None)]
+        else:
+            self.model_indices = [np.flatnonzero(models == i) for i in range(len(state.driver_types))]
+        return np.concatenate((position[self.local], self.buffers[0, number_of_vehicles:][self.local]))
+
+    def store(self, y):
+        number_of_vehicles = self.road.state.number_of_vehicles
+        number_of_local = len(self.local)
+        self.buffers[0, self.local] = y[:number_of_local]
+        self.buffers[0, number_of_vehicles + self.local] = y[number_of_local:]
+
+    def create_right_hand_side(self, t, y):
+        road = self.road
+        number_of_vehicles = road.state.number_of_vehicles
+        number_of_local = len(self.local)
+        position = y[:number_of_local]
+        velocity = y[number_of_local:]
+
+        buffer = self.buffers[1 + self.number_of_evaluations % 2]
+        self.number_of_evaluations = self.number_of_evaluations + 1
+        buffer[self.exported] = position[self.exported_local]
+        buffer[number_of_vehicles + self.exported] = velocity[self.exported_local]
+        self.barrier.wait()
+        extended_position = np.concatenate((position, buffer[self.ghosts]))
+        extended_velocity = np.concatenate((velocity, buffer[number_of_vehicles + self.ghosts]))
+
+        distance = road.get_distances(extended_position[self.local_predecessor], position, self.lane, self.lane) \
+            - self.length
+        if road.periodic and np.any(self.alone):
+            distance = np.where(self.alone, self.lane_lengths - self.length, distance)
+        speed_difference = extended_velocity[self.local_predecessor] - velocity
+
+        acceleration = np.empty_like(velocity)
+        for model, DriverType in enumerate(road.state.driver_types):
+            indices = self.model_indices[model]
+            acceleration[indices] = DriverType.get_desired_accelerations(self.parameters, indices, velocity[indices],
+                                                                         speed_difference[indices],
+                                                                         distance[indices])
+        return np.concatenate((velocity, acceleration))
+
+
+def _run_partition(partition, number_of_partitions, road, SchemeType, dt, rebalance_interval, shared_name,
+                   barrier, connection):
+    memory = shared_memory.SharedMemory(name=shared_name)
+    buffers = np.ndarray((3, 2 * road.state.number_of_vehicles), dtype=np.float64, buffer=memory.buf)
+    worker = _Partition(partition, number_of_partitions, road, buffers, barrier)
+    scheme = SchemeType(worker.create_right_hand_side)
+    try:
+        while True:
+            command, argument = connection.recv()
+            if command == 'stop':
+                break
+            t, number_of_steps = argument
+            try:
+                y = worker.load()
+                for i in range(number_of_steps):
+                    if i > 0 and i % rebalance_interval == 0:
+                        # hand the vehicles that left the segment over to their new owners
+                        worker.store(y)
+                        barrier.wait()
+                        y = worker.load()
+                    y = scheme.apply(t + i * dt, dt, y)
+                    number_of_local = len(worker.local)
+                    y[:number_of_local] = road.get_positions(y[:number_of_local], worker.lane)
+                worker.store(y)
+                barrier.wait()
+                connection.send(('done', None))
+            except Exception:
+                barrier.abort()
+                connection.send(('error', traceback.format_exc()))
+    finally:
+        del worker, scheme, buffers
+        memory.close()
+
+
+class PartitionedRunner:
+    """
+    Class that advances the vehicles of a closed road on several processes (domain decomposition)
+
+    Every lane is split into number_of_workers segments of equal length, and worker process k owns the
+    vehicles in segment k of every lane. Every evaluation of the right hand side only exchanges the vehicles
+    whose successor is owned by another worker through shared memory. Every rebalance_interval steps the
+    vehicles that crossed a segment boundary are handed over to the worker owning their new segment. The
+    computations per vehicle are the same as in CarFollowingModel, so the results match a single process
+    run (up to the last bit if the vectorized floating point functions of numpy do not depend on the length
+    of the arrays).
+
+    Only explicit time discretization schemes with a fixed step size can be used (implicit schemes would need
+    the Jacobian of the whole road, adaptive schemes a common step size). Lane change models and roads on which
+    vehicles enter or leave are not supported. The topology and the driver parameters are copied to the workers
+    when the runner is created, later changes of the road only affect positions and velocities.
+
+    Attributes
+    ----------
+    road : Road
+        road to simulate (its vehicle state is updated after every call of advance)
+    SchemeType : TimeDiscretizationScheme (class name)
+        explicit time discretization scheme used by every worker
+    dt : double
+        time step size
+    number_of_workers : int
+        number of worker processes
+    rebalance_interval : int
+        number of steps between two hand-overs of vehicles to their new owners
+    start_time : double
+        time at which the run started
+    start_steps : int
+        number of steps performed before start_time (e.g. the step count of a checkpoint the run continues from)
+    steps : int
+        number of steps performed until now (including start_steps)
+    time : double
+        time expired until now
+    observers : list(tuple(int, Function))
+        functions called with the runner every stride steps, together with their stride
+    stopped : bool
+        true if an observer stopped the current run
+
+    Methods
+    -------
+    add_observer(observer, stride)
+        call observer(runner) after every stride steps
+    stop()
+        end the current run after the steps already sent to the workers
+    advance(number_of_steps)
+        perform number_of_steps time steps on the workers and copy the result to the vehicle state of the road
+    run(t_end)
+        perform time steps until t_end is reached (or stop is called) and notify the observers
+    close()
+        stop the worker processes and release the shared memory
+    """
+
+    def __init__(self, road, SchemeType, dt=1e-1, number_of_workers=2, rebalance_interval=100, start_time=0.,
+                 start_steps=0):
+        state = road.state
+        if not road.periodic or state.number_of_free_slots:
+            raise ValueError('only closed roads without entering or leaving vehicles can be partitioned')
+        self.road = road
+        self.SchemeType = SchemeType
+        self.dt = dt
+        self.number_of_workers = number_of_workers
+        self.rebalance_interval = rebalance_interval
+        self.start_time = start_time
+        self.start_steps = start_steps
+        self.steps = start_steps
+        self.time = start_time
+        self.observers = []
+        self.stopped = False
+
+        number_of_vehicles = state.number_of_vehicles
+        self._memory = shared_memory.SharedMemory(create=True, size=max(3 * 2 * number_of_vehicles * 8, 1))
+        self._buffers = np.ndarray((3, 2 * number_of_vehicles), dtype=np.float64, buffer=self._memory.buf)
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        barrier = context.Barrier(number_of_workers)
+        self._connections = []
+        self._processes = []
+        for partition in range(number_of_workers):
+            connection, worker_connection = context.Pipe()
+            process = context.Process(target=_run_partition,
+                                      args=(partition, number_of_workers, road, SchemeType, dt, rebalance_interval,
+                                            self._memory.name, barrier, worker_connection),
+                                      daemon=True)
+            process.start()
+            self._connections.append(connection)
+            self._processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception, exception_traceback):
+        self.close()
+
+    def add_observer(self, observer, stride=1):
+        self.observers.append((stride, observer))
+
+    def stop(self):
+        self.stopped = True
+
+    def advance(self, number_of_steps):
+        state = self.road.state
+        self._buffers[0] = state.get_y()
+        for connection in self._connections:
+            connection.send(('run', (self.time, number_of_steps)))
+        errors = []
+        for connection in self._connections:
+            status, message = connection.recv()
+            if status == 'error':
+                errors.append(message)
+        if errors:
+            raise RuntimeError('a worker failed:\n' + errors[0])
+        state.set_y(self._buffers[0])
+        self.steps = self.steps + number_of_steps
+        self.time = self.start_time + (self.steps - self.start_steps) * self.dt
+
+    def run(self, t_end):
+        number_of_steps = int(round((t_end - self.time) / self.dt))
+        strides = [stride for stride, observer in self.observers]
+        self.stopped = False
+        while number_of_steps > 0 and not self.stopped:
+            # advance to the next step at which an observer is due
+            steps_to_observer = min([stride - self.steps % stride for stride in strides] + [number_of_steps])
+            self.advance(steps_to_observer)
+            number_of_steps = number_of_steps - steps_to_observer
+            for stride, observer in self.observers:
+                if self.steps % stride == 0:
+                    observer(self)
+
+    def close(self):
+        for connection, process in zip(self._connections, self._processes):
+            if process.is_alive():
+                connection.send(('stop', None))
+        for process in self._processes:
+            process.join()
+        self._connections, self._processes = [], []
+        if self._memory is not None:
+            self._buffers = None
+            self._memory.close()
+            self._memory.unlink()
+            self._memory = None
@@ -0,0 +1,99 @@
+import time as wall_clock
+
+import numpy as np
+
+from trafficFlow.runners.simulationWorker import SimulationSnapshot
+
+
+class ReplayPlayer:
+    """
+    Class that plays a recorded trajectory back in wall clock time and provides snapshots like a SimulationWorker
+
+    No thread is needed: every call of get_latest_snapshot computes the replay time from the wall clock and
+    reads only the sample shown at this time from the memory-mapped trajectory (found by a binary search in
+    the sample times), so samples in between are skipped and the cost of a frame does not depend on the
+    number of recorded samples or on the cost of the original simulation.
+
+    Attributes
+    ----------
+    reader : TrajectoryReader
+        trajectory to play
+    speed : double
+        ratio of replay time and wall clock time
+    lane_lengths : np.ndarray
+        full length of every lane of the recorded road
+    running : bool
+        true if the replay time advances, false if it is paused
+    number_of_skipped_samples : int
+        number of samples that were skipped because the replay was faster than the frame rate
+
+    Methods
+    -------
+    start()
+        do nothing (the player has no thread, it exists to be used like a SimulationWorker)
+    get_time()
+        return the current replay time
+    get_latest_snapshot()
+        return the snapshot of the sample shown at the current replay time (None if it did not change since the
+        last call)
+    seek(time)
+        continue the replay at time
+    set_speed(speed)
+        change the ratio of replay time and wall clock time
+    toggle_pause()
+        stop the replay time and continue it
+    stop()
+        pause the replay
+    """
+
+    def __init__(self, reader, speed=1., start_time=None):
+        self.reader = reader
+        self.speed = speed
+        self.lane_lengths = reader.lane_lengths
+        self.running = False
+        self.number_of_skipped_samples = 0
+        self._time = reader.times[0] if start_time is None else start_time
+        self._wall_clock_start = wall_clock.perf_counter()
+        self._shown_sample = None
+
+    def start(self):
+        pass
+
+    def get_time(self):
+        if not self.running:
+            return self._time
+        return self._time + self.speed * (wall_clock.perf_counter() - self._wall_clock_start)
+
+    def _set_time(self, time):
+        self._time = float(np.clip(time, self.reader.times[0], self.reader.times[-1]))
+        self._wall_clock_start = wall_clock.perf_counter()
+
+    def get_latest_snapshot(self):
+        time = self.get_time()
+        if time >= self.reader.times[-1] and self.running:
+            # stop at the end of the trajectory
+            self.running = False
+            self._set_time(time)
+        sample = self.reader.find_sample(time)
+        if sample == self._shown_sample:
+            return None
+        if self._shown_sample is not None and sample > self._shown_sample + 1:
+            self.number_of_skipped_samples = self.number_of_skipped_samples + sample - self._shown_sample - 1
+        self._shown_sample = sample
+        sample_time, position, velocity, lane = self.reader.read_sample(sample)
+        return SimulationSnapshot(sample_time, sample, position, velocity, lane, self.reader.read_lengths(sample))
+
+    def seek(self, time):
+        self._set_time(time)
+
+    def set_speed(self, speed):
+        self._set_time(self.get_time())
+        self.speed = speed
+
+    def toggle_pause(self):
+        self._set_time(self.get_time())
+        self.running = not self.running
+
+    def stop(self):
+        if self.running:
+            self.toggle_pause()
@@ -0,0 +1,113 @@
+import numpy as np
+
+
+class SimulationRecord:
+    """
+    Class that holds the sampled output of a headless run
+
+    Attributes
+    ----------
+    times : np.ndarray
+        sample times, shape (number_of_samples,)
+    position : np.ndarray
+        positions of all vehicles at the sample times, shape (number_of_samples, number_of_vehicles)
+    velocity : np.ndarray
+        velocities of all vehicles at the sample times, shape (number_of_samples, number_of_vehicles)
+    lane : np.ndarray
+        lane indices of all vehicles at the sample times, shape (number_of_samples, number_of_vehicles)
+    """
+
+    def __init__(self, times, position, velocity, lane):
+        self.times = times
+        self.position = position
+        self.velocity = velocity
+        self.lane = lane
+
+
+class SimulationRunner:
+    """
+    Class that advances a model without any visualization as fast as possible
+
+    Attributes
+    ----------
+    model : Model
+        model to use for the simulation (e.g. the car following model)
+    time_discretization_scheme : TimeDiscretizationScheme
+        time discretization scheme to use for the single time steps (e.g. the explicit Euler scheme)
+    dt : double
+        time step size
+    start_time : double
+        time at which the run started
+    start_steps : int
+        number of steps performed before start_time (e.g. the step count of a checkpoint the run continues from)
+    steps : int
+        number of steps performed until now (including start_steps)
+    time : double
+        time expired until now
+    observers : list(tuple(int, Function))
+        functions called with the runner every stride steps, together with their stride
+    stopped : bool
+        true if an observer stopped the current run
+
+    Methods
+    -------
+    add_observer(observer, stride)
+        call observer(runner) after every stride steps
+    stop()
+        end the current run after the current step (e.g. called by an observer detecting a steady state)
+    step()
+        perform a single time step and notify the observers
+    run(t_end, sampling_stride)
+        perform time steps until t_end is reached (or stop is called) and return the state sampled every
+        sampling_stride steps (None if sampling_stride is None)
+    """
+
+    def __init__(self, model, time_discretization_scheme, dt=1e-1, start_time=0., start_steps=0):
+        self.model = model
+        self.time_discretization_scheme = time_discretization_scheme
+        self.dt = dt
+        self.start_time = start_time
+        self.start_steps = start_steps
+        self.steps = start_steps
+        self.time = start_time
+        self.observers = []
+        self.stopped = False
+
+    def add_observer(self, observer, stride=1):
+        self.observers.append((stride, observer))
+
+    def stop(self):
+        self.stopped = True
+
+    def step(self):
+        self.model.simulate_one_step(self.time_discretization_scheme, self.time, self.dt)
+        self.steps = self.steps + 1
+        self.time = self.start_time + (self.steps - self.start_steps) * self.dt
+        for stride, observer in self.observers:
+            if self.steps % stride == 0:
+                observer(self)
+
+    def run(self, t_end, sampling_stride=None):
+        number_of_steps = int(round((t_end - self.time) / self.dt))
+        state = self.model.road.state
+        self.stopped = False
+        times, position, velocity, lane = [], [], [], []
+
+        def sample():
+            times.append(self.time)
+            position.append(state.position.copy())
+            velocity.append(state.velocity.copy())
+            lane.append(state.lane.copy())
+
+        if sampling_stride is not None:
+            sample()
+        for i in range(1, number_of_steps + 1):
+            self.step()
+            if sampling_stride is not None and i % sampling_stride == 0:
+                sample()
+            if self.stopped:
+                break
+
+        if sampling_stride is None:
+            return None
+        return SimulationRecord(np.array(times), np.array(position), np.array(velocity), np.array(lane))
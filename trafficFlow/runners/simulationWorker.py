@@ -0,0 +1,177 @@
+import queue
+import threading
+import time
+
+from trafficFlow.runners.simulationRunner import SimulationRunner
+
+
+class SimulationSnapshot:
+    """
+    Class that holds an immutable copy of the state of a road at one time
+
+    Attributes
+    ----------
+    time : double
+        simulation time of the snapshot
+    steps : int
+        number of steps performed until the snapshot was taken
+    position : np.ndarray
+        positions of all vehicles (read-only)
+    velocity : np.ndarray
+        velocities of all vehicles (read-only)
+    lane : np.ndarray
+        lane indices of all vehicles (read-only)
+    length : np.ndarray
+        lengths of all vehicles (read-only)
+
+    Methods
+    -------
+    from_state(state, time, steps)
+        create a snapshot from copies of the arrays of a vehicle state
+    """
+
+    def __init__(self, time, steps, position, velocity, lane, length):
+        self.time = time
+        self.steps = steps
+        self.position = position
+        self.velocity = velocity
+        self.lane = lane
+        self.length = length
+        for array in (position, velocity, lane, length):
+            array.flags.writeable = False
+
+    @classmethod
+    def from_state(cls, state, time, steps):
+        return cls(time, steps, state.position.copy(), state.velocity.copy(), state.lane.copy(),
+                   state.length.copy())
+
+
+class SimulationWorker(threading.Thread):
+    """
+    Class that advances a model in a background thread and publishes snapshots of the state
+
+    Inherits from the threading.Thread class. The worker owns the model while it is running: other threads
+    must only read the published snapshots. Snapshots are put into a bounded queue; if the consumer is
+    slower than the simulation, the oldest snapshot is dropped, so the queue always holds the most recent
+    states. The worker is controlled by the messages START, PAUSE and STOP and waits for a message (without
+    using the processor) while it is paused.
+
+    Attributes
+    ----------
+    runner : SimulationRunner
+        runner that performs the time steps
+    lane_lengths : np.ndarray
+        full length of every lane of the road
+    steps_per_snapshot : int
+        number of time steps between two published snapshots
+    time_scale : double
+        upper bound for the ratio of simulation time and wall clock time (None to run as fast as possible)
+    snapshots : queue.Queue
+        bounded queue of the published snapshots
+    running : bool
+        true if the worker performs time steps, false if it is paused
+    number_of_dropped_snapshots : int
+        number of snapshots that were dropped because the consumer did not fetch them in time
+
+    Methods
+    -------
+    run()
+        override method in class threading.Thread and process control messages and time steps until STOP
+    send(message)
+        send one of the control messages START, PAUSE and STOP to the worker
+    toggle_pause()
+        send START if the worker is paused and PAUSE otherwise
+    stop(timeout)
+        send STOP and wait for the worker to finish
+    get_latest_snapshot()
+        remove all published snapshots from the queue and return the most recent one (None if there is none)
+    """
+
+    START = 'start'
+    PAUSE = 'pause'
+    STOP = 'stop'
+
+    def __init__(self, model, time_discretization_scheme, dt=1e-1, steps_per_snapshot=1, time_scale=None,
+                 queue_size=2):
+        super().__init__(daemon=True)
+        self.runner = SimulationRunner(model, time_discretization_scheme, dt)
+        self.lane_lengths = model.road.get_lane_lengths()
+        self.steps_per_snapshot = steps_per_snapshot
+        self.time_scale = time_scale
+        self.snapshots = queue.Queue(maxsize=queue_size)
+        self.running = False
+        self.number_of_dropped_snapshots = 0
+        self._messages = queue.Queue()
+        self._requested_running = False
+        self._publish()
+
+    def _publish(self):
+        snapshot = SimulationSnapshot.from_state(self.runner.model.road.state, self.runner.time,
+                                                 self.runner.steps)
+        while True:
+            try:
+                self.snapshots.put_nowait(snapshot)
+                return
+            except queue.Full:
+                try:
+                    self.snapshots.get_nowait()
+                    self.number_of_dropped_snapshots = self.number_of_dropped_snapshots + 1
+                except queue.Empty:
+                    pass
+
+    def _handle(self, message):
+        if message == self.START:
+            self.running = True
+        elif message == self.PAUSE:
+            self.running = False
+        elif message == self.STOP:
+            return False
+        else:
+            raise ValueError('unknown control message ' + repr(message))
+        return True
+
+    def run(self):
+        wall_clock_start, simulation_start = time.perf_counter(), self.runner.time
+        while True:
+            try:
+                message = self._messages.get(block=not self.running)
+            except queue.Empty:
+                message = None
+            if message is not None:
+                was_running = self.running
+                if not self._handle(message):
+                    return
+                if self.running and not was_running:
+                    wall_clock_start, simulation_start = time.perf_counter(), self.runner.time
+                continue
+
+            for i in range(self.steps_per_snapshot):
+                self.runner.step()
+            self._publish()
+
+            if self.time_scale is not None:
+                ahead = (self.runner.time - simulation_start) / self.time_scale \
+                    - (time.perf_counter() - wall_clock_start)
+                if ahead > 0.:
+                    time.sleep(ahead)
+
+    def send(self, message):
+        if message in (self.START, self.PAUSE):
+            self._requested_running = message == self.START
+        self._messages.put(message)
+
+    def toggle_pause(self):
+        self.send(self.PAUSE if self._requested_running else self.START)
+
+    def stop(self, timeout=None):
+        self.send(self.STOP)
+        if self.is_alive():
+            self.join(timeout)
+
+    def get_latest_snapshot(self):
+        snapshot = None
+        while True:
+            try:
+                snapshot = self.snapshots.get_nowait()
+            except queue.Empty:
+                return snapshot
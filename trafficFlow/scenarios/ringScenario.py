@@ -0,0 +1,57 @@
+import numpy as np
+
+from trafficFlow.carFollowingModel.drivers.driverRegistry import get_driver_type
+from trafficFlow.carFollowingModel.drivers.intelligentDriver import IntelligentDriver
+from trafficFlow.carFollowingModel.lanes.simpleLane import SimpleLane
+from trafficFlow.carFollowingModel.roads.circularRoad import CircularRoad
+
+
+def create_ring_road(number_of_vehicles, full_length=1000., number_of_lanes=1,
+                     s_0=70., v_0=30., delta=4., T=1., a=1., b=1.5, length=4., equilibrium=False):
+    """
+    Create a circular road with number_of_lanes lanes, each carrying number_of_vehicles identical intelligent
+    drivers placed with initialize_default (or in uniform flow with initialize_equilibrium if equilibrium is
+    true)
+
+    The vehicles are allocated in bulk, driver objects are only created when they are requested.
+    """
+    road = CircularRoad()
+    for i in range(number_of_lanes):
+        lane = SimpleLane(full_length=full_length)
+        road.add_lane(lane)
+        lane.add_vehicles(number_of_vehicles, IntelligentDriver, length=length, s_0=s_0, v_0=v_0, delta=delta,
+                          T=T, a=a, b=b)
+    if equilibrium:
+        road.initialize_equilibrium()
+    else:
+        road.initialize_default()
+    return road
+
+
+def create_mixed_ring_road(fleet, full_length=1000., number_of_lanes=1, equilibrium=False, seed=None):
+    """
+    Create a circular road with number_of_lanes lanes, each carrying a mixed fleet given as dict from names of
+    registered driver types to numbers of vehicles per lane (e.g. {'idm-car': 40, 'idm-truck': 5}) in random
+    order (seed initializes the random number generator)
+
+    The vehicles of every driver type are allocated in bulk in one contiguous block of slots per lane, only
+    their order along the lane is random.
+    """
+    generator = np.random.default_rng(seed)
+    names = np.array([name for name, number_of_vehicles in fleet.items() for j in range(number_of_vehicles)])
+    road = CircularRoad()
+    for i in range(number_of_lanes):
+        lane = SimpleLane(full_length=full_length)
+        road.add_lane(lane)
+        sequence = generator.permutation(names)
+        order = np.empty(len(sequence), dtype=int)
+        for name, number_of_vehicles in fleet.items():
+            DriverType, parameters = get_driver_type(name)
+            first = lane.add_vehicles(number_of_vehicles, DriverType, **parameters)
+            order[sequence == name] = np.arange(first, first + number_of_vehicles)
+        if equilibrium:
+            lane.initialize_equilibrium(order)
+        else:
+            lane.initialize_default(order)
+    road.initialized = True
+    return road
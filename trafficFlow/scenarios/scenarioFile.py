@@ -0,0 +1,161 @@
+"""
+Declarative scenarios in JSON or TOML files
+
+A scenario describes the road, its lanes and the fleet of every lane, e.g. in JSON:
+
+    {"road": {"type": "circular"},
+     "seed": 1,
+     "initialization": "equilibrium",
+     "lanes": [{"length": 2000., "count": 2, "order": "random",
+                "fleet": [{"driver": "idm-car", "number": 80,
+                           "parameters": {"T": {"distribution": "normal", "mean": 1.2, "std": 0.2, "min": 0.6}}},
+                          {"driver": "idm-truck", "number": 10}]}]}
+
+road.type is circular or open; open roads accept an inflow (road.inflow with demand, driver, insertion_velocity
+and optionally minimum_insertion_gap, capacity and parameters). initialization is default (equidistant,
+standing) or equilibrium (uniform flow). Every lane entry describes count identical lanes (default 1) of the
+given length, order is grouped (the vehicles of a fleet entry follow each other) or random. driver is a name
+registered in the driver registry, parameters override its defaults (including the vehicle length) with
+constants or distributions: uniform (low, high), normal (mean, std, optionally clipped to min and max) and
+choice (values, optionally probabilities). All random numbers are drawn from one generator initialized with
+seed; a fleet entry can bring its own seed.
+"""
+
+import json
+
+import numpy as np
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+from trafficFlow.carFollowingModel.drivers.driverRegistry import get_driver_type
+from trafficFlow.carFollowingModel.lanes.simpleLane import SimpleLane
+from trafficFlow.carFollowingModel.roads.circularRoad import CircularRoad
+from trafficFlow.carFollowingModel.roads.openRoad import OpenRoad
+
+
+road_types = {'circular': CircularRoad, 'open': OpenRoad}
+
+
+def load_scenario(path):
+    """
+    Read the scenario file path (.toml files as TOML, all others as JSON) and return the created road
+    """
+    if path.endswith('.toml'):
+        if tomllib is None:
+            raise ValueError('reading TOML scenarios requires Python 3.11 or newer')
+        with open(path, 'rb') as scenario_file:
+            specification = tomllib.load(scenario_file)
+    else:
+        with open(path) as scenario_file:
+            specification = json.load(scenario_file)
+    return create_scenario(specification)
+
+
+def sample_parameter(specification, number, generator):
+    """
+    Return number values of a parameter given as constant or distribution (see the module documentation)
+    """
+    if not isinstance(specification, dict):
+        return np.full(number, float(specification))
+    distribution = specification.get('distribution')
+    if distribution == 'uniform':
+        return generator.uniform(specification['low'], specification['high'], number)
+    if distribution == 'normal':
+        values = generator.normal(specification['mean'], specification['std'], number)
+        return np.clip(values, specification.get('min', -np.inf), specification.get('max', np.inf))
+    if distribution == 'choice':
+        return generator.choice(np.asarray(specification['values'], dtype=float), number,
+                                p=specification.get('probabilities'))
+    raise ValueError('unknown distribution {}'.format(distribution))
+
+
+def _sample_fleet(fleet, generator):
+    # draw the parameters of every fleet entry of a lane, return a list of (DriverType, number, parameters)
+    blocks = []
+    for entry in fleet:
+        DriverType, defaults = get_driver_type(entry['driver'])
+        unknown = [name for name in entry.get('parameters', {}) if name not in defaults]
+        if unknown:
+            raise ValueError('unknown parameters {} of driver type {}'.format(unknown, entry['driver']))
+        defaults.update(entry.get('parameters', {}))
+        entry_generator = generator if 'seed' not in entry else np.random.default_rng(entry['seed'])
+        number = int(entry['number'])
+        blocks.append((DriverType, number, {name: sample_parameter(value, number, entry_generator)
+                                            for name, value in defaults.items()}))
+    return blocks
+
+
+def create_scenario(specification):
+    """
+    Create the road described by the scenario specification (a dict, see the module documentation)
+
+    All vehicles of the same driver class are allocated with a single call of VehicleState.add_vehicles, so
+    every class occupies one contiguous block of slots, no driver objects are created and the construction
+    takes O(N) vectorized operations. Predecessor links, positions and velocities are set lane by lane with
+    the slots in driving order.
+    """
+    road_specification = specification.get('road', {})
+    road_type = road_specification.get('type', 'circular')
+    if road_type not in road_types:
+        raise ValueError('unknown road type {} (known: {})'.format(road_type, ', '.join(sorted(road_types))))
+    if road_type != 'open' and 'inflow' in road_specification:
+        raise ValueError('only open roads have an inflow')
+    initialization = specification.get('initialization', 'default')
+    if initialization not in ('default', 'equilibrium'):
+        raise ValueError('unknown initialization {}'.format(initialization))
+    generator = np.random.default_rng(specification.get('seed'))
+
+    road = road_types[road_type]()
+    blocks = []
+    orders = []
+    for lane_specification in specification.get('lanes', []):
+        order = lane_specification.get('order', 'grouped')
+        if order not in ('grouped', 'random'):
+            raise ValueError('unknown order {}'.format(order))
+        for i in range(int(lane_specification.get('count', 1))):
+            lane = SimpleLane(full_length=float(lane_specification.get('length', 1000.)))
+            road.add_lane(lane)
+            lane_blocks = _sample_fleet(lane_specification.get('fleet', []), generator)
+            lane.number_of_vehicles = sum(number for DriverType, number, parameters in lane_blocks)
+            blocks.extend((lane.index, DriverType, number, parameters)
+                          for DriverType, number, parameters in lane_blocks)
+            orders.append(order)
+
+    # one bulk allocation per driver class (in the order the classes first appear), slots[i] receives the
+    # slots of blocks[i]
+    slots = [None] * len(blocks)
+    for DriverType in dict.fromkeys(block[1] for block in blocks):
+        selected = [i for i, block in enumerate(blocks) if block[1] is DriverType]
+        numbers = np.array([blocks[i][2] for i in selected], dtype=int)
+        parameters = {name: np.concatenate([blocks[i][3][name] for i in selected]) for name in blocks[selected[0]][3]}
+        length = parameters.pop('length')
+        lane_indices = np.repeat([blocks[i][0] for i in selected], numbers)
+        first = road.state.add_vehicles(int(np.sum(numbers)), DriverType, lane_indices, length=length,
+                                        **parameters)
+        starts = first + np.cumsum(numbers) - numbers
+        for i, start, number in zip(selected, starts, numbers):
+            slots[i] = np.arange(start, start + number)
+
+    for lane, order in zip(road.lanes, orders):
+        lane_slots = [slots[i] for i, block in enumerate(blocks) if block[0] == lane.index]
+        indices = np.concatenate(lane_slots) if lane_slots else np.empty(0, dtype=int)
+        if order == 'random':
+            indices = generator.permutation(indices)
+        if initialization == 'equilibrium':
+            lane.initialize_equilibrium(indices)
+        else:
+            lane.initialize_default(indices)
+    road.initialized = True
+
+    inflow = road_specification.get('inflow')
+    if inflow is not None:
+        DriverType, parameters = get_driver_type(inflow['driver'])
+        parameters.update(inflow.get('parameters', {}))
+        length = parameters.pop('length')
+        road.set_inflow(inflow['demand'], DriverType, inflow['insertion_velocity'],
+                        inflow.get('minimum_insertion_gap', 10.), inflow.get('capacity', 1024), length,
+                        **parameters)
+    return road
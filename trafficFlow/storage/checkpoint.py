@@ -0,0 +1,126 @@
+import importlib
+import json
+import os
+import time as wall_clock
+
+import numpy as np
+
+from trafficFlow.carFollowingModel.drivers.baseDriver import BaseDriver
+from trafficFlow.carFollowingModel.lanes.baseLane import BaseLane
+from trafficFlow.carFollowingModel.roads.baseRoad import BaseRoad
+
+
+def _get_class_name(cls):
+    return cls.__module__ + ':' + cls.__qualname__
+
+
+def _get_class(name, BaseType):
+    # checkpoints may come from shared directories (e.g. a result cache), so only subclasses of BaseType
+    # defined in the trafficFlow package are accepted instead of importing and calling arbitrary objects
+    module, qualname = name.split(':')
+    if module.split('.')[0] != 'trafficFlow':
+        raise ValueError('class {} of the checkpoint is not part of the trafficFlow package'.format(name))
+    cls = importlib.import_module(module)
+    for attribute in qualname.split('.'):
+        cls = getattr(cls, attribute)
+    if not (isinstance(cls, type) and issubclass(cls, BaseType)):
+        raise ValueError('{} of the checkpoint is not a subclass of {}'.format(name, BaseType.__name__))
+    return cls
+
+
+def get_road_description(road):
+    """
+    Return the JSON serializable description of road stored in checkpoints (classes of the road, the lanes
+    and the drivers, lane lengths and the boundary state), the vehicle state is not included
+    """
+    return {'road': _get_class_name(type(road)),
+            'lanes': [{'type': _get_class_name(type(lane)), 'full_length': lane.full_length}
+                      for lane in road.lanes],
+            'driver_types': [_get_class_name(DriverType) for DriverType in road.state.driver_types],
+            'road_data': road.get_checkpoint_data()}
+
+
+def save_checkpoint(path, road, time=0., steps=0):
+    """
+    Write the complete state of road (lanes, driver parameters, positions, velocities, links and boundary
+    state) together with time and steps to the uncompressed .npz file path
+
+    The file is written to a temporary file first and then renamed, so an interrupted write never destroys
+    the previous checkpoint.
+    """
+    header = dict(get_road_description(road), time=float(time), steps=int(steps))
+    arrays = {'state_' + name: array for name, array in road.state.arrays.items()}
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as checkpoint_file:
+        np.savez(checkpoint_file, header=np.array(json.dumps(header)), **arrays)
+    os.replace(temporary_path, path)
+
+
+def load_checkpoint(path):
+    """
+    Read a checkpoint written by save_checkpoint and return the restored road, the time and the number of steps
+
+    The arrays are copied into the vehicle state of a new road directly, driver objects are only created
+    when they are requested. Only road, lane and driver classes of the trafficFlow package are restored, other
+    class names in the file raise a ValueError.
+    """
+    with np.load(path) as checkpoint:
+        header = json.loads(str(checkpoint['header']))
+        arrays = {name[len('state_'):]: checkpoint[name] for name in checkpoint.files if name.startswith('state_')}
+
+    road = _get_class(header['road'], BaseRoad)()
+    for lane_header in header['lanes']:
+        lane = _get_class(lane_header['type'], BaseLane)()
+        lane.full_length = lane_header['full_length']
+        road.add_lane(lane)
+    road.state.restore(arrays, [_get_class(name, BaseDriver) for name in header['driver_types']])
+
+    occupied = road.state.lane[road.state.lane >= 0]
+    number_of_vehicles = np.bincount(occupied, minlength=road.number_of_lanes)
+    for lane in road.lanes:
+        lane.number_of_vehicles = int(number_of_vehicles[lane.index])
+        lane.initialized = True
+    road.initialized = True
+    road.set_checkpoint_data(header['road_data'])
+    return road, header['time'], header['steps']
+
+
+class CheckpointWriter:
+    """
+    Class that periodically writes checkpoints of a road during a run
+
+    The writer can be used as observer of a SimulationRunner. A checkpoint is written if at least interval
+    seconds of wall clock time passed since the last one, every checkpoint replaces the previous one.
+
+    Attributes
+    ----------
+    path : str
+        file to write the checkpoints to
+    road : Road
+        road whose state is saved
+    interval : double
+        minimum wall clock time in seconds between two checkpoints
+    number_of_checkpoints : int
+        number of checkpoints written until now
+
+    Methods
+    -------
+    write(time, steps)
+        write a checkpoint of the road at time after steps steps
+    """
+
+    def __init__(self, path, road, interval=5.):
+        self.path = path
+        self.road = road
+        self.interval = interval
+        self.number_of_checkpoints = 0
+        self._last_write = wall_clock.perf_counter()
+
+    def __call__(self, runner):
+        if wall_clock.perf_counter() - self._last_write >= self.interval:
+            self.write(runner.time, runner.steps)
+
+    def write(self, time, steps):
+        save_checkpoint(self.path, self.road, time, steps)
+        self.number_of_checkpoints = self.number_of_checkpoints + 1
+        self._last_write = wall_clock.perf_counter()
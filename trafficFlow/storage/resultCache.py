@@ -0,0 +1,301 @@
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+from trafficFlow.carFollowingModel.carFollowingModel import CarFollowingModel
+from trafficFlow.runners.simulationRunner import SimulationRecord, SimulationRunner
+from trafficFlow.storage.checkpoint import get_road_description, load_checkpoint, save_checkpoint
+
+
+def _get_settings(instance):
+    # the scalar constructor arguments describe the configuration of schemes and lane change models, counters
+    # and internal state (e.g. the last step size of adaptive schemes) are left out
+    settings = {}
+    for name in inspect.signature(type(instance).__init__).parameters:
+        value = getattr(instance, name, None)
+        if isinstance(value, (bool, int, float, str)):
+            settings[name] = value
+    return {'type': type(instance).__module__ + ':' + type(instance).__qualname__, 'settings': settings}
+
+
+def get_scenario_key(road, scheme, dt, stride=None, lane_change_model=None):
+    """
+    Return the canonical hash (hex string) of a run of road with the time discretization scheme, the step size
+    dt, the sampling stride of the trajectory (None if no trajectory is recorded) and the lane change model
+
+    The hash covers the classes and lengths of the road and the lanes, the complete vehicle state (positions,
+    velocities, lengths, links and all driver parameters), the boundary state of the road, the types and
+    settings (scalar constructor arguments) of the scheme and the lane change model, dt and stride, but not the
+    horizon, so runs of the same scenario with different horizons share a key.
+    """
+    description = {'road': get_road_description(road),
+                   'scheme': _get_settings(scheme),
+                   'lane_change_model': None if lane_change_model is None else _get_settings(lane_change_model),
+                   'dt': float(dt),
+                   'stride': stride}
+    key = hashlib.sha256(json.dumps(description, sort_keys=True).encode())
+    for name in sorted(road.state.arrays):
+        array = np.ascontiguousarray(road.state.arrays[name])
+        key.update('{}:{}:{}'.format(name, array.dtype.str, array.shape).encode())
+        key.update(array.tobytes())
+    return key.hexdigest()
+
+
+class _SummaryObserver:
+    # accumulates the summary observables after every step (sums, so continued runs can be combined)
+
+    def __init__(self, road, summary=None):
+        self.road = road
+        self.lane_lengths = np.array([lane.full_length for lane in road.lanes])
+        self.summary = summary or {'number_of_samples': 0, 'velocity_sum': 0., 'flow_sum': 0.,
+                                   'minimum_gap': float('inf')}
+
+    def __call__(self, runner):
+        state = self.road.state
+        occupied = state.lane >= 0
+        velocity = state.velocity[occupied]
+        summary = self.summary
+        summary['number_of_samples'] = summary['number_of_samples'] + 1
+        if len(velocity) > 0:
+            summary['velocity_sum'] = summary['velocity_sum'] + float(np.mean(velocity))
+            summary['flow_sum'] = summary['flow_sum'] + float(
+                np.sum(velocity / self.lane_lengths[state.lane[occupied]]) / self.road.number_of_lanes)
+            distance, speed_difference = runner.model.get_interaction(state.position, state.velocity)
+            distance = distance[occupied & np.isfinite(distance)]
+            if len(distance) > 0:
+                summary['minimum_gap'] = min(summary['minimum_gap'], float(np.min(distance)))
+
+    def finish(self, time, steps):
+        summary = dict(self.summary)
+        number_of_samples = max(summary['number_of_samples'], 1)
+        state = self.road.state
+        velocity = state.velocity[state.lane >= 0]
+        summary.update(time=time, steps=steps,
+                       mean_velocity=summary['velocity_sum'] / number_of_samples,
+                       flow=summary['flow_sum'] / number_of_samples,
+                       final_mean_velocity=float(np.mean(velocity)) if len(velocity) > 0 else 0.,
+                       final_velocity_standard_deviation=float(np.std(velocity)) if len(velocity) > 0 else 0.)
+        return summary
+
+
+class CachedResult:
+    """
+    Class that holds the result of a run served by a ResultCache
+
+    Attributes
+    ----------
+    key : str
+        hash of the scenario
+    road : Road
+        road in the state at the horizon
+    time : double
+        time at the horizon
+    steps : int
+        number of steps from the start of the scenario to the horizon
+    cached_steps : int
+        number of steps taken from the cache (steps for a complete hit, the horizon of the continued run for a
+        prefix, 0 if the scenario was simulated from the start)
+    record : SimulationRecord
+        state sampled every stride steps from the start of the scenario (None if no stride was given)
+    summary : dict
+        summary observables: mean_velocity and flow (averaged over all steps, flow per lane in vehicles per
+        second), minimum_gap (over all steps), final_mean_velocity, final_velocity_standard_deviation, time,
+        steps
+    """
+
+    def __init__(self, key, road, time, steps, cached_steps, record, summary):
+        self.key = key
+        self.road = road
+        self.time = time
+        self.steps = steps
+        self.cached_steps = cached_steps
+        self.record = record
+        self.summary = summary
+
+
+class ResultCache:
+    """
+    Class that stores the results of runs on disk, addressed by the hash of their scenario
+
+    Every entry (directory key/steps) holds the state at the end of the run as checkpoint, the summary
+    observables and (if a stride was given) the sampled trajectory. A run whose scenario was cached with the
+    same horizon is served from disk, a run with a longer horizon continues from the cached entry with the
+    longest shorter horizon (the time and the step count continue as in an uninterrupted run, so for schemes
+    without internal state the result is the same up to the last bit; adaptive schemes restart their step
+    size control). The size of all entries is bounded by max_size bytes: after every new entry the least
+    recently used entries are removed. Entries are written to a temporary directory and renamed, so several
+    processes can share a cache.
+
+    Attributes
+    ----------
+    path : str
+        directory of the cache
+    max_size : int
+        maximum size of all entries in bytes (None for no limit)
+    number_of_hits : int
+        number of runs served completely from the cache
+    number_of_continuations : int
+        number of runs continued from a cached shorter run
+    number_of_misses : int
+        number of runs simulated from the start
+
+    Methods
+    -------
+    run(road, create_scheme, dt, horizon, stride, create_lane_change_model)
+        return the CachedResult of the run of road until horizon with the scheme create_scheme(model)
+        (the road itself is only advanced if nothing is cached for its scenario)
+    get_size()
+        return the size of all entries in bytes
+    evict(keep)
+        remove least recently used entries until the size is at most max_size (the entry keep is not removed)
+    clear()
+        remove all entries
+    """
+
+    def __init__(self, path, max_size=2**30):
+        self.path = path
+        self.max_size = max_size
+        self.number_of_hits = 0
+        self.number_of_continuations = 0
+        self.number_of_misses = 0
+        os.makedirs(path, exist_ok=True)
+
+    def _get_entry_path(self, key, steps):
+        return os.path.join(self.path, key, '{:012d}'.format(steps))
+
+    def _find_entry(self, key, steps):
+        # the cached entry with the longest horizon up to steps (None if there is none)
+        directory = os.path.join(self.path, key)
+        if not os.path.isdir(directory):
+            return None
+        cached = [int(name) for name in os.listdir(directory) if name.isdigit() and int(name) <= steps]
+        return max(cached) if cached else None
+
+    def _get_entries(self):
+        entries = []
+        for key in os.listdir(self.path):
+            directory = os.path.join(self.path, key)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if not name.isdigit():
+                    continue
+                entry_path = os.path.join(directory, name)
+                files = [os.path.join(entry_path, file_name) for file_name in os.listdir(entry_path)]
+                entries.append((os.path.getmtime(entry_path), sum(os.path.getsize(file) for file in files),
+                                entry_path))
+        return entries
+
+    def get_size(self):
+        return sum(size for last_access, size, entry_path in self._get_entries())
+
+    def evict(self, keep=None):
+        if self.max_size is None:
+            return
+        entries = sorted(self._get_entries())
+        size = sum(entry[1] for entry in entries)
+        for last_access, entry_size, entry_path in entries:
+            if size <= self.max_size:
+                break
+            if entry_path == keep:
+                continue
+            shutil.rmtree(entry_path, ignore_errors=True)
+            size = size - entry_size
+            directory = os.path.dirname(entry_path)
+            if not os.listdir(directory):
+                os.rmdir(directory)
+
+    def clear(self):
+        for key in os.listdir(self.path):
+            shutil.rmtree(os.path.join(self.path, key), ignore_errors=True)
+
+    def _load(self, key, steps, stride):
+        entry_path = self._get_entry_path(key, steps)
+        # the modification time of the entry directory is its last access
+        os.utime(entry_path)
+        road, time, steps = load_checkpoint(os.path.join(entry_path, 'checkpoint.npz'))
+        with open(os.path.join(entry_path, 'summary.json')) as summary_file:
+            summary = json.load(summary_file)
+        record = None
+        if stride is not None:
+            with np.load(os.path.join(entry_path, 'record.npz')) as record_file:
+                record = SimulationRecord(record_file['times'], record_file['position'], record_file['velocity'],
+                                          record_file['lane'])
+        return road, time, steps, record, summary
+
+    def _store(self, key, road, time, steps, record, summary):
+        entry_path = self._get_entry_path(key, steps)
+        temporary_path = os.path.join(self.path, key, '.tmp-' + uuid.uuid4().hex)
+        os.makedirs(temporary_path)
+        save_checkpoint(os.path.join(temporary_path, 'checkpoint.npz'), road, time, steps)
+        with open(os.path.join(temporary_path, 'summary.json'), 'w') as summary_file:
+            json.dump(summary, summary_file, indent=1)
+        if record is not None:
+            np.savez(os.path.join(temporary_path, 'record.npz'), times=record.times, position=record.position,
+                     velocity=record.velocity, lane=record.lane)
+        try:
+            os.rename(temporary_path, entry_path)
+        except OSError:
+            # another process stored the same entry in the meantime
+            shutil.rmtree(temporary_path, ignore_errors=True)
+        self.evict(keep=entry_path)
+
+    def run(self, road, create_scheme, dt, horizon, stride=None, create_lane_change_model=None):
+        lane_change_model = None if create_lane_change_model is None else create_lane_change_model()
+        model = CarFollowingModel(road, lane_change_model)
+        scheme = create_scheme(model)
+        key = get_scenario_key(road, scheme, dt, stride, lane_change_model)
+        steps = int(round(horizon / dt))
+
+        cached_steps = self._find_entry(key, steps)
+        if cached_steps == steps:
+            self.number_of_hits = self.number_of_hits + 1
+            road, time, steps, record, summary = self._load(key, steps, stride)
+            return CachedResult(key, road, time, steps, steps, record, summary)
+
+        times, position, velocity, lane = [], [], [], []
+        if cached_steps is None:
+            self.number_of_misses = self.number_of_misses + 1
+            cached_steps = 0
+            summary_observer = _SummaryObserver(road)
+            if stride is not None:
+                times.append(0.)
+                position.append(road.state.position.copy())
+                velocity.append(road.state.velocity.copy())
+                lane.append(road.state.lane.copy())
+        else:
+            self.number_of_continuations = self.number_of_continuations + 1
+            road, time, cached_steps, record, summary = self._load(key, cached_steps, stride)
+            summary_observer = _SummaryObserver(road, summary)
+            if stride is not None:
+                times, position, velocity, lane = [list(values) for values in (record.times, record.position,
+                                                                                record.velocity, record.lane)]
+            lane_change_model = None if create_lane_change_model is None else create_lane_change_model()
+            model = CarFollowingModel(road, lane_change_model)
+            scheme = create_scheme(model)
+
+        runner = SimulationRunner(model, scheme, dt=dt)
+        # continue the step count of the cached run, so times and sampled steps match an uninterrupted run
+        runner.steps = cached_steps
+        runner.time = cached_steps * dt
+        runner.add_observer(summary_observer)
+        if stride is not None:
+            def sample(runner):
+                times.append(runner.time)
+                position.append(road.state.position.copy())
+                velocity.append(road.state.velocity.copy())
+                lane.append(road.state.lane.copy())
+            runner.add_observer(sample, stride=stride)
+        runner.run(steps * dt)
+
+        record = None
+        if stride is not None:
+            record = SimulationRecord(np.array(times), np.array(position), np.array(velocity), np.array(lane))
+        summary = summary_observer.finish(runner.time, runner.steps)
+        self._store(key, road, runner.time, runner.steps, record, summary)
+        return CachedResult(key, road, runner.time, runner.steps, cached_steps, record, summary)
@@ -0,0 +1,190 @@
+import json
+import os
+
+import numpy as np
+
+
+class TrajectoryWriter:
+    """
+    Class that records the vehicle state into a directory of chunked .npy files
+
+    The directory contains a small header (header.json) describing the road, the lanes and the chunks, and for
+    every chunk one .npy file per recorded quantity (times, position, velocity, lane) and one with the lengths
+    of the vehicles. At most chunk_size samples are kept in memory. The writer can be used as observer of a
+    SimulationRunner.
+
+    Attributes
+    ----------
+    path : str
+        directory to write to
+    road : Road
+        road whose vehicle state is recorded
+    chunk_size : int
+        number of samples per chunk
+    velocity_dtype : np.dtype
+        floating point type used for velocities (positions are always stored as float64, since float32 resolves
+        positions on long lanes only to meters)
+    header : dict
+        content of header.json
+    number_of_samples : int
+        number of samples recorded until now
+
+    Methods
+    -------
+    record(time)
+        append the current vehicle state of the road at time to the trajectory
+    flush()
+        write the buffered samples as a new chunk
+    close()
+        flush and finish the trajectory
+    """
+
+    def __init__(self, path, road, chunk_size=1000, velocity_dtype=np.float64):
+        self.path = path
+        self.road = road
+        self.chunk_size = chunk_size
+        self.velocity_dtype = np.dtype(velocity_dtype)
+        self.number_of_samples = 0
+        self.header = {'road': type(road).__name__,
+                       'lanes': [{'type': type(lane).__name__, 'full_length': lane.full_length}
+                                 for lane in road.lanes],
+                       'velocity_dtype': self.velocity_dtype.str,
+                       'chunks': []}
+        self._buffers = None
+        self._buffered = 0
+        os.makedirs(path, exist_ok=True)
+        self._write_header()
+
+    def __call__(self, runner):
+        self.record(runner.time)
+
+    def _write_header(self):
+        with open(os.path.join(self.path, 'header.json'), 'w') as header_file:
+            json.dump(self.header, header_file, indent=1)
+
+    def record(self, time):
+        state = self.road.state
+        if self._buffers is not None and self._buffers['position'].shape[1] != state.number_of_vehicles:
+            self.flush()
+        if self._buffers is None:
+            shape = (self.chunk_size, state.number_of_vehicles)
+            self._buffers = {'times': np.empty(self.chunk_size),
+                             'position': np.empty(shape),
+                             'velocity': np.empty(shape, dtype=self.velocity_dtype),
+                             'lane': np.empty(shape, dtype=np.int16)}
+            self._lengths = state.length.copy()
+        self._buffers['times'][self._buffered] = time
+        self._buffers['position'][self._buffered] = state.position
+        self._buffers['velocity'][self._buffered] = state.velocity
+        self._buffers['lane'][self._buffered] = state.lane
+        self._buffered = self._buffered + 1
+        self.number_of_samples = self.number_of_samples + 1
+        if self._buffered == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffered == 0:
+            return
+        chunk = len(self.header['chunks'])
+        for name, buffer in self._buffers.items():
+            np.save(os.path.join(self.path, '{}_{:05d}.npy'.format(name, chunk)), buffer[:self._buffered])
+        np.save(os.path.join(self.path, 'length_{:05d}.npy'.format(chunk)), self._lengths)
+        self.header['chunks'].append({'number_of_samples': self._buffered,
+                                      'number_of_vehicles': self._buffers['position'].shape[1],
+                                      't_start': float(self._buffers['times'][0]),
+                                      't_end': float(self._buffers['times'][self._buffered - 1])})
+        self._write_header()
+        self._buffers = None
+        self._buffered = 0
+
+    def close(self):
+        self.flush()
+
+
+class TrajectoryReader:
+    """
+    Class that reads trajectories written by TrajectoryWriter without loading them completely
+
+    Chunks are opened as memory maps, so only the requested time range and vehicles are read from disk.
+
+    Attributes
+    ----------
+    path : str
+        directory to read from
+    header : dict
+        content of header.json
+    lane_lengths : np.ndarray
+        full length of every lane
+    times : np.ndarray
+        all sample times
+    number_of_samples : int
+        total number of samples
+
+    Methods
+    -------
+    read(t_start, t_end, vehicles)
+        return times, positions, velocities and lanes of the samples with t_start <= t <= t_end for the given
+        vehicles (all if None)
+    read_sample(sample)
+        return time, positions, velocities and lanes of a single sample
+    read_lengths(sample)
+        return the lengths of the vehicles at a single sample
+    find_sample(time)
+        return the index of the last sample at or before time
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'header.json')) as header_file:
+            self.header = json.load(header_file)
+        self.lane_lengths = np.array([lane['full_length'] for lane in self.header['lanes']])
+        self._chunk_starts = np.cumsum([0] + [chunk['number_of_samples'] for chunk in self.header['chunks']])
+        self.number_of_samples = int(self._chunk_starts[-1])
+        if self.header['chunks']:
+            self.times = np.concatenate([self._load('times', chunk) for chunk in range(len(self.header['chunks']))])
+        else:
+            self.times = np.empty(0)
+
+    def _load(self, name, chunk):
+        return np.load(os.path.join(self.path, '{}_{:05d}.npy'.format(name, chunk)), mmap_mode='r')
+
+    def _read_columns(self, name, chunk, rows, vehicles, fill_value):
+        data = self._load(name, chunk)[rows]
+        if vehicles is None:
+            return np.array(data)
+        vehicles = np.asarray(vehicles)
+        result = np.full((data.shape[0], len(vehicles)), fill_value, dtype=data.dtype)
+        available = vehicles < data.shape[1]
+        result[:, available] = data[:, vehicles[available]]
+        return result
+
+    def find_sample(self, time):
+        return max(int(np.searchsorted(self.times, time, side='right')) - 1, 0)
+
+    def read(self, t_start=None, t_end=None, vehicles=None):
+        first = 0 if t_start is None else int(np.searchsorted(self.times, t_start, side='left'))
+        last = self.number_of_samples if t_end is None else int(np.searchsorted(self.times, t_end, side='right'))
+        position, velocity, lane = [], [], []
+        for chunk in range(len(self.header['chunks'])):
+            rows = slice(max(first - self._chunk_starts[chunk], 0),
+                         max(min(last, self._chunk_starts[chunk + 1]) - self._chunk_starts[chunk], 0))
+            if rows.start >= rows.stop:
+                continue
+            position.append(self._read_columns('position', chunk, rows, vehicles, np.nan))
+            velocity.append(self._read_columns('velocity', chunk, rows, vehicles, np.nan))
+            lane.append(self._read_columns('lane', chunk, rows, vehicles, -1))
+        if not position:
+            return self.times[first:last], np.empty((0, 0)), np.empty((0, 0)), np.empty((0, 0), dtype=np.int16)
+        if vehicles is None and len({block.shape[1] for block in position}) > 1:
+            raise ValueError('the number of vehicles changes in the requested range, select the vehicles')
+        return self.times[first:last], np.concatenate(position), np.concatenate(velocity), np.concatenate(lane)
+
+    def read_sample(self, sample):
+        chunk = int(np.searchsorted(self._chunk_starts, sample, side='right')) - 1
+        row = sample - self._chunk_starts[chunk]
+        return (self.times[sample], np.array(self._load('position', chunk)[row]),
+                np.array(self._load('velocity', chunk)[row]), np.array(self._load('lane', chunk)[row]))
+
+    def read_lengths(self, sample):
+        chunk = int(np.searchsorted(self._chunk_starts, sample, side='right')) - 1
+        return np.load(os.path.join(self.path, 'length_{:05d}.npy'.format(chunk)))
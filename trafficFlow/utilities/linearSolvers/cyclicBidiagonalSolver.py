@@ -0,0 +1,42 @@
+import numpy as np
+
+
+def solve_cyclic_bidiagonal(diagonal, off_diagonal, predecessor, right_hand_side, cycle_length):
+    """
+    Solve diagonal[i] * x[i] + off_diagonal[i] * x[predecessor[i]] = right_hand_side[i] for all i
+
+    predecessor describes disjoint cycles (e.g. the vehicles on the lanes of a circular road) or chains ending
+    in an entry without predecessor (predecessor[i] < 0). cycle_length[i] has to be the length of the cycle of
+    i (or at least the length of the chain starting at i). Writing the equations as x[i] = alpha[i] +
+    beta[i] * x[predecessor[i]], the affine maps are composed along the predecessors by repeated squaring,
+    which needs log2(max(cycle_length)) vectorized passes instead of a sequential sweep.
+
+    All arrays index the vehicles along the last axis; leading axes (e.g. ensemble members) are broadcast.
+    """
+    number_of_vehicles = np.shape(diagonal)[-1]
+    own_index = np.arange(number_of_vehicles)
+    has_predecessor = predecessor >= 0
+    pointer = np.where(has_predecessor, predecessor, own_index)
+
+    alpha = right_hand_side / diagonal
+    beta = np.where(has_predecessor, -off_diagonal / diagonal, 0.)
+
+    accumulated_alpha = np.zeros_like(alpha)
+    accumulated_beta = np.ones_like(beta)
+    target = own_index
+    remaining = np.asarray(cycle_length).copy()
+    while True:
+        bit = (remaining & 1).astype(bool)
+        accumulated_alpha = np.where(bit, accumulated_alpha + accumulated_beta * alpha[..., target], accumulated_alpha)
+        accumulated_beta = np.where(bit, accumulated_beta * beta[..., target], accumulated_beta)
+        target = np.where(bit, pointer[target], target)
+        remaining = remaining >> 1
+        if not np.any(remaining):
+            break
+        alpha = alpha + beta * alpha[..., pointer]
+        beta = beta * beta[..., pointer]
+        pointer = pointer[pointer]
+
+    # after a full cycle target == i, i.e. x[i] = accumulated_alpha[i] + accumulated_beta[i] * x[i]
+    # (at the end of a chain accumulated_beta vanishes)
+    return accumulated_alpha / (1. - accumulated_beta)
@@ -0,0 +1,96 @@
+import time
+
+
+class Profiler:
+    """
+    Class that collects timers and counters of the phases of a simulation
+
+    Models and visualizations only call the profiler if one is attached to them (their attribute profiler is
+    not None), so there is no cost apart from a comparison with None if profiling is disabled. A phase is
+    measured by start = profiler.start() before and profiler.stop(name, start) after it.
+
+    Attributes
+    ----------
+    calls : dict(str, int)
+        number of measurements of every timer
+    totals : dict(str, double)
+        accumulated time of every timer in seconds
+    maxima : dict(str, double)
+        longest single measurement of every timer in seconds
+    counters : dict(str, int)
+        value of every counter
+    observers : list(Function)
+        functions called with (name, value) for every measurement (value in seconds) and counter increment
+
+    Methods
+    -------
+    start()
+        return the current time to pass to stop
+    stop(name, start)
+        add the time since start to the timer name and return it
+    count(name, increment)
+        add increment to the counter name
+    add_observer(observer)
+        call observer(name, value) for every measurement and counter increment
+    reset()
+        clear all timers and counters
+    get_summary()
+        return calls, total, mean and maximum time of every timer and the value of every counter as dict
+    report()
+        return a table of the timers sorted by total time and of the counters as text
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.totals = {}
+        self.maxima = {}
+        self.counters = {}
+        self.observers = []
+
+    def start(self):
+        return time.perf_counter()
+
+    def stop(self, name, start):
+        elapsed = time.perf_counter() - start
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.totals[name] = self.totals.get(name, 0.) + elapsed
+        self.maxima[name] = max(self.maxima.get(name, 0.), elapsed)
+        for observer in self.observers:
+            observer(name, elapsed)
+        return elapsed
+
+    def count(self, name, increment=1):
+        self.counters[name] = self.counters.get(name, 0) + increment
+        for observer in self.observers:
+            observer(name, increment)
+
+    def add_observer(self, observer):
+        self.observers.append(observer)
+
+    def reset(self):
+        self.calls.clear()
+        self.totals.clear()
+        self.maxima.clear()
+        self.counters.clear()
+
+    def get_summary(self):
+        return {'timers': {name: {'calls': self.calls[name],
+                                  'total': self.totals[name],
+                                  'mean': self.totals[name] / self.calls[name],
+                                  'maximum': self.maxima[name]}
+                           for name in self.totals},
+                'counters': dict(self.counters)}
+
+    def report(self):
+        lines = ['{:<28} {:>10} {:>12} {:>12} {:>12}'.format('timer', 'calls', 'total [s]', 'mean [ms]',
+                                                             'max [ms]')]
+        for name in sorted(self.totals, key=self.totals.get, reverse=True):
+            lines.append('{:<28} {:>10} {:>12.4f} {:>12.4f} {:>12.4f}'.format(
+                name, self.calls[name], self.totals[name], self.totals[name] / self.calls[name] * 1e3,
+                self.maxima[name] * 1e3))
+        if self.counters:
+            lines.append('')
+            lines.append('{:<28} {:>10}'.format('counter', 'value'))
+            for name in sorted(self.counters):
+                lines.append('{:<28} {:>10}'.format(name, self.counters[name]))
+        return '\n'.join(lines)
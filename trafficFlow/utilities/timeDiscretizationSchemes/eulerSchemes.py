@@ -1,3 +1,5 @@
+import numpy as np
+
 from trafficFlow.utilities.timeDiscretizationSchemes.baseTimeDiscretizationScheme import BaseTimeDiscretizationScheme
 
 
@@ -23,3 +25,77 @@ class ExplicitEulerScheme(BaseTimeDiscretizationScheme):
 
     def apply(self, t, dt, y_old):
         return y_old + dt * self.function(t, y_old)
+
+
+class LinearlyImplicitEulerScheme(BaseTimeDiscretizationScheme):
+    """
+    Class that implements the linearly implicit Euler scheme (Rosenbrock-Euler) to solve stiff ordinary
+    differential equations
+
+    Inherits from the BaseTimeDiscretizationScheme class. Every step solves one linear system with the
+    Jacobian of the right hand side at the old iterate.
+
+    Attributes
+    ----------
+    function : Function
+        function to use as right hand side of the ordinary differential equation
+    jacobian : Function
+        function jacobian(t, y) returning the Jacobian of function at y as an object with a method
+        solve(gamma, right_hand_side) that solves (I - gamma * J) z = right_hand_side
+
+    Methods
+    -------
+    apply(t, dt, y_old)
+        override method in class BaseTimeDiscretizationScheme and perform a single step of the linearly
+        implicit Euler scheme
+    """
+
+    def __init__(self, function, jacobian):
+        self.function = function
+        self.jacobian = jacobian
+
+    def apply(self, t, dt, y_old):
+        return y_old + self.jacobian(t, y_old).solve(dt, dt * self.function(t, y_old))
+
+
+class ImplicitEulerScheme(BaseTimeDiscretizationScheme):
+    """
+    Class that implements the implicit Euler scheme to solve stiff ordinary differential equations
+
+    Inherits from the BaseTimeDiscretizationScheme class. The nonlinear equation of every step is solved
+    with Newton's method.
+
+    Attributes
+    ----------
+    function : Function
+        function to use as right hand side of the ordinary differential equation
+    jacobian : Function
+        function jacobian(t, y) returning the Jacobian of function at y as an object with a method
+        solve(gamma, right_hand_side) that solves (I - gamma * J) z = right_hand_side
+    tolerance : double
+        relative tolerance for the Newton updates
+    max_iterations : int
+        maximum number of Newton iterations per step
+
+    Methods
+    -------
+    apply(t, dt, y_old)
+        override method in class BaseTimeDiscretizationScheme and perform a single step of the implicit
+        Euler scheme
+    """
+
+    def __init__(self, function, jacobian, tolerance=1e-10, max_iterations=20):
+        self.function = function
+        self.jacobian = jacobian
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+
+    def apply(self, t, dt, y_old):
+        y = y_old
+        for i in range(self.max_iterations):
+            residual = y_old + dt * self.function(t + dt, y) - y
+            update = self.jacobian(t + dt, y).solve(dt, residual)
+            y = y + update
+            if np.max(np.abs(update)) <= self.tolerance * (1. + np.max(np.abs(y))):
+                return y
+        raise RuntimeError('Newton iteration of the implicit Euler scheme did not converge')
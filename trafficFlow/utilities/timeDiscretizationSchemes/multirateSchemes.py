@@ -0,0 +1,134 @@
+import numpy as np
+
+from trafficFlow.utilities.timeDiscretizationSchemes.baseTimeDiscretizationScheme import BaseTimeDiscretizationScheme
+
+
+class MultirateRungeKuttaScheme(BaseTimeDiscretizationScheme):
+    """
+    Class that implements a multirate version of the classical Runge-Kutta scheme for car following models
+
+    Inherits from the BaseTimeDiscretizationScheme class. Every step of length dt is first performed for all
+    vehicles with a single step of the classical Runge-Kutta scheme. Vehicles in dense or inhomogeneous traffic
+    are then advanced again with refinement steps of length dt / refinement (so they pay for the large step
+    and the small steps). The traffic is classified relative to the speed of every vehicle rather than by
+    absolute gaps, so vehicles following at their usual time gap stay in the large step: a vehicle is refined if
+    its time headway (gap divided by velocity) is below headway_threshold or it approaches its predecessor
+    with a time to collision (gap divided by the approach rate) below time_to_collision_threshold at the
+    beginning of the step, together with buffer followers of each refined vehicle. During these small steps, the
+    states of predecessors that are not refined are interpolated from the large step (cubic Hermite
+    interpolation of the position using the velocities at both ends, the velocity is its derivative), while
+    refined predecessors use their own intermediate states. On a road that is mostly in free flow or in
+    uniform flow, only a few vehicles are evaluated more than four times per step.
+
+    Attributes
+    ----------
+    model : CarFollowingModel
+        model providing the right hand side for all vehicles and the accelerations of single vehicles
+    refinement : int
+        number of small steps per step for vehicles in dense traffic
+    headway_threshold : double
+        vehicles with a shorter time headway to their predecessor take small steps
+    time_to_collision_threshold : double
+        vehicles approaching their predecessor with a shorter time to collision take small steps
+    buffer : int
+        number of followers of every vehicle taking small steps that take small steps as well
+    number_of_refined_vehicles : int
+        number of vehicles that took small steps in the last step
+    number_of_vehicle_evaluations : int
+        number of evaluations of the acceleration of a single vehicle until now
+
+    Methods
+    -------
+    apply(t, dt, y_old)
+        override method in class BaseTimeDiscretizationScheme and perform a single multirate step
+    get_refined_vehicles(y)
+        return the slots of the vehicles that take small steps when a step starts at y
+    """
+
+    c = (0., 0.5, 0.5, 1.)
+
+    def __init__(self, model, refinement=4, headway_threshold=0.5, time_to_collision_threshold=10., buffer=1):
+        self.model = model
+        self.refinement = refinement
+        self.headway_threshold = headway_threshold
+        self.time_to_collision_threshold = time_to_collision_threshold
+        self.buffer = buffer
+        self.number_of_refined_vehicles = 0
+        self.number_of_vehicle_evaluations = 0
+
+    def _runge_kutta_step(self, function, t, dt, y):
+        k1 = function(t, y)
+        k2 = function(t + dt/2., y + dt/2. * k1)
+        k3 = function(t + dt/2., y + dt/2. * k2)
+        k4 = function(t + dt, y + dt * k3)
+        return y + dt/6. * (k1 + 2.*k2 + 2.*k3 + k4)
+
+    def get_refined_vehicles(self, y):
+        model = self.model
+        state = model.road.state
+        number_of_vehicles = model.get_number_of_vehicles()
+        distance, speed_difference = model.get_interaction(y[:number_of_vehicles], y[number_of_vehicles:])
+        velocity = y[number_of_vehicles:]
+        # distance < threshold * rate instead of the quotients, so standing vehicles and leaders with an infinite
+        # distance need no special treatment
+        refined = (distance < self.headway_threshold * velocity) \
+            | (distance < self.time_to_collision_threshold * -speed_difference)
+        refined = refined & (state.lane >= 0)
+        for i in range(self.buffer):
+            followers = state.successor[refined]
+            refined[followers[followers >= 0]] = True
+        return np.flatnonzero(refined)
+
+    def apply(self, t, dt, y_old):
+        model = self.model
+        number_of_vehicles = model.get_number_of_vehicles()
+        y_new = self._runge_kutta_step(model.create_right_hand_side, t, dt, y_old)
+        self.number_of_vehicle_evaluations = self.number_of_vehicle_evaluations + 4 * number_of_vehicles
+
+        refined = self.get_refined_vehicles(y_old)
+        self.number_of_refined_vehicles = len(refined)
+        if len(refined) == 0:
+            return y_new
+
+        position_old, velocity_old = y_old[:number_of_vehicles], y_old[number_of_vehicles:]
+        position_new, velocity_new = y_new[:number_of_vehicles], y_new[number_of_vehicles:]
+        predecessor = model.road.state.predecessor[refined]
+        # predecessors of free slots and leading vehicles on open roads are not used
+        predecessor = np.where(predecessor < 0, refined, predecessor)
+        local_index = np.full(number_of_vehicles, -1)
+        local_index[refined] = np.arange(len(refined))
+        refined_predecessor = local_index[predecessor]
+        is_refined = refined_predecessor >= 0
+        interpolated = predecessor[~is_refined]
+        number_of_refined = len(refined)
+
+        def interpolate(theta):
+            h00, h10 = 2.*theta**3 - 3.*theta**2 + 1., theta**3 - 2.*theta**2 + theta
+            h01, h11 = -2.*theta**3 + 3.*theta**2, theta**3 - theta**2
+            position = h00 * position_old[interpolated] + h10 * dt * velocity_old[interpolated] \
+                + h01 * position_new[interpolated] + h11 * dt * velocity_new[interpolated]
+            d00, d10 = 6.*theta**2 - 6.*theta, 3.*theta**2 - 4.*theta + 1.
+            d01, d11 = -6.*theta**2 + 6.*theta, 3.*theta**2 - 2.*theta
+            velocity = (d00 * position_old[interpolated] + d01 * position_new[interpolated]) / dt \
+                + d10 * velocity_old[interpolated] + d11 * velocity_new[interpolated]
+            return position, velocity
+
+        def function(time, z):
+            position, velocity = z[:number_of_refined], z[number_of_refined:]
+            predecessor_position = np.empty(number_of_refined)
+            predecessor_velocity = np.empty(number_of_refined)
+            predecessor_position[is_refined] = position[refined_predecessor[is_refined]]
+            predecessor_velocity[is_refined] = velocity[refined_predecessor[is_refined]]
+            predecessor_position[~is_refined], predecessor_velocity[~is_refined] = interpolate((time - t) / dt)
+            acceleration = model.get_partial_accelerations(refined, position, velocity, predecessor_position,
+                                                           predecessor_velocity)
+            self.number_of_vehicle_evaluations = self.number_of_vehicle_evaluations + number_of_refined
+            return np.concatenate((velocity, acceleration))
+
+        z = np.concatenate((position_old[refined], velocity_old[refined]))
+        h = dt / self.refinement
+        for i in range(self.refinement):
+            z = self._runge_kutta_step(function, t + i * h, h, z)
+        y_new[refined] = z[:number_of_refined]
+        y_new[number_of_vehicles + refined] = z[number_of_refined:]
+        return y_new
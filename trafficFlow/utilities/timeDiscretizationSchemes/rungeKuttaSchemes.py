@@ -0,0 +1,163 @@
+import numpy as np
+
+from trafficFlow.utilities.timeDiscretizationSchemes.baseTimeDiscretizationScheme import BaseTimeDiscretizationScheme
+
+
+class ClassicalRungeKuttaScheme(BaseTimeDiscretizationScheme):
+    """
+    Class that implements the classical Runge-Kutta scheme of order four to solve ordinary differential equations
+
+    Inherits from the BaseTimeDiscretizationScheme class.
+
+    Attributes
+    ----------
+    function : Function
+        function to use as right hand side of the ordinary differential equation
+
+    Methods
+    -------
+    apply(t, dt, y_old)
+        override method in class BaseTimeDiscretizationScheme and perform a single step of the classical
+        Runge-Kutta scheme
+    """
+
+    def __init__(self, function):
+        self.function = function
+
+    def apply(self, t, dt, y_old):
+        k1 = self.function(t, y_old)
+        k2 = self.function(t + dt/2., y_old + dt/2. * k1)
+        k3 = self.function(t + dt/2., y_old + dt/2. * k2)
+        k4 = self.function(t + dt, y_old + dt * k3)
+        return y_old + dt/6. * (k1 + 2.*k2 + 2.*k3 + k4)
+
+
+class DormandPrinceScheme(BaseTimeDiscretizationScheme):
+    """
+    Class that implements the embedded Runge-Kutta scheme of Dormand and Prince of order 5(4) with adaptive
+    step size control and dense output
+
+    Inherits from the BaseTimeDiscretizationScheme class. A call of apply(t, dt, y_old) covers the interval
+    [t, t + dt] with as many internal steps as the error control requires; the internal step size is kept
+    between calls, so dt can be chosen as the sampling interval and may be much larger than the stable step
+    size of an explicit scheme. If the error control cannot accept a step of at least min_dt (e.g. after a
+    collision made the right hand side infinite or NaN), a RuntimeError is raised instead of shrinking the step
+    size forever.
+
+    Attributes
+    ----------
+    function : Function
+        function to use as right hand side of the ordinary differential equation
+    relative_tolerance : double
+        relative tolerance of the local error estimate
+    absolute_tolerance : double
+        absolute tolerance of the local error estimate
+    max_dt : double
+        upper bound for the internal step size
+    min_dt : double
+        lower bound for the internal step size (a step of this size that is still rejected, e.g. because the right
+        hand side is not finite, raises a RuntimeError)
+    internal_dt : double
+        step size proposed for the next internal step (None before the first step)
+    number_of_function_evaluations : int
+        number of evaluations of function until now
+    number_of_accepted_steps : int
+        number of accepted internal steps until now
+    number_of_rejected_steps : int
+        number of rejected internal steps until now
+
+    Methods
+    -------
+    apply(t, dt, y_old)
+        override method in class BaseTimeDiscretizationScheme and integrate from t to t + dt
+    integrate(t, t_end, y_old, sample_times)
+        integrate from t to t_end and return the solution at t_end together with the solution at the sample
+        times (evaluated with the dense output of the scheme, so the steps are not shortened to hit them)
+    """
+
+    c = np.array([0., 1./5., 3./10., 4./5., 8./9., 1., 1.])
+    A = [[],
+         [1./5.],
+         [3./40., 9./40.],
+         [44./45., -56./15., 32./9.],
+         [19372./6561., -25360./2187., 64448./6561., -212./729.],
+         [9017./3168., -355./33., 46732./5247., 49./176., -5103./18656.],
+         [35./384., 0., 500./1113., 125./192., -2187./6784., 11./84.]]
+    error_weights = np.array([71./57600., 0., -71./16695., 71./1920., -17253./339200., 22./525., -1./40.])
+    dense_weights = np.array([-12715105075./11282082432., 0., 87487479700./32700410799.,
+                              -10690763975./1880347072., 701980252875./199316789632.,
+                              -1453857185./822651844., 69997945./29380423.])
+
+    def __init__(self, function, relative_tolerance=1e-6, absolute_tolerance=1e-6, max_dt=np.inf, min_dt=1e-10):
+        self.function = function
+        self.relative_tolerance = relative_tolerance
+        self.absolute_tolerance = absolute_tolerance
+        self.max_dt = max_dt
+        self.min_dt = min_dt
+        self.internal_dt = None
+        self.number_of_function_evaluations = 0
+        self.number_of_accepted_steps = 0
+        self.number_of_rejected_steps = 0
+
+    def _evaluate(self, t, y):
+        self.number_of_function_evaluations = self.number_of_function_evaluations + 1
+        return self.function(t, y)
+
+    def _attempt_step(self, t, h, y, k1):
+        k = [k1]
+        for i in range(1, 7):
+            y_stage = y + h * sum(a * k_j for a, k_j in zip(self.A[i], k) if a != 0.)
+            k.append(self._evaluate(t + self.c[i]*h, y_stage))
+        y_new = y_stage
+        error = h * sum(e * k_j for e, k_j in zip(self.error_weights, k) if e != 0.)
+        scale = self.absolute_tolerance + self.relative_tolerance * np.maximum(np.abs(y), np.abs(y_new))
+        return y_new, k, np.sqrt(np.mean((error / scale)**2))
+
+    def _dense_coefficients(self, h, y, y_new, k):
+        difference = y_new - y
+        coefficient3 = h * k[0] - difference
+        coefficient4 = difference - h * k[6] - coefficient3
+        coefficient5 = h * sum(d * k_j for d, k_j in zip(self.dense_weights, k) if d != 0.)
+        return y, difference, coefficient3, coefficient4, coefficient5
+
+    @staticmethod
+    def _interpolate(coefficients, theta):
+        y, difference, coefficient3, coefficient4, coefficient5 = coefficients
+        theta1 = 1. - theta
+        return y + theta*(difference + theta1*(coefficient3 + theta*(coefficient4 + theta1*coefficient5)))
+
+    def integrate(self, t, t_end, y_old, sample_times=()):
+        sample_times = np.asarray(sample_times, dtype=float)
+        samples = np.empty((len(sample_times),) + np.shape(y_old))
+        next_sample = 0
+        y = np.asarray(y_old, dtype=float)
+        if self.internal_dt is None:
+            self.internal_dt = min(t_end - t, self.max_dt)
+        k1 = self._evaluate(t, y)
+
+        while t < t_end:
+            h = min(self.internal_dt, self.max_dt, t_end - t)
+            y_new, k, error = self._attempt_step(t, h, y, k1)
+            factor = 0.9 * max(error, 1e-10)**(-1./5.)
+            if error > 1. or not np.isfinite(error):
+                self.number_of_rejected_steps = self.number_of_rejected_steps + 1
+                if h <= self.min_dt:
+                    raise RuntimeError('step size of the Dormand-Prince scheme fell below {:g} at t = {:g} (error '
+                                       'estimate {:g})'.format(self.min_dt, t, error))
+                self.internal_dt = max(h * min(1., max(0.2, factor if np.isfinite(error) else 0.2)), self.min_dt)
+                continue
+            self.number_of_accepted_steps = self.number_of_accepted_steps + 1
+            t_new = t_end if t_end - (t + h) <= 1e-12 * max(1., abs(t_end)) else t + h
+            if next_sample < len(sample_times) and sample_times[next_sample] <= t_new:
+                coefficients = self._dense_coefficients(h, y, y_new, k)
+                while next_sample < len(sample_times) and sample_times[next_sample] <= t_new:
+                    samples[next_sample] = self._interpolate(coefficients, (sample_times[next_sample] - t) / h)
+                    next_sample = next_sample + 1
+            if h == self.internal_dt or factor < 1.:
+                self.internal_dt = h * min(5., max(0.2, factor))
+            t, y, k1 = t_new, y_new, k[6]
+
+        return y, samples
+
+    def apply(self, t, dt, y_old):
+        return self.integrate(t, t + dt, y_old)[0]
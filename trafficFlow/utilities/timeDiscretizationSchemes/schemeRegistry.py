@@ -0,0 +1,24 @@
+"""
+Registry of the time discretization schemes by name
+
+Every entry creates the scheme for a car following model (the schemes need different parts of the model: the
+right hand side, its Jacobian or the whole model), so command line tools and benchmarks can select schemes by
+name without knowing their constructors.
+"""
+
+from trafficFlow.utilities.timeDiscretizationSchemes.eulerSchemes import ExplicitEulerScheme, ImplicitEulerScheme, \
+    LinearlyImplicitEulerScheme
+from trafficFlow.utilities.timeDiscretizationSchemes.multirateSchemes import MultirateRungeKuttaScheme
+from trafficFlow.utilities.timeDiscretizationSchemes.rungeKuttaSchemes import ClassicalRungeKuttaScheme, \
+    DormandPrinceScheme
+
+
+time_discretization_schemes = {
+    'euler': lambda model: ExplicitEulerScheme(model.create_right_hand_side),
+    'rk4': lambda model: ClassicalRungeKuttaScheme(model.create_right_hand_side),
+    'dopri5': lambda model: DormandPrinceScheme(model.create_right_hand_side),
+    'linearly-implicit-euler': lambda model: LinearlyImplicitEulerScheme(model.create_right_hand_side,
+                                                                         model.create_jacobian),
+    'implicit-euler': lambda model: ImplicitEulerScheme(model.create_right_hand_side, model.create_jacobian),
+    'multirate-rk4': lambda model: MultirateRungeKuttaScheme(model),
+}